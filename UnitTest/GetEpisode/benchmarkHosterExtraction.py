@@ -0,0 +1,132 @@
+"""
+Vergleicht das Auslesen der Hoster-Links auf gespeicherten Episodenseiten:
+
+- bs4:    der frühere Weg, BeautifulSoup(html, "lxml") über die ganze Seite
+- lxml:   parse_stream_links, ein lxml-Parse der ganzen Seite
+- schnell: HosterBlockReader + parse_stream_links_fast, liest blockweise nur bis zum Ende der
+          Hoster-Liste und wertet diesen Ausschnitt per Regex aus
+
+Gemessen werden gelesene Bytes und CPU-Zeit pro Seite. Seiten speichern:
+    python benchmarkHosterExtraction.py --fetch https://.../staffel-1/episode-1 ...
+"""
+
+import os
+import sys
+import time
+import argparse
+import requests
+import urllib3
+from bs4 import BeautifulSoup
+
+from getEpisodesURL import (
+    BASE_URL,
+    HOSTER_CHUNK_SIZE,
+    HosterBlockReader,
+    parse_stream_links,
+    parse_stream_links_fast,
+    pick_stream_links,
+)
+
+
+def parse_stream_links_bs4(html_content: str) -> dict:
+    """Der frühere Weg aus fetch_stream_links_async: ganze Seite mit BeautifulSoup parsen."""
+    soup = BeautifulSoup(html_content, "lxml")
+    all_stream_services = []
+    for element in soup.find_all("i", class_="icon"):
+        class_value = element.get("class")
+        if class_value and len(class_value) > 1:
+            link_element = element.find_parent("a")
+            if link_element and link_element.get("href"):
+                all_stream_services.append({"name": class_value[1], "href_link": f'{BASE_URL}{link_element.get("href")}'})
+    return pick_stream_links(all_stream_services)
+
+
+def extract_fast(raw: bytes):
+    """Simuliert fetch_stream_links_async: blockweise lesen bis zur Hoster-Liste, dann Regex mit Parser-Rückfall."""
+    reader = HosterBlockReader("utf-8")
+    fragment = None
+    for offset in range(0, len(raw), HOSTER_CHUNK_SIZE):
+        fragment = reader.feed(raw[offset:offset + HOSTER_CHUNK_SIZE])
+        if fragment is not None:
+            break
+    html_content = reader.text if fragment is not None else reader.finish()
+    links = parse_stream_links_fast(fragment) if fragment is not None else None
+    if links is None:
+        links = parse_stream_links(fragment or html_content)
+    return links, reader.bytes_read, fragment is not None
+
+
+def measure(func, repeat: int):
+    """Gibt das Ergebnis und die mittlere CPU-Zeit pro Aufruf (Sekunden) zurück."""
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.process_time() - start) / repeat
+
+
+def fetch_pages(urls, directory: str):
+    """Lädt Episodenseiten herunter und speichert sie als .html im Verzeichnis."""
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    os.makedirs(directory, exist_ok=True)
+    for url in urls:
+        response = requests.get(url, timeout=10, verify=False)
+        response.raise_for_status()
+        filename = url.rstrip("/").split("/stream/")[-1].replace("/", "_") + ".html"
+        with open(os.path.join(directory, filename), "wb") as file:
+            file.write(response.content)
+        print(f"Gespeichert: {filename} ({len(response.content)} Bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: Hoster-Links per BeautifulSoup, lxml und Schnellpfad.")
+    parser.add_argument("pages_dir", nargs="?", default="./saved_pages", help="Verzeichnis mit gespeicherten Episodenseiten (*.html).")
+    parser.add_argument("--repeat", type=int, default=20, help="Wiederholungen pro Seite und Verfahren.")
+    parser.add_argument("--fetch", nargs="+", metavar="URL", help="Episodenseiten vorher herunterladen und im Verzeichnis speichern.")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_pages(args.fetch, args.pages_dir)
+
+    pages = sorted(f for f in os.listdir(args.pages_dir) if f.endswith(".html")) if os.path.isdir(args.pages_dir) else []
+    if not pages:
+        print(f"Keine gespeicherten Seiten in '{args.pages_dir}' gefunden.")
+        sys.exit(1)
+
+    totals = {"bytes_full": 0, "bytes_fast": 0, "bs4": 0.0, "lxml": 0.0, "fast": 0.0}
+    mismatches = 0
+    fallbacks = 0
+
+    print(f"{'Seite':<40} {'Bytes':>9} {'gelesen':>9} {'bs4 ms':>8} {'lxml ms':>8} {'schnell ms':>10}")
+    for name in pages:
+        with open(os.path.join(args.pages_dir, name), "rb") as file:
+            raw = file.read()
+        html_content = raw.decode("utf-8", errors="replace")
+
+        links_bs4, cpu_bs4 = measure(lambda: parse_stream_links_bs4(html_content), args.repeat)
+        links_lxml, cpu_lxml = measure(lambda: parse_stream_links(html_content), args.repeat)
+        (links_fast, bytes_read, block_found), cpu_fast = measure(lambda: extract_fast(raw), args.repeat)
+
+        if not block_found:
+            fallbacks += 1
+        if not (links_bs4 == links_lxml == links_fast):
+            mismatches += 1
+            print(f"  Abweichung bei {name}: bs4={links_bs4} lxml={links_lxml} schnell={links_fast}")
+
+        totals["bytes_full"] += len(raw)
+        totals["bytes_fast"] += bytes_read
+        totals["bs4"] += cpu_bs4
+        totals["lxml"] += cpu_lxml
+        totals["fast"] += cpu_fast
+        print(f"{name[:40]:<40} {len(raw):>9} {bytes_read:>9} {cpu_bs4 * 1000:>8.2f} {cpu_lxml * 1000:>8.2f} {cpu_fast * 1000:>10.2f}")
+
+    count = len(pages)
+    print("-" * 90)
+    print(f"Seiten: {count}, ohne Hoster-Liste (Rückfall auf ganze Seite): {fallbacks}, abweichende Ergebnisse: {mismatches}")
+    print(f"Gelesene Bytes pro Seite: {totals['bytes_full'] / count:.0f} -> {totals['bytes_fast'] / count:.0f} "
+          f"(Faktor {totals['bytes_full'] / max(1, totals['bytes_fast']):.1f})")
+    print(f"CPU pro Seite: bs4 {totals['bs4'] / count * 1000:.2f} ms, lxml {totals['lxml'] / count * 1000:.2f} ms, "
+          f"schnell {totals['fast'] / count * 1000:.2f} ms (Faktor gegenüber bs4 {totals['bs4'] / max(1e-9, totals['fast']):.1f})")
+
+
+if __name__ == "__main__":
+    main()
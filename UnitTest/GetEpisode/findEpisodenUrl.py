@@ -2,16 +2,38 @@ import os
 import sys
 import json
 import logging
-from bs4 import BeautifulSoup
+import threading
+import contextlib
+import requests
+import urllib3
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException, InvalidSessionIdException
+from selenium.common.exceptions import WebDriverException, InvalidSessionIdException, TimeoutException
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+# Gemeinsame Auswertung der Hoster-Liste mit dem aiohttp-Scraper (fetch_stream_links_async)
+from getEpisodesURL import (
+    BASE_URL,
+    HOSTER_CHUNK_SIZE,
+    HosterBlockReader,
+    parse_stream_links,
+    parse_stream_links_fast,
+)
+# Mirror-Auswahl wie im aiohttp-Scraper und im Orchestrator
+from mirrorConfig import (
+    MIRROR_CHECK_INTERVAL,
+    MIRROR_CHECK_TIMEOUT,
+    MIRROR_UNHEALTHY_STATUS,
+    MIRROR_URLS,
+    fastest_mirror,
+    rewrite_url,
+)
+from urllib.parse import urlsplit
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,6 +44,23 @@ logging.basicConfig(
     ]
 )
 
+# Episodenseiten werden zuerst per HTTP gelesen; nur wenn das keine Hoster liefert, wird ein Browser benutzt
+EPISODE_HTTP_WORKERS = int(os.getenv("EPISODE_HTTP_WORKERS", "16"))
+# Höchstens so viele gleichzeitige HTTP-Anfragen an denselben Host (von allen Workern zusammen)
+EPISODE_HTTP_PER_HOST = int(os.getenv("EPISODE_HTTP_PER_HOST", "8"))
+# Feste Anzahl wiederverwendbarer Browser für Seiten, die JavaScript brauchen
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "3"))
+
+# Wird in main() erstellt und am Ende geschlossen
+driver_pool = None
+# Eine requests-Session je Thread (Keep-Alive-Verbindungen werden im Thread wiederverwendet)
+http_sessions = threading.local()
+# Aktuell schnellster Mirror; wird höchstens alle MIRROR_CHECK_INTERVAL Sekunden unter dem Lock neu gewählt
+mirror_state = {"current": MIRROR_URLS[0], "checked": 0.0, "lock": threading.Lock()}
+# Ein Semaphor je Host für EPISODE_HTTP_PER_HOST
+host_slots = {}
+host_slots_lock = threading.Lock()
+
 def read_series_txt():
     """
     Liest die Seriennamen aus der Datei 'seriesNames.txt' und gibt sie als Liste zurück.
@@ -121,10 +160,179 @@ def initialize_driver():
         logging.error(f"ERROR initializing WebDriver: {e}")
         raise # Re-raise the exception to be caught by the calling function
 
+class DriverPool:
+    """
+    Feste Anzahl wiederverwendbarer WebDriver für die ThreadPoolExecutor-Worker.
+    Browser werden erst bei Bedarf gestartet (höchstens 'size'); ist keiner frei, wartet der Worker.
+    Ein Driver mit ungültiger Session wird verworfen und beim nächsten Bedarf ersetzt.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = [] # freie Driver
+        self.created = 0
+        # Weckt wartende Worker, wenn ein Driver frei wird oder nach discard/Startfehler ein neuer gestartet werden darf
+        self.condition = threading.Condition()
+        self.all_drivers = []
+
+    def acquire(self):
+        with self.condition:
+            while not self.idle and self.created >= self.size:
+                self.condition.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.created += 1
+        try:
+            driver = initialize_driver()
+        except Exception:
+            with self.condition:
+                self.created -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.all_drivers.append(driver)
+        logging.info(f"Driver pool: started browser {self.created}/{self.size}.")
+        return driver
+
+    def release(self, driver):
+        with self.condition:
+            self.idle.append(driver)
+            self.condition.notify()
+
+    def discard(self, driver):
+        with self.condition:
+            self.created -= 1
+            if driver in self.all_drivers:
+                self.all_drivers.remove(driver)
+            self.condition.notify() # Ein wartender Worker darf jetzt einen Ersatz starten
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting discarded WebDriver: {e}")
+
+    @contextlib.contextmanager
+    def driver(self):
+        """Leiht einen Driver aus und gibt ihn danach zurück (oder verwirft ihn bei Session-Fehlern)."""
+        driver = self.acquire()
+        try:
+            yield driver
+        except TimeoutException:
+            self.release(driver) # Seite lädt zu langsam, der Browser selbst ist in Ordnung
+            raise
+        except WebDriverException:
+            self.discard(driver)
+            raise
+        except BaseException:
+            self.release(driver)
+            raise
+        else:
+            self.release(driver)
+
+    def close(self):
+        with self.condition:
+            drivers, self.all_drivers = self.all_drivers, []
+            self.idle = []
+            self.created = 0
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logging.warning(f"Error quitting pooled WebDriver: {e}")
+        logging.info(f"Driver pool closed ({len(drivers)} browsers).")
+
+def get_http_session():
+    """Gibt die requests-Session des aktuellen Threads zurück."""
+    session = getattr(http_sessions, "session", None)
+    if session is None:
+        session = http_sessions.session = requests.Session()
+        session.verify = False # Wie im Browser (--ignore-certificate-errors)
+    return session
+
+def probe_mirror(base):
+    """Antwortzeit des Mirrors in Sekunden oder None, wenn er nicht erreichbar ist."""
+    start = time.monotonic()
+    try:
+        response = requests.get(f"{base}/", timeout=MIRROR_CHECK_TIMEOUT, allow_redirects=False, verify=False)
+    except requests.RequestException:
+        return None
+    return time.monotonic() - start if response.status_code < MIRROR_UNHEALTHY_STATUS else None
+
+def current_mirror():
+    """
+    Gibt den aktuell schnellsten erreichbaren Mirror zurück und prüft höchstens alle MIRROR_CHECK_INTERVAL
+    Sekunden neu. Der Check läuft unter einem Lock, damit parallele Worker nicht gleichzeitig prüfen.
+    """
+    if len(MIRROR_URLS) < 2:
+        return mirror_state["current"]
+    with mirror_state["lock"]:
+        if time.monotonic() - mirror_state["checked"] >= MIRROR_CHECK_INTERVAL:
+            with ThreadPoolExecutor(max_workers=len(MIRROR_URLS)) as executor:
+                latencies = dict(zip(MIRROR_URLS, executor.map(probe_mirror, MIRROR_URLS)))
+            previous = mirror_state["current"]
+            mirror_state["current"] = fastest_mirror(latencies, previous)
+            mirror_state["checked"] = time.monotonic()
+            if mirror_state["current"] != previous:
+                logging.info(f"Switching mirror from {previous} to {mirror_state['current']}.")
+        return mirror_state["current"]
+
+def mirror_url(url):
+    """Setzt eine Seiten-URL auf den aktuell schnellsten Mirror um."""
+    return rewrite_url(url, current_mirror())
+
+def mark_mirror_failed():
+    """Erzwingt vor der nächsten Anfrage einen neuen Mirror-Check (nach einem Verbindungsfehler)."""
+    mirror_state["checked"] = 0.0
+
+def host_slot(url):
+    """Semaphor, das die gleichzeitigen Anfragen an den Host der URL auf EPISODE_HTTP_PER_HOST begrenzt."""
+    host = urlsplit(url).netloc
+    with host_slots_lock:
+        slot = host_slots.get(host)
+        if slot is None:
+            slot = host_slots[host] = threading.BoundedSemaphore(EPISODE_HTTP_PER_HOST)
+    return slot
+
+def fetch_stream_links_http(url):
+    """
+    Liest die Hoster-Links einer Episodenseite per HTTP, wie fetch_stream_links_async: Die Seite wird nur bis
+    zum Ende der Hoster-Liste geladen und per Regex ausgewertet, sonst vollständig geparst.
+
+    Returns:
+        dict: 'primary_link', 'vidoza_link', 'voe_link' (oder None).
+    """
+    with host_slot(url), get_http_session().get(url, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        # Nur einen ausdrücklich angegebenen Zeichensatz übernehmen; requests setzt für text/html sonst ISO-8859-1
+        encoding = None
+        if "charset=" in response.headers.get("Content-Type", "").lower():
+            encoding = requests.utils.get_encoding_from_headers(response.headers)
+        reader = HosterBlockReader(encoding or "utf-8")
+        fragment = None
+        for chunk in response.iter_content(HOSTER_CHUNK_SIZE):
+            fragment = reader.feed(chunk)
+            if fragment is not None:
+                break
+    # Wie bisher: bei mehreren Vidoza-Einträgen (Sprachen) zählt der erste
+    if fragment is not None:
+        links = parse_stream_links_fast(fragment, first_vidoza=True)
+        if links is not None:
+            return links
+        return parse_stream_links(fragment, first_vidoza=True)
+    return parse_stream_links(reader.finish(), first_vidoza=True)
+
+def fetch_stream_links_browser(url):
+    """Lädt die Episodenseite in einem Browser aus dem Driver-Pool (für Seiten, die JavaScript brauchen)."""
+    with driver_pool.driver() as driver:
+        driver.get(url)
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
+        page_source = driver.page_source
+    return parse_stream_links(page_source, first_vidoza=True)
+
 def find_video_stream_service_threaded(url):
     """
     Sucht nach verfügbaren Streaming-Diensten für eine TV-Serie.
-    Diese Version initialisiert ihren eigenen Treiber für Threading-Zwecke.
+    Zuerst per HTTP; nur wenn dort keine Hoster gefunden werden (oder die Anfrage scheitert), wird die Seite
+    in einem Browser aus dem Driver-Pool geladen.
 
     Args:
         url (str): Die URL der TV-Serie.
@@ -132,59 +340,31 @@ def find_video_stream_service_threaded(url):
     Returns:
         str: Der Link des bevorzugten Streaming-Dienstes (Vidoza oder VOE), oder None.
     """
-    driver = None
-    actual_link = None
+    links = None
     try:
-        driver = initialize_driver() # Initialize driver for each thread
-        all_stream_services = []
-
-        logging.info(f"Navigating to URL to find stream services: {url}")
-        driver.get(url)
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        elements = soup.find_all("i", class_="icon")
-
-        for element in elements:
-            class_value = element.get("class")
-            if class_value and len(class_value) > 1: # Ensure class_value exists and has at least two elements
-                service_name = class_value[1]
-                link_element = element.find_parent("a")
-                if link_element:
-                    href = link_element.get("href")
-                    if href:
-                        all_stream_services.append({"name": service_name, "href_link": href})
-        
-        logging.info(f"Found {len(all_stream_services)} potential streaming services for {url}.")
-
-        # Prioritize Vidoza, then VOE
-        for service in all_stream_services:
-            if "Vidoza" in service["name"]:
-                actual_link = f'https://186.2.175.5{service["href_link"]}'
-                logging.info(f"Found Vidoza link for {url}: {actual_link}")
-                break
-            elif "VOE" in service["name"]:
-                actual_link = f'https://186.2.175.5{service["href_link"]}'
-                logging.info(f"Found VOE link for {url}: {actual_link}")
-                # Don't break here, continue to check for Vidoza if it's preferred
-        
-        if not actual_link:
-            logging.warning(f"No preferred streaming service (Vidoza or VOE) found for {url}. Found services: {all_stream_services}")
+        links = fetch_stream_links_http(url)
+    except requests.ConnectionError as e:
+        mark_mirror_failed()
+        logging.warning(f"HTTP request for {url} failed ({e}), falling back to browser.")
+    except requests.RequestException as e:
+        logging.warning(f"HTTP request for {url} failed ({e}), falling back to browser.")
+
+    if not links or not links["primary_link"]:
+        if links is not None:
+            logging.info(f"No streaming services in HTTP response for {url}, falling back to browser.")
+        try:
+            links = fetch_stream_links_browser(url)
+        except Exception as e:
+            logging.error(f"ERROR while searching for streaming services at {url}: {e}")
+            return None
 
-        return actual_link
-    except Exception as e:
-        logging.error(f"ERROR while searching for streaming services at {url}: {e}")
-        return None
-    finally:
-        if driver:
-            try:
-                driver.quit()
-                logging.info(f"WebDriver for {url} quit.")
-            except InvalidSessionIdException:
-                logging.warning(f"WebDriver for {url} already quit or session invalid when attempting to quit.")
-            except Exception as e:
-                logging.error(f"Error quitting WebDriver for {url}: {e}")
+    # Prioritize Vidoza, then VOE
+    actual_link = links["vidoza_link"] or links["voe_link"]
+    if actual_link:
+        logging.info(f"Found {'Vidoza' if links['vidoza_link'] else 'VOE'} link for {url}: {actual_link}")
+    else:
+        logging.warning(f"No preferred streaming service (Vidoza or VOE) found for {url}.")
+    return actual_link
 
 
 def get_episode_url_per_season(driver_main, serien_Name, season):
@@ -202,7 +382,7 @@ def get_episode_url_per_season(driver_main, serien_Name, season):
     """
     links = []
     
-    initial_episode_url = f"https://186.2.175.5/serie/stream/{serien_Name}/staffel-{season}/episode-1"
+    initial_episode_url = mirror_url(f"{BASE_URL}/serie/stream/{serien_Name}/staffel-{season}/episode-1")
     
     # --- NEUE OPTIMIERUNG: Retry-Logik für den Haupt-WebDriver bei Staffel-Navigation ---
     max_main_driver_retries_per_season = 3
@@ -245,16 +425,15 @@ def get_episode_url_per_season(driver_main, serien_Name, season):
     logging.info(f"{serien_Name}, Season {season} has a total of {total_episodes} episodes.")
     
     # Use ThreadPoolExecutor to fetch episode links concurrently
-    # Adjust max_workers as needed for concurrent episode link fetching.
-    # Be cautious: A high number of workers means many browser instances, which can
-    # overload the Selenium Hub or the system running the browsers.
-    episode_max_workers = 3 # Reduced from 5 to 3 to mitigate system load issues
+    # Episode pages are read via HTTP; only the fallback uses browsers, and at most
+    # DRIVER_POOL_SIZE of them (shared by all workers), so this can be higher than the browser count.
+    episode_max_workers = EPISODE_HTTP_WORKERS
     logging.info(f"Starting ThreadPoolExecutor for episodes with max_workers={episode_max_workers}.")
 
     with ThreadPoolExecutor(max_workers=episode_max_workers) as executor:
         futures = []
         for episode in range(1, total_episodes):
-            url = f"https://186.2.175.5/serie/stream/{serien_Name}/staffel-{season}/episode-{episode}"
+            url = mirror_url(f"{BASE_URL}/serie/stream/{serien_Name}/staffel-{season}/episode-{episode}")
             # Submit each episode link fetching task to the executor
             futures.append(executor.submit(find_video_stream_service_threaded, url))
         
@@ -345,7 +524,7 @@ def process_single_series(serie_name_raw):
         for retry_attempt in range(max_initial_driver_retries):
             try:
                 # Navigate to the first episode of the first season to get total seasons
-                initial_series_url = f"https://186.2.175.5/serie/stream/{serie_name_formatted}/staffel-1/episode-1"
+                initial_series_url = mirror_url(f"{BASE_URL}/serie/stream/{serie_name_formatted}/staffel-1/episode-1")
                 driver.get(initial_series_url)
                 WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
                 
@@ -422,11 +601,23 @@ def main():
     Sammelt Daten für alle Serien und speichert sie in einer einzigen JSON-Datei.
     Berücksichtigt bereits vorhandene Daten und überspringt bereits verarbeitete Serien.
     """
+    global driver_pool
     serien_Names = read_series_txt()
     if not serien_Names:
         logging.info("No series names to process. Exiting.")
         sys.exit(0)
 
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    driver_pool = DriverPool(DRIVER_POOL_SIZE)
+    try:
+        process_all_series(serien_Names)
+    finally:
+        driver_pool.close()
+
+def process_all_series(serien_Names):
+    """
+    Verarbeitet die Serien nacheinander und schreibt alle Daten in 'all_series_data.json'.
+    """
     # Load existing data at the beginning
     all_series_data = load_existing_series_data()
     existing_series_names = {s['series_name'] for s in all_series_data} # Use a set for faster lookups
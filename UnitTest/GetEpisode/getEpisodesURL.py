@@ -1,15 +1,25 @@
 import os
 import sys
 import json
+import codecs # Inkrementelles Dekodieren beim blockweisen Lesen der Antworten
+import hashlib # Schlüssel und Objektnamen des Antwort-Caches
+import sqlite3 # Katalog (Serien, Staffeln, Episoden, Links)
 import logging
 import asyncio # Für asynchrone Programmierung
+import concurrent.futures # Prozess-Pool für das CPU-lastige HTML-Parsen
 import aiohttp # Für asynchrone HTTP-Anfragen
-from bs4 import BeautifulSoup
+import lxml.html # Einmaliges Parsen jeder Seite
 from lxml import etree # Import für XPath-Unterstützung
+from lxml.cssselect import CSSSelector # CSS-Abfragen auf demselben lxml-Baum
 import time
 import re # Für reguläre Ausdrücke zur Staffelnummer-Extraktion
+import contextlib
+from urllib.parse import urlsplit
 from typing import Union # Hinzugefügt für Union-Typ-Hinweis
 
+import mirrorConfig # Mirror-Liste und -Auswahl, gemeinsam mit startEeasySubprocess.py
+from mirrorConfig import BASE_URL, MIRROR_CHECK_INTERVAL, MIRROR_URLS
+
 # --- Globale Konfigurationen und Konstanten ---
 # Konfigurieren des Loggings
 logging.basicConfig(
@@ -22,9 +32,31 @@ logging.basicConfig(
 )
 
 # Maximale Anzahl gleichzeitiger Anfragen für das Abrufen von Episoden-Links (mit aiohttp)
-EPISODE_MAX_CONCURRENT_REQUESTS = 500 # Erhöht für schnellere Verarbeitung, basierend auf Ihrer Rückmeldung
-# Basis-URL für die Serie
-BASE_URL = "https://186.2.175.5"
+EPISODE_MAX_CONCURRENT_REQUESTS = 500 # Obergrenze; die tatsächliche Parallelität regelt HostConcurrencyController
+# Start- und Mindestparallelität je Host für die adaptive Regelung
+SCRAPER_INITIAL_CONCURRENCY = int(os.getenv("SCRAPER_INITIAL_CONCURRENCY", "32"))
+SCRAPER_MIN_CONCURRENCY = int(os.getenv("SCRAPER_MIN_CONCURRENCY", "4"))
+# Wiederholungen einer Anfrage nach 429/503 (jeweils nach der Pause aus Retry-After)
+SCRAPER_THROTTLE_RETRIES = int(os.getenv("SCRAPER_THROTTLE_RETRIES", "3"))
+# BASE_URL, MIRROR_URLS und MIRROR_CHECK_INTERVAL kommen aus mirrorConfig.py (gemeinsam mit dem Orchestrator);
+# welcher Mirror tatsächlich angefragt wird, entscheidet MirrorRegistry erst beim Abruf.
+MIRROR_MAX_FAILURES = 3 # Aufeinanderfolgende Verbindungsfehler/Timeouts, bis ein Mirror als nicht erreichbar gilt
+# Gemeinsame HTTP-Session für den ganzen Lauf: Verbindungen je Host, DNS-Cache und Keep-Alive
+SCRAPER_LIMIT_PER_HOST = int(os.getenv("SCRAPER_LIMIT_PER_HOST", str(EPISODE_MAX_CONCURRENT_REQUESTS)))
+DNS_CACHE_TTL = int(os.getenv("SCRAPER_DNS_CACHE_TTL", "300"))      # Sekunden
+KEEPALIVE_TIMEOUT = int(os.getenv("SCRAPER_KEEPALIVE_TIMEOUT", "60")) # Sekunden
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Antwort-Cache auf der Festplatte: 'off', 'on' (mit TTL und Revalidierung) oder 'replay' (nur aus dem Cache, kein Netzwerk)
+CACHE_MODE = os.getenv("SCRAPER_CACHE_MODE", "off").lower()
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", "./http_cache")
+CACHE_TTL_LISTING = int(os.getenv("SCRAPER_CACHE_TTL_LISTING", str(6 * 3600)))     # Staffel-/Episodenlisten, Filmsammlungen
+CACHE_TTL_PAGE = int(os.getenv("SCRAPER_CACHE_TTL_PAGE", str(7 * 24 * 3600)))      # Episoden- und Filmseiten (Hoster-Links)
+# Katalog-Datenbank und JSON-Export für die bisherigen Leser (z.B. startEeasySubprocess.py)
+CATALOG_DB = os.getenv("CATALOG_DB", "all_series_data.sqlite3")
+CATALOG_JSON = os.getenv("CATALOG_JSON", "all_series_data.json")
+CATALOG_JSONL = os.getenv("CATALOG_JSONL", "")  # optional zusätzlich als JSON Lines (eine Serie pro Zeile)
+# Anzahl der Prozesse, die HTML-Seiten parsen (Standard: alle CPU-Kerne)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))
 
 # --- Globale Statistik-Variablen ---
 # Diese werden in main_async zurückgesetzt und aggregiert
@@ -35,10 +67,8 @@ global_stats = {
     "failed_items_details": [] # Speichert Details zu Fehlern (Serie, Staffel, Episode, Film, Fehlertyp)
 }
 
-# Semaphore zur Begrenzung der gleichzeitigen Anfragen
-request_semaphore = asyncio.Semaphore(EPISODE_MAX_CONCURRENT_REQUESTS)
-# Zähler für aktive Anfragen
-active_requests_counter = 0
+# Prozess-Pool für das Parsen, wird in main_async gestartet
+parse_executor = None
 
 # --- Hilfsfunktionen für Dateiverwaltung ---
 
@@ -106,43 +136,956 @@ def load_existing_series_data(filename='all_series_data.json'):
         logging.info(f"Datei {filename} existiert nicht. Beginne mit leeren Daten.")
         return []
 
+def series_slug(series_name: str) -> str:
+    """Schlüssel einer Serie wie in den URLs, z.B. 'Rick and Morty' -> 'rick-and-morty'."""
+    return series_name.strip().replace(" ", "-").lower()
+
+class CatalogStore:
+    """
+    Katalog in SQLite statt einer komplett neu geschriebenen JSON-Datei.
+
+    Tabellen: series, seasons, episodes, films und links (ein Link je Hoster, an einer Episode
+    oder einem Film). Die UNIQUE-Schlüssel (series_id, season_number) und (season_id, episode_number)
+    dienen zugleich als Index für den Zugriff über Serie/Staffel/Episode. upsert_series schreibt nur
+    die Zeilen einer Serie in einer Transaktion; export_json erzeugt all_series_data.json im bisherigen
+    Format, Serie für Serie, ohne den Katalog im Speicher aufzubauen.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS series (
+            id INTEGER PRIMARY KEY,
+            slug TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            base_url TEXT
+        );
+        CREATE TABLE IF NOT EXISTS seasons (
+            id INTEGER PRIMARY KEY,
+            series_id INTEGER NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+            season_number INTEGER NOT NULL,
+            UNIQUE (series_id, season_number)
+        );
+        CREATE TABLE IF NOT EXISTS episodes (
+            id INTEGER PRIMARY KEY,
+            season_id INTEGER NOT NULL REFERENCES seasons(id) ON DELETE CASCADE,
+            episode_number INTEGER NOT NULL,
+            UNIQUE (season_id, episode_number)
+        );
+        CREATE TABLE IF NOT EXISTS films (
+            id INTEGER PRIMARY KEY,
+            series_id INTEGER NOT NULL REFERENCES series(id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            url TEXT,
+            UNIQUE (series_id, title)
+        );
+        CREATE TABLE IF NOT EXISTS links (
+            id INTEGER PRIMARY KEY,
+            episode_id INTEGER REFERENCES episodes(id) ON DELETE CASCADE,
+            film_id INTEGER REFERENCES films(id) ON DELETE CASCADE,
+            hoster TEXT NOT NULL,
+            url TEXT NOT NULL,
+            CHECK ((episode_id IS NULL) != (film_id IS NULL))
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS links_episode_hoster ON links(episode_id, hoster) WHERE episode_id IS NOT NULL;
+        CREATE UNIQUE INDEX IF NOT EXISTS links_film_hoster ON links(film_id, hoster) WHERE film_id IS NOT NULL;
+    """
+    # Link-Schlüssel im JSON (in dieser Reihenfolge) -> Hoster-Spalte in links
+    LINK_KEYS = ("primary_link", "vidoza_link", "voe_link")
+
+    def __init__(self, path: str = CATALOG_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM series LIMIT 1").fetchone() is None
+
+    def import_json(self, filename: str = CATALOG_JSON) -> int:
+        """Übernimmt eine bestehende all_series_data.json (einmalige Migration)."""
+        imported = 0
+        for series_data in load_existing_series_data(filename):
+            if isinstance(series_data, dict) and series_data.get("series_name"):
+                self.upsert_series(series_data)
+                imported += 1
+        logging.info(f"{imported} Serien aus {filename} in den Katalog {self.path} übernommen.")
+        return imported
+
+    def _id(self, query: str, params: tuple) -> int:
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def _upsert_links(self, owner_column: str, owner_id: int, stream_links: dict):
+        for key, url in stream_links.items():
+            if not key.endswith("_link"):
+                continue
+            hoster = key[:-len("_link")]
+            if url:
+                self.conn.execute(
+                    f"INSERT INTO links ({owner_column}, hoster, url) VALUES (?, ?, ?) "
+                    f"ON CONFLICT ({owner_column}, hoster) WHERE {owner_column} IS NOT NULL DO UPDATE SET url = excluded.url",
+                    (owner_id, hoster, url),
+                )
+            else:
+                self.conn.execute(f"DELETE FROM links WHERE {owner_column} = ? AND hoster = ?", (owner_id, hoster))
+
+    def upsert_series(self, series_data: dict):
+        """Schreibt eine Serie (Format wie in all_series_data.json) inkrementell in einer Transaktion."""
+        slug = series_slug(series_data["series_name"])
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO series (slug, name, base_url) VALUES (?, ?, ?) "
+                "ON CONFLICT (slug) DO UPDATE SET name = excluded.name, base_url = excluded.base_url",
+                (slug, series_data["series_name"], series_data.get("base_url")),
+            )
+            series_id = self._id("SELECT id FROM series WHERE slug = ?", (slug,))
+
+            for season in series_data.get("seasons", []):
+                self.conn.execute(
+                    "INSERT INTO seasons (series_id, season_number) VALUES (?, ?) ON CONFLICT DO NOTHING",
+                    (series_id, season["season_number"]),
+                )
+                season_id = self._id(
+                    "SELECT id FROM seasons WHERE series_id = ? AND season_number = ?", (series_id, season["season_number"])
+                )
+                for episode in season.get("episode_links", []):
+                    if not isinstance(episode, dict) or "episode_number" not in episode:
+                        continue
+                    self.conn.execute(
+                        "INSERT INTO episodes (season_id, episode_number) VALUES (?, ?) ON CONFLICT DO NOTHING",
+                        (season_id, episode["episode_number"]),
+                    )
+                    episode_id = self._id(
+                        "SELECT id FROM episodes WHERE season_id = ? AND episode_number = ?", (season_id, episode["episode_number"])
+                    )
+                    self._upsert_links("episode_id", episode_id, episode)
+
+            for film in series_data.get("film", []):
+                if not isinstance(film, dict) or "movie_title" not in film:
+                    continue
+                self.conn.execute(
+                    "INSERT INTO films (series_id, title, url) VALUES (?, ?, ?) "
+                    "ON CONFLICT (series_id, title) DO UPDATE SET url = excluded.url",
+                    (series_id, film["movie_title"], film.get("movie_url")),
+                )
+                film_id = self._id("SELECT id FROM films WHERE series_id = ? AND title = ?", (series_id, film["movie_title"]))
+                self._upsert_links("film_id", film_id, film.get("stream_links") or {})
+
+    def _links_dict(self, rows) -> dict:
+        links = {key: None for key in self.LINK_KEYS}
+        for hoster, url in rows:
+            if hoster is not None:
+                links[f"{hoster}_link"] = url
+        return links
+
+    def _series_dict(self, series_id: int, name: str, base_url) -> dict:
+        series_data = {"series_name": name, "base_url": base_url or "", "seasons": [], "film": []}
+
+        rows = self.conn.execute(
+            "SELECT s.season_number, e.episode_number, l.hoster, l.url FROM seasons s "
+            "LEFT JOIN episodes e ON e.season_id = s.id "
+            "LEFT JOIN links l ON l.episode_id = e.id "
+            "WHERE s.series_id = ? ORDER BY s.season_number, e.episode_number, l.id",
+            (series_id,),
+        ).fetchall()
+        seasons = {}
+        episodes = {}
+        for season_number, episode_number, hoster, url in rows:
+            season = seasons.get(season_number)
+            if season is None:
+                season = seasons[season_number] = {"season_number": season_number, "episode_links": []}
+                series_data["seasons"].append(season)
+            if episode_number is None:
+                continue
+            episode = episodes.get((season_number, episode_number))
+            if episode is None:
+                episode = episodes[(season_number, episode_number)] = self._links_dict([])
+                episode["episode_number"] = episode_number
+                season["episode_links"].append(episode)
+            if hoster is not None:
+                episode[f"{hoster}_link"] = url
+
+        rows = self.conn.execute(
+            "SELECT f.id, f.title, f.url, l.hoster, l.url FROM films f LEFT JOIN links l ON l.film_id = f.id "
+            "WHERE f.series_id = ? ORDER BY f.title, l.id",
+            (series_id,),
+        ).fetchall()
+        films = {}
+        for film_id, title, film_url, hoster, url in rows:
+            film = films.get(film_id)
+            if film is None:
+                film = films[film_id] = {"movie_title": title, "movie_url": film_url, "stream_links": self._links_dict([])}
+                series_data["film"].append(film)
+            if hoster is not None:
+                film["stream_links"][f"{hoster}_link"] = url
+        return series_data
+
+    def load_series(self, series_name: str):
+        """Gibt eine Serie im Format von all_series_data.json zurück oder None, wenn sie unbekannt ist."""
+        row = self.conn.execute(
+            "SELECT id, name, base_url FROM series WHERE slug = ?", (series_slug(series_name),)
+        ).fetchone()
+        return self._series_dict(*row) if row else None
+
+    def iter_series(self):
+        """Liefert alle Serien nacheinander (in Reihenfolge des ersten Eintrags)."""
+        for row in self.conn.execute("SELECT id, name, base_url FROM series ORDER BY id").fetchall():
+            yield self._series_dict(*row)
+
+    def export_json(self, filename: str = CATALOG_JSON):
+        """
+        Schreibt den Katalog im Format von all_series_data.json (wie json.dump(..., indent=4)),
+        Serie für Serie in eine temporäre Datei, die dann die alte ersetzt.
+        """
+        temp_filename = f"{filename}.tmp"
+        count = 0
+        try:
+            with open(temp_filename, "w", encoding="utf-8") as file:
+                file.write("[")
+                for series_data in self.iter_series():
+                    file.write(",\n    " if count else "\n    ")
+                    file.write(json.dumps(series_data, indent=4).replace("\n", "\n    "))
+                    count += 1
+                file.write("\n]" if count else "]")
+            os.replace(temp_filename, filename)
+            logging.info(f"Katalog mit {count} Serien nach {filename} exportiert.")
+        except Exception as e:
+            logging.error(f"Fehler beim Exportieren des Katalogs nach {filename}: {e}")
+
+    def export_jsonl(self, filename: str):
+        """Schreibt den Katalog als JSON Lines (eine Serie pro Zeile), z.B. für Leser mit wenig Speicher."""
+        temp_filename = f"{filename}.tmp"
+        count = 0
+        try:
+            with open(temp_filename, "w", encoding="utf-8") as file:
+                for series_data in self.iter_series():
+                    file.write(json.dumps(series_data) + "\n")
+                    count += 1
+            os.replace(temp_filename, filename)
+            logging.info(f"Katalog mit {count} Serien nach {filename} exportiert.")
+        except Exception as e:
+            logging.error(f"Fehler beim Exportieren des Katalogs nach {filename}: {e}")
+
 # --- Hilfsfunktionen für Web-Scraping ---
 
-def find_by_xpath_lxml(soup_obj: BeautifulSoup, xpath_expr: str):
+# Vorkompilierte CSS-Selektoren (cssselect übersetzt sie einmalig nach XPath)
+CSS_SELECTORS = {}
+
+def parse_html(html_content: str):
+    """
+    Parst den HTML-Inhalt einer Seite genau einmal in einen lxml-Baum.
+    Auf diesem Baum laufen sowohl XPath- (find_by_xpath_lxml) als auch CSS-Abfragen (find_by_css).
+
+    Args:
+        html_content (str): Der HTML-Inhalt der Seite.
+
+    Returns:
+        lxml.html.HtmlElement: Das Wurzelelement des Dokuments.
+    """
+    return lxml.html.document_fromstring(html_content)
+
+def find_by_xpath_lxml(tree, xpath_expr: str):
     """
-    Findet Elemente in einem BeautifulSoup-Objekt mithilfe eines XPath-Ausdrucks.
-    Verwendet lxml für die XPath-Verarbeitung.
+    Findet Elemente in einem lxml-Baum mithilfe eines XPath-Ausdrucks.
 
     Args:
-        soup_obj (BeautifulSoup): Das BeautifulSoup-Objekt, das den HTML-Inhalt enthält.
+        tree (lxml.html.HtmlElement): Der mit parse_html erzeugte Baum (oder ein Element daraus).
         xpath_expr (str): Der XPath-Ausdruck.
 
     Returns:
-        list: Eine Liste von BeautifulSoup-Tag-Objekten, die dem XPath entsprechen.
+        list: Eine Liste von lxml-Elementen, die dem XPath entsprechen.
     """
     try:
-        # Konvertiere BeautifulSoup-Objekt in ein lxml-Element für XPath-Abfragen
-        # etree.HTML erfordert einen String, also konvertieren wir soup_obj zurück in einen String
-        lxml_tree = etree.HTML(str(soup_obj))
-        found_elements = lxml_tree.xpath(xpath_expr)
-        
-        # Konvertiere lxml-Elemente zurück in BeautifulSoup-Tags
-        bs_elements = []
-        for el in found_elements:
-            # etree.tostring gibt Bytes zurück, decode zu String
-            # Dann parse den String mit BeautifulSoup und finde das erste Tag
-            bs_el = BeautifulSoup(etree.tostring(el, pretty_print=True).decode(), "lxml").find()
-            if bs_el:
-                bs_elements.append(bs_el)
-        return bs_elements
-    except Exception as e:
+        return tree.xpath(xpath_expr)
+    except etree.XPathError as e:
         logging.error(f"Fehler bei der XPath-Suche mit lxml ('{xpath_expr}'): {e}", exc_info=True)
         return []
 
+def find_by_css(tree, css_selector: str):
+    """
+    Findet Elemente in einem lxml-Baum mithilfe eines CSS-Selektors.
+
+    Args:
+        tree (lxml.html.HtmlElement): Der mit parse_html erzeugte Baum (oder ein Element daraus).
+        css_selector (str): Der CSS-Selektor, z.B. 'i.icon'.
+
+    Returns:
+        list: Eine Liste von lxml-Elementen, die dem Selektor entsprechen.
+    """
+    selector = CSS_SELECTORS.get(css_selector)
+    if selector is None:
+        selector = CSS_SELECTORS[css_selector] = CSSSelector(css_selector)
+    return selector(tree)
+
+def element_text(element) -> str:
+    """Gibt den Textinhalt eines Elements ohne führende/folgende Leerzeichen zurück."""
+    return element.text_content().strip()
+
+def element_html(element) -> str:
+    """Gibt das HTML eines Elements für Log- und Fehlerdetails zurück."""
+    return etree.tostring(element, encoding="unicode", pretty_print=True)
+
+def has_label(element, label: str) -> bool:
+    """Prüft, ob ein Element einen <span> mit genau diesem Text enthält (z.B. 'Staffeln:')."""
+    return bool(element.xpath('.//span[normalize-space(.)=$label]', label=label))
+
+# --- Parser-Funktionen ---
+# Diese Funktionen laufen im Prozess-Pool: Sie erhalten nur den HTML-Text, greifen auf keinen
+# globalen Zustand zu und geben kleine Dictionaries/Listen zurück, die günstig zurück an den
+# Event-Loop übertragen werden. Logging und Fehlerstatistik bleiben bei den async-Funktionen.
+
+STRUCTURE_XPATH = '//*[@id="stream"]/ul[1]/li' # Staffeln und Filme in der Navigationsleiste
+ITEMS_XPATH = '//*[@id="stream"]/ul[2]/li'     # Episoden einer Staffel bzw. Filme einer Filmsammlung
+
+def parse_series_structure(html_content: str) -> dict:
+    """
+    Liest Staffeln und Filmsammlung aus der Navigationsleiste einer Serienseite.
+
+    Returns:
+        dict: {'element_count': Anzahl gefundener li-Elemente,
+               'items': [{'type': 'season', 'number': 1}, {'type': 'movie_collection', 'url_suffix': '/filme'}]}
+    """
+    tree = parse_html(html_content)
+    all_li_elements = find_by_xpath_lxml(tree, STRUCTURE_XPATH)
+
+    structure_items = []
+    for li in all_li_elements:
+        a_tag = li.find('.//a')
+        if a_tag is None or not a_tag.get('href'):
+            continue # z.B. das "Staffeln:"-Element
+        href = a_tag.get('href')
+        if "/staffel-" in href:
+            # Versuchen, die Staffelnummer aus dem Text oder dem href zu extrahieren
+            season_text = element_text(a_tag)
+            season_number = None
+            if season_text.isdigit():
+                season_number = int(season_text)
+            else:
+                match = re.search(r'/staffel-(\d+)', href)
+                if match:
+                    season_number = int(match.group(1))
+            if season_number is not None:
+                structure_items.append({'type': 'season', 'number': season_number})
+        elif "/filme" in href:
+            structure_items.append({'type': 'movie_collection', 'url_suffix': href})
+
+    # Sortiere die Staffeln nach ihrer Nummer, um eine konsistente Reihenfolge zu gewährleisten
+    # Filme bleiben an ihrer gefundenen Position relativ zu den Staffeln
+    structure_items.sort(key=lambda x: x['number'] if x['type'] == 'season' else float('inf'))
+    return {'element_count': len(all_li_elements), 'items': structure_items}
+
+def parse_episode_count(html_content: str, season_num: int) -> int:
+    """
+    Zählt die li-Elemente einer Staffelseite, die auf eine Episode der angegebenen Staffel verlinken.
+
+    Returns:
+        int: Die Anzahl gültiger Episodenelemente.
+    """
+    tree = parse_html(html_content)
+    valid_episode_count = 0
+    for li in find_by_xpath_lxml(tree, ITEMS_XPATH):
+        a_tag = li.find('.//a')
+        # Zähle nur li-Elemente, die einen Link zu einer Episode enthalten
+        # Der Link sollte die aktuelle Staffelnummer und eine Episodennummer enthalten
+        if a_tag is not None and a_tag.get('href') and f"/staffel-{season_num}/episode-" in a_tag.get('href'):
+            # Überprüfe, ob der Text des a-Tags eine Zahl ist oder der href eine Episodennummer enthält
+            if element_text(a_tag).isdigit() or re.search(r'/episode-(\d+)', a_tag.get('href')):
+                valid_episode_count += 1
+    return valid_episode_count
+
+def parse_stream_links(html_content: str, first_vidoza: bool = False) -> dict:
+    """
+    Liest die Hoster-Einträge (<i class="icon NAME"> im Link <a href>) einer Episoden- oder Filmseite.
+    Priorisiert VOE als primären Link, dann Vidoza. 'first_vidoza' siehe pick_stream_links.
+
+    Returns:
+        dict: Ein Dictionary mit 'primary_link', 'vidoza_link' und 'voe_link' (oder None).
+    """
+    tree = parse_html(html_content)
+
+    all_stream_services = []
+    for element in find_by_css(tree, "i.icon"):
+        class_value = element.get("class", "").split()
+        if len(class_value) > 1:
+            link_element = next(element.iterancestors("a"), None)
+            if link_element is not None and link_element.get("href"):
+                all_stream_services.append({"name": class_value[1], "href_link": f'{BASE_URL}{link_element.get("href")}'})
+    return pick_stream_links(all_stream_services, first_vidoza)
+
+def pick_stream_links(all_stream_services: list, first_vidoza: bool = False) -> dict:
+    """
+    Wählt aus den gefundenen Hostern die VOE- und Vidoza-Links und den primären Link.
+    Bei mehreren Einträgen (z.B. verschiedene Sprachen) gilt jeweils der letzte; mit 'first_vidoza'
+    bleibt der erste Vidoza-Link erhalten, wie bisher in findEpisodenUrl.py.
+    """
+    primary_link = None
+    vidoza_link = None
+    voe_link = None
+    for service in all_stream_services:
+        if "VOE" in service["name"]:
+            voe_link = service["href_link"]
+            if primary_link is None:
+                primary_link = voe_link
+        elif "Vidoza" in service["name"]:
+            if first_vidoza and vidoza_link is not None:
+                continue
+            vidoza_link = service["href_link"]
+            if primary_link is None:
+                primary_link = vidoza_link
+    return {"primary_link": primary_link, "vidoza_link": vidoza_link, "voe_link": voe_link}
+
+def parse_movie_collection(html_content: str) -> dict:
+    """
+    Liest die einzelnen Filme einer Filmsammlung.
+
+    Returns:
+        dict: {'element_count': Anzahl gefundener li-Elemente,
+               'movies': [{'movie_title': ..., 'movie_url_suffix': ...}],
+               'invalid_elements': [HTML der li-Elemente ohne gültigen Link]}
+    """
+    tree = parse_html(html_content)
+    movie_li_elements = find_by_xpath_lxml(tree, ITEMS_XPATH)
+
+    movies = []
+    invalid_elements = []
+    for li in movie_li_elements:
+        # Überspringe strukturelle Elemente wie "Filme:", sie sind keine Film-Links
+        if has_label(li, 'Filme:'):
+            continue
+        a_tag = li.find('.//a')
+        if a_tag is not None and a_tag.get('href'):
+            movies.append({"movie_title": element_text(a_tag), "movie_url_suffix": a_tag.get('href')})
+        else:
+            invalid_elements.append(element_html(li))
+    return {'element_count': len(movie_li_elements), 'movies': movies, 'invalid_elements': invalid_elements}
+
+# --- Schnellpfad für Hoster-Links ---
+# Für die Stream-Links wird nur die Hoster-Liste einer Episodenseite gebraucht. Die Antwort wird
+# blockweise gelesen, bis diese Liste vollständig ist; der Rest der Seite wird nicht mehr geladen.
+# Der Ausschnitt wird per Regex ausgewertet. Fehlt die Liste oder passt die Regex nicht, wird
+# wie bisher die ganze Seite geparst (parse_stream_links).
+
+HOSTER_CHUNK_SIZE = 16 * 1024
+# Ist der ungelesene Rest der Seite höchstens so groß, wird er verworfen statt die Verbindung zu schließen,
+# damit sie per Keep-Alive wiederverwendet werden kann (0 = nie)
+HOSTER_DRAIN_LIMIT = int(os.getenv("HOSTER_DRAIN_LIMIT", str(64 * 1024)))
+HOSTER_BLOCK_START = 'class="hosterSiteVideo'   # Container der Hoster-Liste
+HOSTER_BLOCK_END = '</ul>'                       # Ende der Hoster-Liste (<ul class="row">)
+HOSTER_LINK_PATTERN = re.compile(
+    r'<a\b[^>]*?\shref="([^"]+)"[^>]*>\s*<i\b[^>]*?\sclass="icon\s+([^"\s]+)',
+    re.IGNORECASE
+)
+
+class HosterBlockReader:
+    """
+    Sammelt den Text einer Antwort blockweise, bis die Hoster-Liste vollständig gelesen ist.
+    feed() gibt den Ausschnitt der Hoster-Liste zurück, sobald deren Ende gesehen wurde, sonst None.
+    """
+
+    def __init__(self, encoding: str = "utf-8"):
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.text = ""
+        self.bytes_read = 0
+        self.scan_pos = 0  # Ab hier wird im nächsten Block nach der Markierung gesucht
+        self.start = -1
+        self.fragment = None
+
+    def feed(self, chunk: bytes):
+        self.bytes_read += len(chunk)
+        self.text += self.decoder.decode(chunk)
+
+        if self.start < 0:
+            self.start = self.text.find(HOSTER_BLOCK_START, self.scan_pos)
+            if self.start < 0:
+                self.scan_pos = max(0, len(self.text) - len(HOSTER_BLOCK_START) + 1)
+                return None
+            self.scan_pos = self.start
+
+        end = self.text.find(HOSTER_BLOCK_END, self.scan_pos)
+        if end < 0:
+            self.scan_pos = max(self.start, len(self.text) - len(HOSTER_BLOCK_END) + 1)
+            return None
+
+        # Ausschnitt ab dem öffnenden Tag des Containers bis zum Ende der Liste
+        tag_start = max(0, self.text.rfind("<", 0, self.start))
+        self.fragment = self.text[tag_start:end + len(HOSTER_BLOCK_END)]
+        return self.fragment
+
+    def finish(self) -> str:
+        """Schließt das Dekodieren ab und gibt den gesamten gelesenen Text zurück."""
+        self.text += self.decoder.decode(b"", final=True)
+        return self.text
+
+async def read_hoster_block(response: aiohttp.ClientResponse):
+    """
+    Liest eine Antwort nur so weit, bis die Hoster-Liste vollständig ist.
+
+    Returns:
+        tuple: (Ausschnitt der Hoster-Liste oder None, gelesener Text, gelesene Bytes).
+               Ist der Ausschnitt None, wurde die ganze Seite gelesen.
+    """
+    reader = HosterBlockReader(response.charset or "utf-8")
+    async for chunk in response.content.iter_chunked(HOSTER_CHUNK_SIZE):
+        fragment = reader.feed(chunk)
+        if fragment is not None:
+            if response.content_length is not None and response.content_length - reader.bytes_read <= HOSTER_DRAIN_LIMIT:
+                # Kleinen Rest ungeparst lesen, damit die Verbindung in den Pool zurückgeht
+                await response.content.read()
+            # Sonst wird die Verbindung beim Verlassen von session.get mit dem ungelesenen Rest verworfen
+            return fragment, reader.text, reader.bytes_read
+    return None, reader.finish(), reader.bytes_read
+
+def parse_stream_links_fast(fragment: str, first_vidoza: bool = False):
+    """
+    Wertet den Ausschnitt der Hoster-Liste per Regex aus. 'first_vidoza' siehe pick_stream_links.
+
+    Returns:
+        dict: Wie parse_stream_links, oder None, wenn die Regex keinen Hoster erkennt.
+    """
+    all_stream_services = [
+        {"name": service_name, "href_link": f"{BASE_URL}{href}"}
+        for href, service_name in HOSTER_LINK_PATTERN.findall(fragment)
+    ]
+    if not all_stream_services:
+        return None
+    return pick_stream_links(all_stream_services, first_vidoza)
+
+class HostConcurrencyController:
+    """
+    Regelt die Zahl gleichzeitiger Anfragen je Host nach dem AIMD-Prinzip (additive increase,
+    multiplicative decrease), statt einer festen Grenze von 500 Anfragen:
+
+    - Solange die Antwortzeit nahe an der bisher besten bleibt, wächst das Limit um etwa
+      eine Anfrage pro "Runde" (limit erfolgreiche Antworten).
+    - Timeouts und Verbindungsfehler halbieren das Limit, 429/503 ebenfalls; bei 429/503 pausiert
+      der Host zusätzlich für die Dauer aus Retry-After.
+    - Damit ein Schwall gleichzeitiger Timeouts das Limit nicht auf das Minimum drückt, wird
+      höchstens einmal pro Antwortzeit-Intervall verkleinert.
+    """
+
+    LATENCY_TOLERANCE = 1.5  # Wachstum nur, solange die Antwortzeit < 1,5 x Bestwert ist
+    EWMA_WEIGHT = 0.2        # Gewicht neuer Messungen im gleitenden Mittel der Antwortzeit
+    BASELINE_DRIFT = 1.001   # Bestwert steigt langsam mit, falls der Host dauerhaft langsamer wird
+    DEFAULT_RETRY_AFTER = 2  # Sekunden Pause bei 429/503 ohne Retry-After
+
+    class HostState:
+        def __init__(self, initial_limit):
+            self.limit = float(initial_limit)
+            self.in_flight = 0
+            self.condition = asyncio.Condition()
+            self.latency = None      # gleitendes Mittel der Antwortzeit (Sekunden)
+            self.baseline = None     # bisher beste (gleitende) Antwortzeit
+            self.last_decrease = 0.0
+            self.paused_until = 0.0
+            self.counts = {"ok": 0, "timeout": 0, "error": 0, "throttled": 0}
+
+    def __init__(self, initial_limit=SCRAPER_INITIAL_CONCURRENCY, min_limit=SCRAPER_MIN_CONCURRENCY, max_limit=EPISODE_MAX_CONCURRENT_REQUESTS):
+        self.initial_limit = initial_limit
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max_limit
+        self.hosts = {}
+
+    def state_for(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = self.HostState(min(self.max_limit, max(self.min_limit, self.initial_limit)))
+        return state
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str):
+        """Wartet auf einen freien Platz für den Host der URL und wertet das Ergebnis der Anfrage aus."""
+        host = urlsplit(url).netloc
+        state = self.state_for(host)
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.in_flight < int(state.limit))
+            state.in_flight += 1
+        wait = state.paused_until - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        start = time.monotonic()
+        outcome, retry_after = None, None # None: Ergebnis sagt nichts über die Auslastung aus (z.B. Abbruch)
+        try:
+            yield
+            outcome = "ok"
+        except aiohttp.ClientResponseError as e:
+            if e.status in (429, 503):
+                outcome = "throttled"
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+            else:
+                outcome = "ok" # Andere HTTP-Fehler (z.B. 404) sagen nichts über die Auslastung aus
+            raise
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except aiohttp.ClientError:
+            outcome = "error"
+            raise
+        finally:
+            await self.release(host, state, time.monotonic() - start, outcome, retry_after)
+
+    async def release(self, host, state, latency, outcome, retry_after=None):
+        now = time.monotonic()
+        if outcome is not None:
+            state.counts[outcome] += 1
+        if outcome == "throttled":
+            # Pause gilt auch, wenn das Limit gerade erst verkleinert wurde; fetch_html wiederholt danach
+            try:
+                pause = float(retry_after)
+            except (TypeError, ValueError):
+                pause = self.DEFAULT_RETRY_AFTER
+            state.paused_until = max(state.paused_until, now + pause)
+        if outcome == "ok":
+            state.latency = latency if state.latency is None else (1 - self.EWMA_WEIGHT) * state.latency + self.EWMA_WEIGHT * latency
+            state.baseline = state.latency if state.baseline is None else min(state.baseline * self.BASELINE_DRIFT, state.latency)
+            if state.latency <= state.baseline * self.LATENCY_TOLERANCE and state.limit < self.max_limit:
+                state.limit = min(self.max_limit, state.limit + 1 / state.limit)
+        elif outcome is not None and now - state.last_decrease >= (state.latency or 1.0):
+            old_limit = int(state.limit)
+            state.limit = max(float(self.min_limit), state.limit / 2)
+            state.last_decrease = now
+            logging.info(f"Host {host}: {outcome} -> gleichzeitige Anfragen {old_limit} -> {int(state.limit)}.")
+
+        async with state.condition:
+            state.in_flight -= 1
+            state.condition.notify_all()
+        logging.debug(f"Host {host}: {state.in_flight}/{int(state.limit)} aktive Anfragen.")
+
+    def log_summary(self):
+        for host, state in self.hosts.items():
+            latency = f"{state.latency * 1000:.0f} ms" if state.latency is not None else "-"
+            logging.info(
+                f"Host {host}: Limit am Ende {int(state.limit)}, Antwortzeit {latency}, "
+                f"OK {state.counts['ok']}, Timeouts {state.counts['timeout']}, "
+                f"Fehler {state.counts['error']}, gedrosselt (429/503) {state.counts['throttled']}."
+            )
+
+# Regelt die Parallelität aller Anfragen des Scrapers (siehe fetch_html)
+host_concurrency = HostConcurrencyController()
+
+class MirrorRegistry:
+    """
+    Verwaltet die Mirrors der Seite (MIRROR_URLS) und leitet Anfragen an den schnellsten erreichbaren.
+
+    - check() fragt alle Mirrors parallel an und misst die Antwortzeit; alle MIRROR_CHECK_INTERVAL
+      Sekunden wird im Hintergrund erneut geprüft (maybe_recheck).
+    - Antwortzeiten echter Anfragen fließen über observe() mit ein.
+    - Nach MIRROR_MAX_FAILURES Verbindungsfehlern/Timeouts in Folge gilt ein Mirror bis zum nächsten
+      Health-Check als nicht erreichbar, und current wechselt auf den nächstschnellsten.
+    - rewrite() setzt eine gespeicherte URL eines bekannten Mirrors auf den aktuellen Mirror um.
+    """
+
+    EWMA_WEIGHT = 0.2
+    CHECK_TIMEOUT = aiohttp.ClientTimeout(total=mirrorConfig.MIRROR_CHECK_TIMEOUT)
+
+    def __init__(self, mirror_urls):
+        self.mirrors = {url: {"healthy": True, "latency": None, "failures": 0} for url in mirror_urls}
+        self.primary = mirror_urls[0]
+        self.last_check = 0.0
+        self.check_task = None
+
+    @property
+    def current(self) -> str:
+        """Der schnellste erreichbare Mirror; ohne Messwerte der erste, ohne erreichbaren ebenfalls der erste."""
+        latencies = {
+            url: (state["latency"] if state["latency"] is not None else float("inf")) if state["healthy"] else None
+            for url, state in self.mirrors.items()
+        }
+        return mirrorConfig.fastest_mirror(latencies, self.primary)
+
+    def base_of(self, url: str):
+        """Gibt die Basis-URL zurück, wenn die URL zu einem bekannten Mirror gehört, sonst None."""
+        return mirrorConfig.base_of(url, self.mirrors)
+
+    def rewrite(self, url: str) -> str:
+        """Setzt eine URL eines bekannten Mirrors auf den aktuell gewählten Mirror um."""
+        return mirrorConfig.rewrite_url(url, self.current, self.mirrors)
+
+    def observe(self, base: str, latency: float):
+        state = self.mirrors[base]
+        state["latency"] = latency if state["latency"] is None else (1 - self.EWMA_WEIGHT) * state["latency"] + self.EWMA_WEIGHT * latency
+        state["failures"] = 0
+        state["healthy"] = True
+
+    def report_failure(self, base: str):
+        state = self.mirrors[base]
+        state["failures"] += 1
+        if state["healthy"] and state["failures"] >= MIRROR_MAX_FAILURES:
+            state["healthy"] = False
+            logging.warning(f"Mirror {base} nach {state['failures']} Fehlern nicht erreichbar, wechsle zu {self.current}.")
+
+    async def probe(self, session: aiohttp.ClientSession, base: str):
+        start = time.monotonic()
+        try:
+            async with session.get(f"{base}/", timeout=self.CHECK_TIMEOUT, allow_redirects=False) as response:
+                healthy = response.status < mirrorConfig.MIRROR_UNHEALTHY_STATUS
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.debug(f"Health-Check für Mirror {base} fehlgeschlagen: {e}")
+            healthy = False
+        state = self.mirrors[base]
+        state["healthy"] = healthy
+        if healthy:
+            # Der Health-Check ersetzt den Messwert, damit ein wieder schneller Mirror sofort zählt
+            state["latency"] = time.monotonic() - start
+            state["failures"] = 0
+
+    async def check(self, session: aiohttp.ClientSession):
+        """Prüft alle Mirrors parallel und wählt den schnellsten erreichbaren."""
+        self.last_check = time.monotonic()
+        await asyncio.gather(*(self.probe(session, base) for base in self.mirrors))
+        summary = ", ".join(
+            f"{base} {state['latency'] * 1000:.0f} ms" if state["healthy"] and state["latency"] is not None else f"{base} nicht erreichbar"
+            for base, state in self.mirrors.items()
+        )
+        logging.info(f"Mirror-Check: {summary}. Verwende {self.current}.")
+
+    def maybe_recheck(self, session: aiohttp.ClientSession):
+        """Startet den Health-Check im Hintergrund, wenn der letzte länger als MIRROR_CHECK_INTERVAL her ist."""
+        if len(self.mirrors) < 2 or time.monotonic() - self.last_check < MIRROR_CHECK_INTERVAL:
+            return
+        if self.check_task is None or self.check_task.done():
+            self.last_check = time.monotonic()
+            self.check_task = asyncio.ensure_future(self.check(session))
+
+# Mirror-Auswahl für alle Anfragen des Scrapers (siehe fetch_html)
+mirrors = MirrorRegistry(MIRROR_URLS)
+
+class CacheMiss(aiohttp.ClientError):
+    """Im Replay-Modus liegt für die URL keine Antwort im Cache."""
+
+class CachedResponse:
+    """
+    Stellt einen gespeicherten Antworttext mit der Schnittstelle einer aiohttp-Antwort bereit, die
+    fetch_html und die read-Funktionen (z.B. read_hoster_block) verwenden.
+    """
+
+    def __init__(self, body: bytes, charset=None):
+        self.body = body
+        self.charset = charset
+        self.content_length = len(body)
+        self.position = 0
+        self.content = self # response.content.iter_chunked / response.content.read
+
+    async def iter_chunked(self, size: int):
+        while self.position < len(self.body):
+            chunk = self.body[self.position:self.position + size]
+            self.position += len(chunk)
+            yield chunk
+
+    async def read(self) -> bytes:
+        rest = self.body[self.position:]
+        self.position = len(self.body)
+        return rest
+
+    async def text(self) -> str:
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+class ResponseCache:
+    """
+    Inhaltsadressierter Antwort-Cache auf der Festplatte:
+
+        <CACHE_DIR>/objects/ab/<sha256 des Inhalts>   Antworttext, identische Seiten nur einmal
+        <CACHE_DIR>/urls/cd/<sha256 der URL>.json     URL, Inhalts-Hash, Abrufzeit, ETag, Last-Modified
+
+    Schlüssel ist die URL mit BASE_URL (vor dem Umschreiben auf einen Mirror), damit ein Mirror-Wechsel
+    den Cache nicht entwertet. Einträge innerhalb der TTL werden direkt verwendet, ältere per
+    If-None-Match/If-Modified-Since revalidiert (304 verlängert den Eintrag). Im Replay-Modus wird
+    ausschließlich aus dem Cache gelesen.
+    """
+
+    def __init__(self, directory: str, mode: str):
+        self.directory = directory
+        self.mode = mode
+        self.stats = {"hits": 0, "revalidated": 0, "stored": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("on", "replay")
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    def entry_path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "urls", digest[:2], f"{digest}.json")
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    @staticmethod
+    def write_atomic(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{os.urandom(4).hex()}.tmp" # eindeutig auch bei parallelen Threads
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def load(self, url: str):
+        """Gibt (Metadaten, Inhalt) zurück oder None, wenn die URL nicht (vollständig) im Cache liegt."""
+        try:
+            with open(self.entry_path(url), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+            with open(self.object_path(entry["sha256"]), "rb") as file:
+                body = file.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry, body
+
+    def store(self, url: str, body: bytes, charset=None, etag=None, last_modified=None):
+        digest = hashlib.sha256(body).hexdigest()
+        object_path = self.object_path(digest)
+        if not os.path.exists(object_path):
+            self.write_atomic(object_path, body)
+        entry = {"url": url, "sha256": digest, "fetched_at": time.time(), "charset": charset,
+                 "etag": etag, "last_modified": last_modified}
+        self.write_atomic(self.entry_path(url), json.dumps(entry).encode("utf-8"))
+        return entry
+
+    def touch(self, url: str, entry: dict):
+        """Nach einer 304-Antwort: Eintrag gilt ab jetzt wieder für die volle TTL."""
+        entry = dict(entry, fetched_at=time.time())
+        self.write_atomic(self.entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    @staticmethod
+    def is_fresh(entry: dict, ttl: int) -> bool:
+        return time.time() - entry.get("fetched_at", 0) < ttl
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def log_summary(self):
+        if self.enabled:
+            logging.info(
+                f"Antwort-Cache ({self.mode}, {self.directory}): Treffer {self.stats['hits']}, "
+                f"revalidiert (304) {self.stats['revalidated']}, neu gespeichert {self.stats['stored']}, "
+                f"nicht im Cache {self.stats['misses']}."
+            )
+
+# Antwort-Cache für alle Anfragen des Scrapers (siehe fetch_html)
+response_cache = ResponseCache(CACHE_DIR, CACHE_MODE)
+
+def create_scraper_session() -> aiohttp.ClientSession:
+    """
+    Erstellt die eine HTTP-Session für den ganzen Scraper-Lauf. Connection-Pool, Keep-Alive-Verbindungen
+    und DNS-Cache bleiben so über alle Serien und Staffeln erhalten.
+    SSL-Verifizierung ist wie bisher deaktiviert.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=EPISODE_MAX_CONCURRENT_REQUESTS,
+        limit_per_host=SCRAPER_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ssl=False,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+
+async def consume_response(response, read=None):
+    """Liest eine (echte oder zwischengespeicherte) Antwort mit read oder als ganzen Text."""
+    return await read(response) if read is not None else await response.text()
+
+async def fetch_html(session: aiohttp.ClientSession, url: str, read=None, ttl: int = CACHE_TTL_PAGE):
+    """
+    Ruft eine Seite über die gemeinsame Session ab. Die Zahl gleichzeitiger Anfragen je Host
+    regelt host_concurrency anhand von Antwortzeiten, Timeouts und 429/503.
+    URLs eines bekannten Mirrors werden auf den aktuell schnellsten umgeschrieben; scheitert die
+    Verbindung und ist dadurch ein anderer Mirror an der Reihe, wird dort erneut angefragt.
+    Nach 429/503 wird die Anfrage nach der Pause aus Retry-After bis zu SCRAPER_THROTTLE_RETRIES-mal
+    wiederholt, damit gedrosselte Episoden nicht ohne Link bleiben.
+    Ist der Antwort-Cache aktiv, werden frische Einträge ohne Anfrage verwendet und ältere revalidiert;
+    die Seite wird dann immer vollständig geladen, damit sie gespeichert werden kann.
+
+    Args:
+        session (aiohttp.ClientSession): Die Session aus create_scraper_session.
+        url (str): Die abzurufende URL (mit BASE_URL oder einem anderen bekannten Mirror).
+        read (callable, optional): Liest die Antwort selbst (z.B. read_hoster_block); sonst der ganze Text.
+        ttl (int): Wie lange (Sekunden) ein Cache-Eintrag ohne Revalidierung verwendet wird.
+
+    Returns:
+        Den HTML-Text bzw. das Ergebnis von read. HTTP-Fehler lösen aiohttp.ClientResponseError aus,
+        im Replay-Modus fehlende Cache-Einträge CacheMiss.
+    """
+    cached = None
+    if response_cache.enabled:
+        cached = await asyncio.to_thread(response_cache.load, url)
+        if cached is not None and (response_cache.replay or response_cache.is_fresh(cached[0], ttl)):
+            response_cache.stats["hits"] += 1
+            return await consume_response(CachedResponse(cached[1], cached[0].get("charset")), read)
+        if response_cache.replay:
+            response_cache.stats["misses"] += 1
+            raise CacheMiss(f"Keine Antwort für {url} im Cache ({response_cache.directory}).")
+    headers = response_cache.conditional_headers(cached[0]) if cached is not None else None
+
+    mirrors.maybe_recheck(session)
+    tried = set()
+    throttle_retries = 0
+    while True:
+        target_url = mirrors.rewrite(url)
+        base = mirrors.base_of(target_url)
+        tried.add(base)
+        try:
+            async with host_concurrency.slot(target_url):
+                start = time.monotonic()
+                async with session.get(target_url, timeout=REQUEST_TIMEOUT, headers=headers) as response:
+                    if cached is not None and response.status == 304:
+                        # Seite unverändert: gespeicherten Inhalt verwenden, Eintrag verlängern
+                        response_cache.stats["revalidated"] += 1
+                        await asyncio.to_thread(response_cache.touch, url, cached[0])
+                        result = await consume_response(CachedResponse(cached[1], cached[0].get("charset")), read)
+                    else:
+                        response.raise_for_status() # Löst eine Ausnahme für HTTP-Fehler (4xx oder 5xx) aus
+                        if response_cache.enabled:
+                            body = await response.read()
+                            await asyncio.to_thread(
+                                response_cache.store, url, body, response.charset,
+                                response.headers.get("ETag"), response.headers.get("Last-Modified")
+                            )
+                            response_cache.stats["stored"] += 1
+                            result = await consume_response(CachedResponse(body, response.charset), read)
+                        else:
+                            result = await consume_response(response, read)
+                latency = time.monotonic() - start
+        except aiohttp.ClientResponseError as e:
+            if e.status not in (429, 503) or throttle_retries >= SCRAPER_THROTTLE_RETRIES:
+                raise
+            throttle_retries += 1
+            # host_concurrency.slot wartet vor dem nächsten Versuch die Retry-After-Pause ab
+            logging.info(f"{url} gedrosselt ({e.status}), Wiederholung {throttle_retries}/{SCRAPER_THROTTLE_RETRIES}.")
+            continue
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if base is None:
+                raise
+            mirrors.report_failure(base)
+            if mirrors.current in tried:
+                raise
+            logging.info(f"Wiederhole {url} über Mirror {mirrors.current}.")
+            continue
+        if base is not None:
+            mirrors.observe(base, latency)
+        return result
+
+async def run_parser(parser, *args):
+    """
+    Führt eine Parser-Funktion im Prozess-Pool aus, damit das Parsen den Event-Loop nicht blockiert.
+    Läuft kein Pool (z.B. beim direkten Aufruf einzelner Funktionen), wird direkt geparst.
+    """
+    if parse_executor is None:
+        return parser(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(parse_executor, parser, *args)
+
 async def get_series_structure_async(session: aiohttp.ClientSession, url: str, serie_name: str):
     """
     Ermittelt die Struktur einer Serie (Staffeln und/oder Filme) basierend auf der URL.
-    Diese Funktion verwendet aiohttp, um den HTML-Inhalt abzurufen und lxml für XPath-Abfragen.
+    Diese Funktion verwendet aiohttp, um den HTML-Inhalt abzurufen; geparst wird im Prozess-Pool (parse_series_structure).
 
     Args:
         session (aiohttp.ClientSession): Die aiohttp Client-Session.
@@ -153,21 +1096,16 @@ async def get_series_structure_async(session: aiohttp.ClientSession, url: str, s
         list: Eine Liste von Dictionaries, die die Struktur der Serie beschreiben.
               Beispiel: [{'type': 'season', 'number': 1}, {'type': 'movie_collection', 'url_suffix': '/filme'}]
     """
-    structure_items = []
     try:
-        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-            response.raise_for_status() # Löst eine Ausnahme für HTTP-Fehler (4xx oder 5xx) aus
-            html_content = await response.text()
+        html_content = await fetch_html(session, url, ttl=CACHE_TTL_LISTING)
         
-        soup = BeautifulSoup(html_content, "lxml") # Wichtig: lxml-Parser verwenden
-
         # XPath für Staffeln und Filme in der Navigationsleiste
         # Dies sollte alle li-Elemente unter dem ersten ul im #stream-Div erfassen
-        target_xpath = '//*[@id="stream"]/ul[1]/li' 
+        target_xpath = STRUCTURE_XPATH
         logging.debug(f"Suche Staffeln/Filme mit XPath: '{target_xpath}' auf {url} für Serie {serie_name}.")
-        all_li_elements = find_by_xpath_lxml(soup, target_xpath)
+        structure = await run_parser(parse_series_structure, html_content)
 
-        if not all_li_elements:
+        if not structure['element_count']:
             logging.warning(f"Keine li-Elemente für Staffeln/Filme mit XPath '{target_xpath}' gefunden auf {url} für Serie {serie_name}.")
             global_stats["failed_items_details"].append({
                 "type": "series_structure_xpath_not_found",
@@ -178,36 +1116,12 @@ async def get_series_structure_async(session: aiohttp.ClientSession, url: str, s
             })
             return []
 
-        for li in all_li_elements:
-            a_tag = li.find('a')
-            if a_tag and a_tag.get('href'):
-                href = a_tag.get('href')
-                if "/staffel-" in href:
-                    # Versuchen, die Staffelnummer aus dem Text oder dem href zu extrahieren
-                    season_text = a_tag.get_text(strip=True)
-                    season_number = None
-                    if season_text.isdigit():
-                        season_number = int(season_text)
-                    else:
-                        match = re.search(r'/staffel-(\d+)', href)
-                        if match:
-                            season_number = int(match.group(1))
-                    
-                    if season_number is not None:
-                        structure_items.append({'type': 'season', 'number': season_number})
-                        logging.debug(f"Gefunden: Staffel {season_number} für Serie {serie_name}.")
-                elif "/filme" in href:
-                    structure_items.append({'type': 'movie_collection', 'url_suffix': href})
-                    logging.info(f"Gefunden: 'Filme'-Eintrag für Serie {serie_name} auf {url}.")
-            elif li.find('span', string='Staffeln:'): # Ignoriere das "Staffeln:"-Element
-                logging.debug(f"Ignoriere 'Staffeln:'-Text-Element in Staffelliste für Serie {serie_name}.")
-                continue
+        structure_items = structure['items']
+        for item in structure_items:
+            if item['type'] == 'season':
+                logging.debug(f"Gefunden: Staffel {item['number']} für Serie {serie_name}.")
             else:
-                logging.debug(f"Ungültiges/unerwartetes Strukturelement gefunden: {li.prettify()}")
-        
-        # Sortiere die Staffeln nach ihrer Nummer, um eine konsistente Reihenfolge zu gewährleisten
-        # Filme bleiben an ihrer gefundenen Position relativ zu den Staffeln
-        structure_items.sort(key=lambda x: x['number'] if x['type'] == 'season' else float('inf'))
+                logging.info(f"Gefunden: 'Filme'-Eintrag für Serie {serie_name} auf {url}.")
 
         return structure_items
 
@@ -259,31 +1173,12 @@ async def get_raw_episode_count_async(session: aiohttp.ClientSession, url: str,
         int: Die rohe Anzahl der li-Elemente.
     """
     try:
-        async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-            response.raise_for_status()
-            html_content = await response.text()
+        html_content = await fetch_html(session, url, ttl=CACHE_TTL_LISTING)
         
-        soup = BeautifulSoup(html_content, "lxml")
-
         # XPath für Episoden, um direkt die li-Elemente zu zählen
-        target_xpath = '//*[@id="stream"]/ul[2]/li' 
+        target_xpath = ITEMS_XPATH
         logging.debug(f"Suche Episoden mit XPath: '{target_xpath}' auf {url} für Serie {serie_name}, Staffel {season_num}.")
-        all_li_elements = find_by_xpath_lxml(soup, target_xpath)
-
-        valid_episode_count = 0
-        for li in all_li_elements:
-            a_tag = li.find('a')
-            # Zähle nur li-Elemente, die einen Link zu einer Episode enthalten
-            # Der Link sollte die aktuelle Staffelnummer und eine Episodennummer enthalten
-            if a_tag and a_tag.get('href') and f"/staffel-{season_num}/episode-" in a_tag.get('href'):
-                # Überprüfe, ob der Text des a-Tags eine Zahl ist oder der href eine Episodennummer enthält
-                episode_text = a_tag.get_text(strip=True)
-                if episode_text.isdigit() or re.search(r'/episode-(\d+)', a_tag.get('href')):
-                    valid_episode_count += 1
-                else:
-                    logging.debug(f"Ignoriere nicht-numerisches Episoden-Element oder ungültigen href: {li.prettify()}")
-            else:
-                logging.debug(f"Ignoriere li-Element ohne gültigen Episoden-Link: {li.prettify()}")
+        valid_episode_count = await run_parser(parse_episode_count, html_content, season_num)
 
         if valid_episode_count == 0:
             logging.warning(f"Keine gültigen li-Elemente für Episoden mit XPath '{target_xpath}' gefunden auf {url} für Serie {serie_name}, Staffel {season_num}.")
@@ -340,7 +1235,8 @@ async def fetch_stream_links_async(session: aiohttp.ClientSession, url: str, ser
     """
     Sucht nach verfügbaren Streaming-Diensten für eine TV-Serie Episode oder einen Film mit aiohttp.
     Priorisiert VOE als primären Link, dann Vidoza.
-    Verwendet ein Semaphor, um die Anzahl der gleichzeitigen Anfragen zu begrenzen.
+    Gelesen wird nur bis zum Ende der Hoster-Liste, die per Regex ausgewertet wird (parse_stream_links_fast).
+    Nur wenn das nicht gelingt, wird im Prozess-Pool vollständig geparst.
 
     Args:
         session (aiohttp.ClientSession): Die aiohttp Client-Session.
@@ -352,110 +1248,78 @@ async def fetch_stream_links_async(session: aiohttp.ClientSession, url: str, ser
     Returns:
         dict: Ein Dictionary mit 'primary_link', 'vidoza_link' und 'voe_link' (oder None).
     """
-    global active_requests_counter
-    primary_link = None
-    vidoza_link = None
-    voe_link = None
-    
-    async with request_semaphore: # Erwerbe das Semaphor vor der Anfrage
-        active_requests_counter += 1
-        logging.debug(f"Aktive Anfragen: {active_requests_counter}/{EPISODE_MAX_CONCURRENT_REQUESTS} - Starte Abruf von {url}")
-        try:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                response.raise_for_status() # Löst eine Ausnahme für HTTP-Fehler (4xx oder 5xx) aus
-                html_content = await response.text()
-            
-            soup = BeautifulSoup(html_content, "lxml") # Wichtig: lxml-Parser verwenden
-
-            elements = soup.find_all("i", class_="icon")
-
-            all_stream_services = []
-            for element in elements:
-                class_value = element.get("class")
-                if class_value and len(class_value) > 1:
-                    service_name = class_value[1]
-                    link_element = element.find_parent("a")
-                    if link_element:
-                        href = link_element.get("href")
-                        if href:
-                            full_href = f'{BASE_URL}{href}'
-                            all_stream_services.append({"name": service_name, "href_link": full_href})
-            
-            # Priorisiere VOE als primären Link, dann Vidoza
-            for service in all_stream_services:
-                if "VOE" in service["name"]:
-                    voe_link = service["href_link"]
-                    if primary_link is None:
-                        primary_link = voe_link
-                elif "Vidoza" in service["name"]: 
-                    vidoza_link = service["href_link"]
-                    if primary_link is None:
-                        primary_link = vidoza_link
-            
-            if primary_link is None:
-                logging.debug(f"Kein bevorzugter Streaming-Dienst (VOE oder Vidoza) für {item_type} {item_identifier} von {serie_name} unter {url} gefunden.")
-                # Füge Fehlerdetails hinzu, wenn keine Links gefunden wurden
-                global_stats["failed_items_details"].append({
-                    "type": f"no_stream_links_found_{item_type}",
-                    "series": serie_name,
-                    "item_type": item_type,
-                    "item_identifier": item_identifier,
-                    "url": url,
-                    "error": "Keine bevorzugten Streaming-Links (VOE/Vidoza) gefunden"
-                })
-
-            return {"primary_link": primary_link, "vidoza_link": vidoza_link, "voe_link": voe_link}
-        except aiohttp.ClientError as e:
-            error_type = "network_error"
-            error_msg = f"FEHLER beim Abrufen von Streaming-Diensten mit aiohttp unter {url} für {item_type} {item_identifier}: {e}"
-            logging.error(error_msg)
-            global_stats["failed_items_details"].append({
-                "type": error_type,
-                "series": serie_name,
-                "item_type": item_type,
-                "item_identifier": item_identifier,
-                "url": url,
-                "error": str(e)
-            })
-            return {"primary_link": None, "vidoza_link": None, "voe_link": None}
-        except asyncio.TimeoutError:
-            error_type = "timeout_error"
-            error_msg = f"Timeout beim Abrufen von Streaming-Diensten unter {url} für {item_type} {item_identifier}."
-            logging.error(error_msg)
-            global_stats["failed_items_details"].append({
-                "type": error_type,
-                "series": serie_name,
-                "item_type": item_type,
-                "item_identifier": item_identifier,
-                "url": url,
-                "error": "Timeout"
-            })
-            return {"primary_link": None, "vidoza_link": None, "voe_link": None}
-        except Exception as e:
-            error_type = "parsing_error"
-            error_msg = f"FEHLER beim Parsen von Streaming-Diensten unter {url} für {item_type} {item_identifier}: {e}"
-            logging.error(error_msg, exc_info=True)
+    try:
+        fragment, html_content, bytes_read = await fetch_html(session, url, read=read_hoster_block)
+        
+        # Schnellpfad: nur die Hoster-Liste per Regex auswerten (günstig genug für den Event-Loop)
+        stream_links = parse_stream_links_fast(fragment) if fragment is not None else None
+        if stream_links is None:
+            # Rückfall: Seite (bzw. Ausschnitt) vollständig parsen, im Prozess-Pool
+            logging.debug(f"Hoster-Liste auf {url} nicht per Schnellpfad erkannt ({bytes_read} Bytes gelesen), parse vollständig.")
+            stream_links = await run_parser(parse_stream_links, fragment or html_content)
+        
+        if stream_links["primary_link"] is None:
+            logging.debug(f"Kein bevorzugter Streaming-Dienst (VOE oder Vidoza) für {item_type} {item_identifier} von {serie_name} unter {url} gefunden.")
+            # Füge Fehlerdetails hinzu, wenn keine Links gefunden wurden
             global_stats["failed_items_details"].append({
-                "type": error_type,
+                "type": f"no_stream_links_found_{item_type}",
                 "series": serie_name,
                 "item_type": item_type,
                 "item_identifier": item_identifier,
                 "url": url,
-                "error": str(e)
+                "error": "Keine bevorzugten Streaming-Links (VOE/Vidoza) gefunden"
             })
-            return {"primary_link": None, "vidoza_link": None, "voe_link": None}
-        finally:
-            active_requests_counter -= 1
-            logging.debug(f"Aktive Anfragen: {active_requests_counter}/{EPISODE_MAX_CONCURRENT_REQUESTS} - Abruf von {url} beendet.")
+
+        return stream_links
+    except aiohttp.ClientError as e:
+        error_type = "network_error"
+        error_msg = f"FEHLER beim Abrufen von Streaming-Diensten mit aiohttp unter {url} für {item_type} {item_identifier}: {e}"
+        logging.error(error_msg)
+        global_stats["failed_items_details"].append({
+            "type": error_type,
+            "series": serie_name,
+            "item_type": item_type,
+            "item_identifier": item_identifier,
+            "url": url,
+            "error": str(e)
+        })
+        return {"primary_link": None, "vidoza_link": None, "voe_link": None}
+    except asyncio.TimeoutError:
+        error_type = "timeout_error"
+        error_msg = f"Timeout beim Abrufen von Streaming-Diensten unter {url} für {item_type} {item_identifier}."
+        logging.error(error_msg)
+        global_stats["failed_items_details"].append({
+            "type": error_type,
+            "series": serie_name,
+            "item_type": item_type,
+            "item_identifier": item_identifier,
+            "url": url,
+            "error": "Timeout"
+        })
+        return {"primary_link": None, "vidoza_link": None, "voe_link": None}
+    except Exception as e:
+        error_type = "parsing_error"
+        error_msg = f"FEHLER beim Parsen von Streaming-Diensten unter {url} für {item_type} {item_identifier}: {e}"
+        logging.error(error_msg, exc_info=True)
+        global_stats["failed_items_details"].append({
+            "type": error_type,
+            "series": serie_name,
+            "item_type": item_type,
+            "item_identifier": item_identifier,
+            "url": url,
+            "error": str(e)
+        })
+        return {"primary_link": None, "vidoza_link": None, "voe_link": None}
 
 
-async def get_episode_url_per_season(serien_Name: str, season: int, current_series_index: int, total_series_count: int, existing_episode_links: list):
+async def get_episode_url_per_season(session: aiohttp.ClientSession, serien_Name: str, season: int, current_series_index: int, total_series_count: int, existing_episode_links: list):
     """
     Sammelt alle Episode-Links für eine bestimmte Staffel einer TV-Serie,
     wobei das Suchen der Links für jede Episode parallel erfolgt.
     Berücksichtigt bereits vorhandene Episodenlinks.
 
     Args:
+        session (aiohttp.ClientSession): Die gemeinsame Session des Laufs.
         serien_Name (str): Der Name der Serie.
         season (int): Die Staffelnummer.
         current_series_index (int): Der aktuelle Index der Serie (1-basiert).
@@ -468,85 +1332,81 @@ async def get_episode_url_per_season(serien_Name: str, season: int, current_seri
     
     initial_episode_url = f"{BASE_URL}/serie/stream/{serien_Name}/staffel-{season}/episode-1"
     
-    # Verwende aiohttp.ClientSession für effizientes Connection Pooling
-    # SSL-Verifizierung deaktiviert
-    connector = aiohttp.TCPConnector(limit=EPISODE_MAX_CONCURRENT_REQUESTS, ssl=False)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        # Bestimme die rohe Gesamtanzahl der Episoden für diese Staffel
-        raw_episode_count = await get_raw_episode_count_async(session, initial_episode_url, serien_Name, season)
-        # Wenden Sie die -1 Anpassung hier an, wie vom Benutzer gewünscht
-        total_episodes = max(0, raw_episode_count - 1)
-        
-        if total_episodes == 0:
-            logging.warning(f"Keine Episoden für {serien_Name}, Staffel {season} gefunden. Überspringe.")
-            global_stats["failed_items_details"].append({
-                "type": "season_no_episodes_found",
-                "series": serien_Name,
-                "season": season,
-                "url": initial_episode_url,
-                "error": "Keine Episoden gefunden oder XPath falsch"
-            })
-            return existing_episode_links # Gebe vorhandene Links zurück, wenn keine neuen gefunden werden
+    # Bestimme die rohe Gesamtanzahl der Episoden für diese Staffel
+    raw_episode_count = await get_raw_episode_count_async(session, initial_episode_url, serien_Name, season)
+    # Wenden Sie die -1 Anpassung hier an, wie vom Benutzer gewünscht
+    total_episodes = max(0, raw_episode_count - 1)
+    
+    if total_episodes == 0:
+        logging.warning(f"Keine Episoden für {serien_Name}, Staffel {season} gefunden. Überspringe.")
+        global_stats["failed_items_details"].append({
+            "type": "season_no_episodes_found",
+            "series": serien_Name,
+            "season": season,
+            "url": initial_episode_url,
+            "error": "Keine Episoden gefunden oder XPath falsch"
+        })
+        return existing_episode_links # Gebe vorhandene Links zurück, wenn keine neuen gefunden werden
 
-        logging.info(f"Starte Abruf von {total_episodes} Episoden für Staffel {season} von {serien_Name} (Serie {current_series_index}/{total_series_count}).")
-        
-        tasks = []
-        # Erstelle ein Set der bereits vorhandenen Episodennummern für schnelle Überprüfung
-        existing_episode_numbers = {ep.get('episode_number') for ep in existing_episode_links if isinstance(ep, dict) and 'episode_number' in ep}
+    logging.info(f"Starte Abruf von {total_episodes} Episoden für Staffel {season} von {serien_Name} (Serie {current_series_index}/{total_series_count}).")
+    
+    tasks = []
+    # Erstelle ein Set der bereits vorhandenen Episodennummern für schnelle Überprüfung
+    existing_episode_numbers = {ep.get('episode_number') for ep in existing_episode_links if isinstance(ep, dict) and 'episode_number' in ep}
 
-        for episode in range(1, total_episodes + 1):
-            if episode in existing_episode_numbers:
-                logging.debug(f"Episode {episode} von Staffel {season} für {serien_Name} bereits vorhanden. Überspringe Abruf.")
-                continue # Überspringe, wenn Episode bereits vorhanden ist
+    for episode in range(1, total_episodes + 1):
+        if episode in existing_episode_numbers:
+            logging.debug(f"Episode {episode} von Staffel {season} für {serien_Name} bereits vorhanden. Überspringe Abruf.")
+            continue # Überspringe, wenn Episode bereits vorhanden ist
 
-            url = f"{BASE_URL}/serie/stream/{serien_Name}/staffel-{season}/episode-{episode}"
-            tasks.append(fetch_stream_links_async(session, url, serien_Name, 'episode', episode))
-        
-        if not tasks: # Wenn alle Episoden bereits vorhanden waren
-            logging.info(f"Alle Episoden für Staffel {season} von {serien_Name} bereits vorhanden. Keine neuen Abrufe.")
-            return existing_episode_links
+        url = f"{BASE_URL}/serie/stream/{serien_Name}/staffel-{season}/episode-{episode}"
+        tasks.append(fetch_stream_links_async(session, url, serien_Name, 'episode', episode))
+    
+    if not tasks: # Wenn alle Episoden bereits vorhanden waren
+        logging.info(f"Alle Episoden für Staffel {season} von {serien_Name} bereits vorhanden. Keine neuen Abrufe.")
+        return existing_episode_links
 
-        all_episode_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        successful_fetches = 0
-        failed_fetches = 0
-        temp_episode_results = []
+    all_episode_results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    successful_fetches = 0
+    failed_fetches = 0
+    temp_episode_results = []
+    
+    for i, result in enumerate(all_episode_results):
+        # Versuche, die tatsächliche Episodennummer zu verwenden, sonst den Index
+        episode_num = (result.get('episode_number') if isinstance(result, dict) else None) or (i + 1)
         
-        for i, result in enumerate(all_episode_results):
-            # Versuche, die tatsächliche Episodennummer zu verwenden, sonst den Index
-            episode_num = (result.get('episode_number') if isinstance(result, dict) else None) or (i + 1)
-            
-            if isinstance(result, Exception):
-                logging.error(f"Fehler bei Episode {episode_num} von Staffel {season} für {serien_Name}: {result}")
-                failed_fetches += 1
-                # Fehlerdetails werden bereits in fetch_stream_links_async hinzugefügt
-            elif result and (result["primary_link"] or result["vidoza_link"] or result["voe_link"]):
-                # Füge die episode_number hinzu, die wir in der JSON-Struktur benötigen
-                result['episode_number'] = episode_num # Stellen Sie sicher, dass die Episodennummer im Ergebnis enthalten ist
-                temp_episode_results.append(result)
-                successful_fetches += 1
-            else:
-                # Dies sollte jetzt durch die Fehlerbehandlung in fetch_stream_links_async abgedeckt sein,
-                # aber als Fallback, falls ein Ergebnis ohne Links zurückkommt, das keine Exception war.
-                logging.warning(f"Episode {episode_num} von Staffel {season} für {serien_Name}: Keine Links gefunden (Fallback).")
-                failed_fetches += 1 
-                global_stats["failed_items_details"].append({
-                    "type": "no_stream_links_found_fallback",
-                    "series": serien_Name,
-                    "season": season,
-                    "episode": episode_num,
-                    "url": f"{BASE_URL}/serie/stream/{serien_Name}/staffel-{season}/episode-{episode_num}",
-                    "error": "Keine bevorzugten Streaming-Links (VOE/Vidoza) gefunden (Fallback)"
-                })
+        if isinstance(result, Exception):
+            logging.error(f"Fehler bei Episode {episode_num} von Staffel {season} für {serien_Name}: {result}")
+            failed_fetches += 1
+            # Fehlerdetails werden bereits in fetch_stream_links_async hinzugefügt
+        elif result and (result["primary_link"] or result["vidoza_link"] or result["voe_link"]):
+            # Füge die episode_number hinzu, die wir in der JSON-Struktur benötigen
+            result['episode_number'] = episode_num # Stellen Sie sicher, dass die Episodennummer im Ergebnis enthalten ist
+            temp_episode_results.append(result)
+            successful_fetches += 1
+        else:
+            # Dies sollte jetzt durch die Fehlerbehandlung in fetch_stream_links_async abgedeckt sein,
+            # aber als Fallback, falls ein Ergebnis ohne Links zurückkommt, das keine Exception war.
+            logging.warning(f"Episode {episode_num} von Staffel {season} für {serien_Name}: Keine Links gefunden (Fallback).")
+            failed_fetches += 1 
+            global_stats["failed_items_details"].append({
+                "type": "no_stream_links_found_fallback",
+                "series": serien_Name,
+                "season": season,
+                "episode": episode_num,
+                "url": f"{BASE_URL}/serie/stream/{serien_Name}/staffel-{season}/episode-{episode_num}",
+                "error": "Keine bevorzugten Streaming-Links (VOE/Vidoza) gefunden (Fallback)"
+            })
 
 
-        logging.info(f"Ergebnisse für Staffel {season} von {serien_Name}: Erfolgreich {successful_fetches}/{len(tasks)}, Fehlgeschlagen {failed_fetches}.")
+    logging.info(f"Ergebnisse für Staffel {season} von {serien_Name}: Erfolgreich {successful_fetches}/{len(tasks)}, Fehlgeschlagen {failed_fetches}.")
+    
+    # Kombiniere bestehende und neu gefundene Episodenlinks
+    combined_links = existing_episode_links + temp_episode_results
+    # Die gesammelten Ergebnisse nach episode_number sortieren, um die korrekte Reihenfolge in JSON sicherzustellen
+    links = sorted(combined_links, key=lambda x: x.get('episode_number', 0) if isinstance(x, dict) else 0)
         
-        # Kombiniere bestehende und neu gefundene Episodenlinks
-        combined_links = existing_episode_links + temp_episode_results
-        # Die gesammelten Ergebnisse nach episode_number sortieren, um die korrekte Reihenfolge in JSON sicherzustellen
-        links = sorted(combined_links, key=lambda x: x.get('episode_number', 0) if isinstance(x, dict) else 0)
-            
     logging.info(f"Staffel {season} von {serien_Name} abgeschlossen.")
     
     # Aktualisiere globale Statistiken für Staffeln
@@ -564,11 +1424,12 @@ async def get_episode_url_per_season(serien_Name: str, season: int, current_seri
 
     return links
 
-async def get_movie_collection_details_async(serien_Name: str, movie_collection_url_suffix: str, current_series_index: int, total_series_count: int, existing_movies: list):
+async def get_movie_collection_details_async(session: aiohttp.ClientSession, serien_Name: str, movie_collection_url_suffix: str, current_series_index: int, total_series_count: int, existing_movies: list):
     """
     Sammelt Details und Links für einzelne Filme innerhalb einer Filmsammlung.
 
     Args:
+        session (aiohttp.ClientSession): Die gemeinsame Session des Laufs.
         serien_Name (str): Der Name der Serie.
         movie_collection_url_suffix (str): Der URL-Suffix zur Filmsammlung (z.B. '/serie/stream/one-punch-man/filme').
         current_series_index (int): Der aktuelle Index der Serie (1-basiert).
@@ -581,165 +1442,150 @@ async def get_movie_collection_details_async(serien_Name: str, movie_collection_
     
     full_movie_collection_url = f"{BASE_URL}{movie_collection_url_suffix}"
 
-    # Verwende aiohttp.ClientSession für effizientes Connection Pooling
-    connector = aiohttp.TCPConnector(limit=EPISODE_MAX_CONCURRENT_REQUESTS, ssl=False)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        try:
-            async with session.get(full_movie_collection_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                response.raise_for_status()
-                html_content = await response.text()
-            
-            soup = BeautifulSoup(html_content, "lxml")
-
-            # XPath für einzelne Filme innerhalb der Filmsammlung
-            movie_xpath = '//*[@id="stream"]/ul[2]/li' 
-            # Korrektur hier: Verwende movie_xpath statt target_xpath
-            logging.debug(f"Suche einzelne Filme mit XPath: '{movie_xpath}' auf {full_movie_collection_url} für Serie {serien_Name}.")
-            movie_li_elements = find_by_xpath_lxml(soup, movie_xpath)
-
-            if not movie_li_elements:
-                logging.warning(f"Keine li-Elemente für einzelne Filme mit XPath '{movie_xpath}' gefunden auf {full_movie_collection_url} für Serie {serien_Name}.")
-                global_stats["failed_items_details"].append({
-                    "type": "movie_collection_xpath_not_found",
-                    "series": serien_Name,
-                    "url": full_movie_collection_url,
-                    "xpath": movie_xpath,
-                    "error": "Keine Film-li-Elemente gefunden oder XPath falsch."
-                })
-                return [] # Gebe leere Liste zurück
-
-            tasks = []
-            valid_movies_to_process = [] # Liste zum Speichern von (movie_title, full_movie_url) für gültige Filme
-            
-            # Erstelle ein Set der bereits vorhandenen Filmtitel/URLs für schnelle Überprüfung
-            existing_movie_identifiers = {m.get('movie_title') for m in existing_movies if isinstance(m, dict) and 'movie_title' in m}
-
-            for li in movie_li_elements: # Iteriere direkt über die li-Elemente
-                a_tag = li.find('a')
-                # Überprüfe, ob es sich um ein strukturelles Element wie "Filme:" handelt
-                if li.find('span', string='Filme:'):
-                    logging.debug(f"Ignoriere strukturelles Element 'Filme:' in Filmsammlung für {serien_Name}: {li.prettify()}")
-                    continue # Überspringe dieses Element, da es kein Film-Link ist
-                
-                # Nur verarbeiten, wenn es ein gültiges 'a'-Tag mit 'href' gibt
-                if a_tag and a_tag.get('href'):
-                    movie_title = a_tag.get_text(strip=True)
-                    movie_url_suffix = a_tag.get('href')
-                    full_movie_url = f"{BASE_URL}{movie_url_suffix}"
-
-                    if movie_title in existing_movie_identifiers:
-                        logging.debug(f"Film '{movie_title}' für {serien_Name} bereits vorhanden. Überspringe Abruf.")
-                        continue
-
-                    # Füge den Task und die zugehörigen Filminformationen hinzu
-                    tasks.append(fetch_stream_links_async(session, full_movie_url, serien_Name, 'movie', movie_title))
-                    valid_movies_to_process.append({"movie_title": movie_title, "movie_url": full_movie_url})
-                else:
-                    # Logge das ungültige Element auf DEBUG-Ebene, da es kein Film-Link ist, aber nicht unbedingt ein Fehler
-                    logging.debug(f"Unerwartetes/ungültiges li-Element in Filmsammlung gefunden (kein gültiger Link): {li.prettify()}")
-                    global_stats["failed_items_details"].append({
-                        "type": "invalid_movie_element",
-                        "series": serien_Name,
-                        "url": full_movie_collection_url,
-                        "element_html": li.prettify(),
-                        "error": "Film-Element ohne gültigen Link/Titel."
-                    })
-            
-            if not tasks:
-                logging.info(f"Alle Filme für {serien_Name} bereits vorhanden oder keine neuen gefunden.")
-                return existing_movies # Füge bestehende hinzu
+    try:
+        html_content = await fetch_html(session, full_movie_collection_url, ttl=CACHE_TTL_LISTING)
+        
+        # XPath für einzelne Filme innerhalb der Filmsammlung
+        movie_xpath = ITEMS_XPATH
+        logging.debug(f"Suche einzelne Filme mit XPath: '{movie_xpath}' auf {full_movie_collection_url} für Serie {serien_Name}.")
+        collection = await run_parser(parse_movie_collection, html_content)
 
-            all_movie_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            successful_fetches = 0
-            failed_fetches = 0
-            temp_movie_results = []
-
-            # Nun iteriere unter Verwendung des Index von valid_movies_to_process und all_movie_results
-            for i, result in enumerate(all_movie_results):
-                # Rufe die ursprünglichen Filminformationen mit demselben Index ab
-                original_movie_info = valid_movies_to_process[i]
-                movie_title = original_movie_info["movie_title"]
-                full_movie_url = original_movie_info["movie_url"]
-
-                if isinstance(result, Exception):
-                    logging.error(f"Fehler bei Film '{movie_title}' für {serien_Name}: {result}")
-                    failed_fetches += 1
-                    global_stats["failed_items_details"].append({
-                        "type": "stream_link_fetch_error_movie",
-                        "series": serien_Name,
-                        "item_type": "movie",
-                        "item_identifier": movie_title,
-                        "url": full_movie_url,
-                        "error": str(result)
-                    })
-                elif result and (result["primary_link"] or result["vidoza_link"] or result["voe_link"]):
-                    temp_movie_results.append({
-                        "movie_title": movie_title,
-                        "movie_url": full_movie_url,
-                        "stream_links": result
-                    })
-                    successful_fetches += 1
-                else:
-                    logging.warning(f"Film '{movie_title}' für {serien_Name}: Keine Links gefunden (Fallback).")
-                    failed_fetches += 1 
-                    global_stats["failed_items_details"].append({
-                        "type": "no_stream_links_found_fallback_movie",
-                        "series": serien_Name, 
-                        "item_type": "movie",
-                        "item_identifier": movie_title,
-                        "url": full_movie_url, # URL des einzelnen Films
-                        "error": "Keine bevorzugten Streaming-Links (VOE/Vidoza) gefunden (Fallback)"
-                    })
-
-            logging.info(f"Ergebnisse für Filmsammlung von {serien_Name}: Erfolgreich {successful_fetches}/{len(tasks)}, Fehlgeschlagen {failed_fetches}.")
-            
-            # Kombiniere bestehende und neu gefundene Filme
-            combined_movies = existing_movies + temp_movie_results
-            # Sortiere die Filme nach Titel oder einer anderen Logik, falls nötig
-            movies = sorted(combined_movies, key=lambda x: x.get('movie_title', ''))
-            return movies
-
-        except aiohttp.ClientError as e:
-            error_type = "network_error_movie_collection"
-            error_msg = f"FEHLER beim Abrufen der Filmsammlung {full_movie_collection_url} für {serien_Name}: {e}"
-            logging.error(error_msg)
+        if not collection['element_count']:
+            logging.warning(f"Keine li-Elemente für einzelne Filme mit XPath '{movie_xpath}' gefunden auf {full_movie_collection_url} für Serie {serien_Name}.")
             global_stats["failed_items_details"].append({
-                "type": error_type,
+                "type": "movie_collection_xpath_not_found",
                 "series": serien_Name,
                 "url": full_movie_collection_url,
-                "error": str(e)
+                "xpath": movie_xpath,
+                "error": "Keine Film-li-Elemente gefunden oder XPath falsch."
             })
-            return []
-        except asyncio.TimeoutError:
-            error_type = "timeout_error_movie_collection"
-            error_msg = f"Timeout beim Abrufen der Filmsammlung {full_movie_collection_url} für {serien_Name}."
-            logging.error(error_msg)
-            global_stats["failed_items_details"].append({
-                "type": error_type,
-                "series": serien_Name,
-                "url": full_movie_collection_url,
-                "error": "Timeout"
-            })
-            return []
-        except Exception as e:
-            error_type = "parsing_error_movie_collection"
-            error_msg = f"FEHLER beim Parsen der Filmsammlung {full_movie_collection_url} für {serien_Name}: {e}"
-            logging.error(error_msg, exc_info=True)
+            return [] # Gebe leere Liste zurück
+
+        tasks = []
+        valid_movies_to_process = [] # Liste zum Speichern von (movie_title, full_movie_url) für gültige Filme
+        
+        # Erstelle ein Set der bereits vorhandenen Filmtitel/URLs für schnelle Überprüfung
+        existing_movie_identifiers = {m.get('movie_title') for m in existing_movies if isinstance(m, dict) and 'movie_title' in m}
+
+        for movie in collection['movies']:
+            movie_title = movie['movie_title']
+            full_movie_url = f"{BASE_URL}{movie['movie_url_suffix']}"
+
+            if movie_title in existing_movie_identifiers:
+                logging.debug(f"Film '{movie_title}' für {serien_Name} bereits vorhanden. Überspringe Abruf.")
+                continue
+
+            # Füge den Task und die zugehörigen Filminformationen hinzu
+            tasks.append(fetch_stream_links_async(session, full_movie_url, serien_Name, 'movie', movie_title))
+            valid_movies_to_process.append({"movie_title": movie_title, "movie_url": full_movie_url})
+
+        for invalid_element_html in collection['invalid_elements']:
+            # Logge das ungültige Element auf DEBUG-Ebene, da es kein Film-Link ist, aber nicht unbedingt ein Fehler
+            logging.debug(f"Unerwartetes/ungültiges li-Element in Filmsammlung gefunden (kein gültiger Link): {invalid_element_html}")
             global_stats["failed_items_details"].append({
-                "type": error_type,
+                "type": "invalid_movie_element",
                 "series": serien_Name,
                 "url": full_movie_collection_url,
-                "error": str(e)
+                "element_html": invalid_element_html,
+                "error": "Film-Element ohne gültigen Link/Titel."
             })
-            return []
+        
+        if not tasks:
+            logging.info(f"Alle Filme für {serien_Name} bereits vorhanden oder keine neuen gefunden.")
+            return existing_movies # Füge bestehende hinzu
+
+        all_movie_results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        successful_fetches = 0
+        failed_fetches = 0
+        temp_movie_results = []
+
+        # Nun iteriere unter Verwendung des Index von valid_movies_to_process und all_movie_results
+        for i, result in enumerate(all_movie_results):
+            # Rufe die ursprünglichen Filminformationen mit demselben Index ab
+            original_movie_info = valid_movies_to_process[i]
+            movie_title = original_movie_info["movie_title"]
+            full_movie_url = original_movie_info["movie_url"]
+
+            if isinstance(result, Exception):
+                logging.error(f"Fehler bei Film '{movie_title}' für {serien_Name}: {result}")
+                failed_fetches += 1
+                global_stats["failed_items_details"].append({
+                    "type": "stream_link_fetch_error_movie",
+                    "series": serien_Name,
+                    "item_type": "movie",
+                    "item_identifier": movie_title,
+                    "url": full_movie_url,
+                    "error": str(result)
+                })
+            elif result and (result["primary_link"] or result["vidoza_link"] or result["voe_link"]):
+                temp_movie_results.append({
+                    "movie_title": movie_title,
+                    "movie_url": full_movie_url,
+                    "stream_links": result
+                })
+                successful_fetches += 1
+            else:
+                logging.warning(f"Film '{movie_title}' für {serien_Name}: Keine Links gefunden (Fallback).")
+                failed_fetches += 1 
+                global_stats["failed_items_details"].append({
+                    "type": "no_stream_links_found_fallback_movie",
+                    "series": serien_Name, 
+                    "item_type": "movie",
+                    "item_identifier": movie_title,
+                    "url": full_movie_url, # URL des einzelnen Films
+                    "error": "Keine bevorzugten Streaming-Links (VOE/Vidoza) gefunden (Fallback)"
+                })
+
+        logging.info(f"Ergebnisse für Filmsammlung von {serien_Name}: Erfolgreich {successful_fetches}/{len(tasks)}, Fehlgeschlagen {failed_fetches}.")
+        
+        # Kombiniere bestehende und neu gefundene Filme
+        combined_movies = existing_movies + temp_movie_results
+        # Sortiere die Filme nach Titel oder einer anderen Logik, falls nötig
+        movies = sorted(combined_movies, key=lambda x: x.get('movie_title', ''))
+        return movies
+
+    except aiohttp.ClientError as e:
+        error_type = "network_error_movie_collection"
+        error_msg = f"FEHLER beim Abrufen der Filmsammlung {full_movie_collection_url} für {serien_Name}: {e}"
+        logging.error(error_msg)
+        global_stats["failed_items_details"].append({
+            "type": error_type,
+            "series": serien_Name,
+            "url": full_movie_collection_url,
+            "error": str(e)
+        })
+        return []
+    except asyncio.TimeoutError:
+        error_type = "timeout_error_movie_collection"
+        error_msg = f"Timeout beim Abrufen der Filmsammlung {full_movie_collection_url} für {serien_Name}."
+        logging.error(error_msg)
+        global_stats["failed_items_details"].append({
+            "type": error_type,
+            "series": serien_Name,
+            "url": full_movie_collection_url,
+            "error": "Timeout"
+        })
+        return []
+    except Exception as e:
+        error_type = "parsing_error_movie_collection"
+        error_msg = f"FEHLER beim Parsen der Filmsammlung {full_movie_collection_url} für {serien_Name}: {e}"
+        logging.error(error_msg, exc_info=True)
+        global_stats["failed_items_details"].append({
+            "type": error_type,
+            "series": serien_Name,
+            "url": full_movie_collection_url,
+            "error": str(e)
+        })
+        return []
     
-async def process_single_series(serie_name_raw: str, current_series_index: int, total_series_count: int, existing_series_data: dict = None):
+async def process_single_series(session: aiohttp.ClientSession, serie_name_raw: str, current_series_index: int, total_series_count: int, existing_series_data: dict = None):
     """
     Verarbeitet eine einzelne TV-Serie: sammelt alle Staffeln und Episodenlinks, sowie Filmlinks.
     Berücksichtigt bereits vorhandene Daten für die Serie.
 
     Args:
+        session (aiohttp.ClientSession): Die gemeinsame Session des Laufs.
         serie_name_raw (str): Der Rohname der Serie.
         current_series_index (int): Der aktuelle Index der Serie (1-basiert).
         total_series_count (int): Die Gesamtanzahl der zu verarbeitenden Serien.
@@ -764,10 +1610,8 @@ async def process_single_series(serie_name_raw: str, current_series_index: int,
         logging.info(f"--- Starte Verarbeitung für Serie {current_series_index}/{total_series_count}: {serie_name_raw} ---")
         
         # --- Gesamtstruktur der Serie (Staffeln und Filme) abrufen ---
-        # Erstelle eine temporäre Session für diese einzelne Anfrage
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False)) as session:
-            # get_series_structure_async gibt eine Liste von Struktur-Objekten zurück
-            series_structure = await get_series_structure_async(session, initial_series_url, serie_name_raw)
+        # get_series_structure_async gibt eine Liste von Struktur-Objekten zurück
+        series_structure = await get_series_structure_async(session, initial_series_url, serie_name_raw)
         
         if not series_structure:
             logging.warning(f"Konnte keine Staffeln oder Filme für {serie_name_raw} bestimmen. Überspringe Serienverarbeitung.")
@@ -802,6 +1646,7 @@ async def process_single_series(serie_name_raw: str, current_series_index: int,
                 
                 # get_episode_url_per_season aufrufen und vorhandene Episodenlinks übergeben
                 updated_episode_links = await get_episode_url_per_season(
+                    session,
                     serie_name_formatted, 
                     season, 
                     current_series_index, 
@@ -816,6 +1661,7 @@ async def process_single_series(serie_name_raw: str, current_series_index: int,
                 # get_movie_collection_details_async aufrufen
                 # existing_series_data['film'] enthält die bereits vorhandenen Filme
                 updated_movie_list = await get_movie_collection_details_async(
+                    session,
                     serie_name_formatted, 
                     movie_collection_url_suffix, 
                     current_series_index, 
@@ -859,10 +1705,10 @@ async def main_async():
         logging.info("Keine Seriennamen zum Verarbeiten. Beende.")
         return
 
-    # Bestehende Daten zu Beginn laden
-    all_series_data = load_existing_series_data()
-    # Konvertiere die Liste in ein Dictionary für schnellen Zugriff und einfache Aktualisierung
-    series_data_map = {s['series_name'].replace(" ", "-").lower(): s for s in all_series_data}
+    # Katalog öffnen; beim ersten Lauf wird eine vorhandene all_series_data.json übernommen
+    catalog = CatalogStore(CATALOG_DB)
+    if catalog.is_empty():
+        catalog.import_json(CATALOG_JSON)
 
     total_series_count = len(serien_Names)
     global_stats["total_series_processed_successfully"] = 0
@@ -872,40 +1718,58 @@ async def main_async():
 
     logging.info(f"Starte Verarbeitung von insgesamt {total_series_count} Serien.")
 
-    # Jede Serie sequentiell verarbeiten
-    for i, serie_raw in enumerate(serien_Names, 1):
-        serie_formatted = serie_raw.strip().replace(" ", "-").lower()
-        
-        # Prüfen, ob die Serie bereits in den geladenen Daten existiert
-        existing_series_entry = series_data_map.get(serie_formatted)
-
-        if existing_series_entry:
-            # Wir werden die Serie nicht mehr komplett überspringen, sondern versuchen, sie zu aktualisieren.
-            logging.info(f"Serie '{serie_raw}' (Serie {i}/{total_series_count}) existiert bereits in 'all_series_data.json'. Versuche Aktualisierung.")
-            # Die Zählung der übersprungenen Serien ist hier nicht mehr ganz zutreffend,
-            # da wir sie nicht komplett überspringen, sondern aktualisieren.
-            # global_stats["total_series_skipped"] += 1 # Entfernt, da wir nicht mehr komplett überspringen
+    # Prozess-Pool für das Parsen der Seiten, damit alle CPU-Kerne genutzt werden
+    global parse_executor
+    parse_executor = concurrent.futures.ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    logging.info(f"HTML-Parsing läuft in {PARSE_WORKERS} Prozessen.")
+    # Eine Session für den ganzen Lauf (TLS-Aufbau, DNS-Auflösung und Keep-Alive werden geteilt)
+    session = create_scraper_session()
+    if response_cache.replay:
+        logging.info(f"Replay-Modus: alle Seiten kommen aus dem Antwort-Cache {CACHE_DIR}, keine Anfragen an die Seite.")
+    else:
+        await mirrors.check(session)
+
+    try:
+        # Jede Serie sequentiell verarbeiten
+        for i, serie_raw in enumerate(serien_Names, 1):
+            # Prüfen, ob die Serie bereits im Katalog existiert (Index auf dem Serien-Schlüssel)
+            existing_series_entry = catalog.load_series(serie_raw)
+
+            if existing_series_entry:
+                # Wir werden die Serie nicht mehr komplett überspringen, sondern versuchen, sie zu aktualisieren.
+                logging.info(f"Serie '{serie_raw}' (Serie {i}/{total_series_count}) existiert bereits im Katalog. Versuche Aktualisierung.")
+                # Die Zählung der übersprungenen Serien ist hier nicht mehr ganz zutreffend,
+                # da wir sie nicht komplett überspringen, sondern aktualisieren.
+                # global_stats["total_series_skipped"] += 1 # Entfernt, da wir nicht mehr komplett überspringen
             
-        result = await process_single_series(serie_raw, i, total_series_count, existing_series_entry)
+            result = await process_single_series(session, serie_raw, i, total_series_count, existing_series_entry)
         
-        if result:
-            # Aktualisiere den Eintrag in der Map
-            series_data_map[serie_formatted] = result
-        else:
-            logging.warning(f"process_single_series für '{serie_raw}' hat unerwartet None zurückgegeben. Diese Seriendaten werden nicht gespeichert.")
-            # Fehlerstatistik wird bereits in process_single_series aktualisiert
-
-        # Speichere den Fortschritt nach jeder Serie
-        write_json_file(list(series_data_map.values()), "all_series_data.json")
-
-        # Optional: Eine kurze Pause zwischen den Serien, um das System zu entlasten
-        time.sleep(2) # 2 Sekunden Pause zwischen den Serien
+            if result:
+                # Speichere den Fortschritt nach jeder Serie: nur die Zeilen dieser Serie
+                catalog.upsert_series(result)
+            else:
+                logging.warning(f"process_single_series für '{serie_raw}' hat unerwartet None zurückgegeben. Diese Seriendaten werden nicht gespeichert.")
+                # Fehlerstatistik wird bereits in process_single_series aktualisiert
+
+            # Optional: Eine kurze Pause zwischen den Serien, um das System zu entlasten
+            time.sleep(2) # 2 Sekunden Pause zwischen den Serien
+    finally:
+        await session.close()
+        parse_executor.shutdown()
+        parse_executor = None
+        # JSON-Export für die bisherigen Leser des Katalogs, einmal pro Lauf
+        catalog.export_json(CATALOG_JSON)
+        if CATALOG_JSONL:
+            catalog.export_jsonl(CATALOG_JSONL)
+        catalog.close()
 
     end_time_overall = time.time()
     total_duration = end_time_overall - start_time_overall
 
     logging.info("=" * 50)
     logging.info("Scraping-Vorgang abgeschlossen!")
+    host_concurrency.log_summary()
+    response_cache.log_summary()
     logging.info(f"Gesamtzeit: {total_duration:.2f} Sekunden")
     logging.info(f"Gesamtanzahl Serien in Liste: {total_series_count}")
     logging.info(f"Erfolgreich verarbeitete Serien: {global_stats['total_series_processed_successfully']}")
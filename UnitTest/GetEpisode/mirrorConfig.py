@@ -0,0 +1,43 @@
+"""
+Gemeinsame Mirror-Konfiguration für den Scraper (getEpisodesURL.py) und den Orchestrator
+(startEeasySubprocess.py). Ohne Abhängigkeiten, damit beide Container das Modul laden können.
+"""
+
+import os
+from urllib.parse import urlsplit
+
+# Links im Katalog werden immer mit dieser URL gespeichert; welcher Mirror tatsächlich angefragt wird,
+# entscheidet erst der Abruf.
+BASE_URL = "https://186.2.175.5"
+# Alternative Basis-URLs derselben Seite (kommagetrennt), aus denen der schnellste erreichbare gewählt wird
+MIRROR_URLS = [u.strip().rstrip("/") for u in os.getenv("MIRROR_URLS", f"{BASE_URL},https://s.to,https://serienstream.to").split(",") if u.strip()]
+if BASE_URL not in MIRROR_URLS:
+    MIRROR_URLS.append(BASE_URL) # Gespeicherte Links verwenden BASE_URL und müssen umschreibbar bleiben
+MIRROR_CHECK_INTERVAL = int(os.getenv("MIRROR_CHECK_INTERVAL", "300")) # Sekunden zwischen zwei Health-Checks
+# Antwortzeit-Grenze eines Health-Checks und Statuscodes, ab denen ein Mirror als nicht erreichbar gilt
+MIRROR_CHECK_TIMEOUT = 5
+MIRROR_UNHEALTHY_STATUS = 500
+
+
+def base_of(url: str, mirror_urls=MIRROR_URLS):
+    """Gibt die Basis-URL zurück, wenn die URL zu einem bekannten Mirror gehört, sonst None."""
+    parts = urlsplit(url)
+    base = f"{parts.scheme}://{parts.netloc}"
+    return base if base in mirror_urls else None
+
+
+def rewrite_url(url: str, current: str, mirror_urls=MIRROR_URLS) -> str:
+    """Setzt eine URL eines bekannten Mirrors auf den Mirror 'current' um."""
+    base = base_of(url, mirror_urls)
+    if base is None:
+        return url
+    return current + url[len(base):]
+
+
+def fastest_mirror(latencies: dict, fallback: str = MIRROR_URLS[0]) -> str:
+    """
+    Wählt aus {Mirror: Antwortzeit oder None} den schnellsten erreichbaren Mirror;
+    bei gleichen Werten zählt die Reihenfolge in MIRROR_URLS, ohne erreichbaren gilt 'fallback'.
+    """
+    reachable = [(latency, index, base) for index, (base, latency) in enumerate(latencies.items()) if latency is not None]
+    return min(reachable)[2] if reachable else fallback
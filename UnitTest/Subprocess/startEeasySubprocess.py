@@ -1,18 +1,113 @@
 import asyncio
+import itertools
 import json
-import random
-import subprocess
+import os
+import signal
 import sys
+import time
 
-semaphore = asyncio.Semaphore(4)  # Limit concurrent tasks to 4
+import requests
+import urllib3
 
+# Mirror-Liste und -Auswahl teilt sich der Orchestrator mit dem Scraper (UnitTest/GetEpisode/mirrorConfig.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "GetEpisode"))
 
-def load_json_data(filename):
-    print("Loading JSON data...")
-    with open(filename, 'r') as file:
-        data = json.load(file)
-    print("JSON data loaded successfully.")
-    return data
+from mirrorConfig import (
+    MIRROR_CHECK_INTERVAL,
+    MIRROR_CHECK_TIMEOUT,
+    MIRROR_UNHEALTHY_STATUS,
+    MIRROR_URLS,
+    fastest_mirror,
+    rewrite_url,
+)
+
+MERGE_SPOOL_DIR = os.getenv("MERGE_SPOOL_DIR", "/app/serien/.merge-queue")
+MANIFEST_DIR = os.getenv("CAPTURE_MANIFEST_DIR", "/app/serien/.pipeline")
+CAPTURE_WORKERS = int(os.getenv("CAPTURE_WORKERS", "4"))  # Browser-Sessions (SE_NODE_MAX_SESSIONS)
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "4"))  # parallele Episoden-Downloads
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))  # Puffer zwischen den Stufen
+MERGE_BACKLOG_LIMIT = int(os.getenv("MERGE_BACKLOG_LIMIT", "8"))  # max. wartende Merge-Aufträge
+MAX_EPISODES = int(os.getenv("MAX_EPISODES", "0"))  # 0 = alle Episoden
+
+
+def env_flag(name):
+    return os.getenv(name, "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+# Optionale Funktionen von VOE.py, per Umgebungsvariable eingeschaltet (siehe docker-compose.yml)
+PROXY_POOL_ARGS = ["--proxy-pool"] if env_flag("PROXY_POOL") else []  # Browser und Segment-Downloads
+CAPTURE_ARGS = PROXY_POOL_ARGS + [
+    flag
+    for flag, enabled in (
+        ("--lean-profile", env_flag("LEAN_PROFILE")),  # nutzt ADLISTS_PATH
+        ("--warm-profile", env_flag("WARM_PROFILE")),  # nutzt PROFILE_STORE_DIR / BROWSER_CACHE_DIR
+        ("--cdp-capture", env_flag("CDP_CAPTURE")),
+    )
+    if enabled
+]
+if os.getenv("ACCELERATED"):  # 'rate', 'seek' oder 'both'
+    CAPTURE_ARGS += ["--accelerated", os.getenv("ACCELERATED")]
+DOWNLOAD_ARGS = PROXY_POOL_ARGS
+# Katalog als JSON-Array (all_series_data.json) oder JSON Lines (eine Serie pro Zeile)
+CATALOG_FILE = os.getenv("CATALOG_FILE", "/app/src/UnitTest/Subprocess/all_series_data.json")
+CATALOG_READ_SIZE = 64 * 1024  # Bytes pro Lesevorgang beim Streamen des Katalogs
+# Nur diese Serien/Staffeln laden, z.B. SERIES_FILTER="Rick and Morty,Dark" SEASON_FILTER="1,2" (leer = alle)
+SERIES_FILTER = {s.strip().replace(" ", "-").lower() for s in os.getenv("SERIES_FILTER", "").split(",") if s.strip()}
+SEASON_FILTER = {int(s) for s in os.getenv("SEASON_FILTER", "").split(",") if s.strip()}
+
+# 'lock' wird in main() angelegt (asyncio.Lock muss zur laufenden Event-Loop gehören)
+mirror_state = {"current": MIRROR_URLS[0], "checked": 0.0, "lock": None}
+
+
+def iter_catalog(filename, series_filter=None, season_filter=None):
+    """
+    Liest den Katalog Serie für Serie, ohne die ganze Datei zu laden: ein JSON-Array wird
+    blockweise gelesen und jedes Element einzeln per raw_decode dekodiert, JSON Lines zeilenweise.
+    Serien- und Staffelfilter greifen direkt beim Lesen, im Speicher liegt höchstens eine Serie.
+    """
+    decoder = json.JSONDecoder()
+
+    def wanted(serie):
+        if series_filter and serie["series_name"].strip().replace(" ", "-").lower() not in series_filter:
+            return None
+        if season_filter:
+            serie["seasons"] = [season for season in serie["seasons"] if season["season_number"] in season_filter]
+        return serie
+
+    with open(filename, "r", encoding="utf-8") as file:
+        buffer = file.read(CATALOG_READ_SIZE).lstrip()
+        if not buffer.startswith("["):
+            # JSON Lines: eine Serie pro Zeile; der erste Block endet meist mitten in einer Zeile
+            for line in itertools.chain((buffer + file.readline()).splitlines(), file):
+                if line.strip():
+                    serie = wanted(json.loads(line))
+                    if serie is not None:
+                        yield serie
+            return
+
+        position = 1
+        eof = False
+        while True:
+            # Trennzeichen zwischen den Elementen überspringen
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                serie, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Element noch unvollständig: verbrauchten Teil verwerfen und nachlesen
+                chunk = file.read(CATALOG_READ_SIZE)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            position = end
+            serie = wanted(serie)
+            if serie is not None:
+                yield serie
 
 async def get_series_data(serien):
     for serie in serien:
@@ -24,14 +119,47 @@ async def get_series_data(serien):
             for episode in season["episode_links"]:
                 # all Episodes
                 episode_links = episode
-                #await asyncio.sleep(random.uniform(2,5))  # Simulate processing time
                 yield {
                     "title": title,
                     "season_number": season_number,
                     "episode_links": episode_links
                 }
 
-async def create_task(agent_name, data):
+def probe_mirror(base):
+    """Antwortzeit des Mirrors in Sekunden oder None, wenn er nicht erreichbar ist."""
+    start = time.monotonic()
+    try:
+        response = requests.get(f"{base}/", timeout=MIRROR_CHECK_TIMEOUT, allow_redirects=False, verify=False)
+    except requests.RequestException:
+        return None
+    return time.monotonic() - start if response.status_code < MIRROR_UNHEALTHY_STATUS else None
+
+
+async def refresh_mirror():
+    """
+    Wählt höchstens alle MIRROR_CHECK_INTERVAL Sekunden den schnellsten erreichbaren Mirror neu.
+    Der Check läuft unter einem Lock: Worker, die währenddessen eine Episode starten wollen, warten
+    auf das Ergebnis, statt mit dem alten Mirror weiterzumachen.
+    """
+    if len(MIRROR_URLS) < 2:
+        return
+    async with mirror_state["lock"]:
+        if time.monotonic() - mirror_state["checked"] < MIRROR_CHECK_INTERVAL:
+            return
+        latencies = await asyncio.gather(*(asyncio.to_thread(probe_mirror, base) for base in MIRROR_URLS))
+        latencies = dict(zip(MIRROR_URLS, latencies))
+        mirror_state["current"] = fastest_mirror(latencies, mirror_state["current"])
+        mirror_state["checked"] = time.monotonic()
+        reachable = sum(1 for latency in latencies.values() if latency is not None)
+        print(f"Mirror check: using {mirror_state['current']} ({reachable}/{len(MIRROR_URLS)} reachable).")
+
+
+def rewrite_link(link):
+    """Setzt einen gespeicherten Link eines bekannten Mirrors auf den aktuell gewählten Mirror um."""
+    return rewrite_url(link, mirror_state["current"])
+
+
+async def create_task(agent_name, data, *stage_args):
     print(
         f"Creating task for {data['title']} Season {data['season_number']} Episode {data['episode_links']['episode_number']} with {agent_name}..."
     )
@@ -40,43 +168,118 @@ async def create_task(agent_name, data):
         sys.executable,
         "/app/src/downloader/VOE.py",
         agent_name,
-        data["episode_links"]["primary_link"],
+        rewrite_link(data["episode_links"]["primary_link"]),
         f"/app//serien/{serienTitle}/Season-{data['season_number']}/",
+        "--merge-queue",
+        MERGE_SPOOL_DIR,
+        *stage_args,
     )
-async def start_task(agent_name, task):
-    print(f"{agent_name}: Waiting for semaphore...")  # Klarere Ausgabe
-    async with semaphore:
-        print(f"{agent_name}: Acquired semaphore, starting task...")
-        await asyncio.create_task(task)
-        print(f"{agent_name}: Task completed.")
-    
-    return f"Task completed by {agent_name}."
+
+
+async def start_merge_worker():
+    """Startet den Merge-Worker, der die Merges aller Agents getrennt von den Browser-Sessions ausführt."""
+    print(f"Starting merge worker for spool {MERGE_SPOOL_DIR}...")
+    return await asyncio.create_subprocess_exec(
+        sys.executable,
+        "/app/src/downloader/mergeWorker.py",
+        MERGE_SPOOL_DIR,
+    )
+
+
+def pending_merge_jobs():
+    """Anzahl der noch nicht abgeholten Merge-Aufträge im Spool."""
+    try:
+        return sum(1 for name in os.listdir(MERGE_SPOOL_DIR) if name.endswith(".json"))
+    except FileNotFoundError:
+        return 0
+
+
+async def capture_worker(worker_id, episode_queue, download_queue):
+    """
+    Stufe 1 (Browser): erfasst Episoden mit 'VOE.py --stage capture'. Ist die Download-Queue voll,
+    wartet der Worker mit dem Einreihen und belegt dabei keine Browser-Session.
+    """
+    while True:
+        item = await episode_queue.get()
+        if item is None:
+            break
+        agent_name, data = item
+        await refresh_mirror()
+        manifest = os.path.join(MANIFEST_DIR, f"{agent_name}.json")
+        # Ein Manifest aus einem abgebrochenen früheren Lauf darf nicht als Ergebnis dieser Erfassung gelten
+        if os.path.exists(manifest):
+            os.remove(manifest)
+        process = await create_task(agent_name, data, "--stage", "capture", "--manifest", manifest, *CAPTURE_ARGS)
+        await process.wait()
+        if process.returncode == 0 and os.path.exists(manifest):
+            await download_queue.put((agent_name, data, manifest))
+        else:
+            print(f"[Capture-{worker_id}] {agent_name}: capture failed (exit code {process.returncode}).")
+
+
+async def download_worker(worker_id, download_queue):
+    """
+    Stufe 2 (Netzwerk): lädt die Segmente aus dem Capture-Manifest und reiht den Merge ein.
+    Liegen zu viele Merge-Aufträge im Spool, wartet der Worker, bis der Merge-Worker aufholt.
+    """
+    while True:
+        item = await download_queue.get()
+        if item is None:
+            break
+        agent_name, data, manifest = item
+        while pending_merge_jobs() >= MERGE_BACKLOG_LIMIT:
+            await asyncio.sleep(5)
+        process = await create_task(agent_name, data, "--stage", "download", "--manifest", manifest, *DOWNLOAD_ARGS)
+        await process.wait()
+        os.remove(manifest)
+        print(f"[Download-{worker_id}] {agent_name}: done (exit code {process.returncode}).")
 
 
 async def main():
-    filename = "/app/src/UnitTest/Subprocess/all_series_data.json"
-    serien = load_json_data(filename)
+    serien = iter_catalog(CATALOG_FILE, SERIES_FILTER, SEASON_FILTER)
+    if SERIES_FILTER or SEASON_FILTER:
+        print(f"Catalog filter: series {sorted(SERIES_FILTER) or 'all'}, seasons {sorted(SEASON_FILTER) or 'all'}.")
 
     print("Starting to process series data...\n")
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    mirror_state["lock"] = asyncio.Lock()
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    merge_worker = await start_merge_worker()
+
+    # Stufe 3 (CPU/Festplatte) ist der Merge-Worker; zwischen den Stufen liegen begrenzte Queues
+    episode_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    download_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    capture_workers = [
+        asyncio.create_task(capture_worker(i + 1, episode_queue, download_queue)) for i in range(CAPTURE_WORKERS)
+    ]
+    download_workers = [
+        asyncio.create_task(download_worker(i + 1, download_queue)) for i in range(DOWNLOAD_WORKERS)
+    ]
+    print(f"Pipeline: {CAPTURE_WORKERS} capture, {DOWNLOAD_WORKERS} download workers, merge spool {MERGE_SPOOL_DIR}.")
+    print(f"Capture options: {' '.join(CAPTURE_ARGS) or 'none'}; download options: {' '.join(DOWNLOAD_ARGS) or 'none'}.")
 
-    tasks = []
     process_id = 0
-    print(f"Creating tasks for {len(serien)} series...")
+    print(f"Streaming episodes from {CATALOG_FILE}...")
     async for serie in get_series_data(serien):
         process_id += 1
         agent_name = f"Agent-{process_id}"
 
         print(f"[{agent_name}] - Processing {serie['title']} Season {serie['season_number']} Episode {serie['episode_links']['episode_number']}...")
-        tasks.append(await asyncio.create_task(create_task(agent_name, serie)))
+        await episode_queue.put((agent_name, serie))
 
-        print(tasks)
-        
-        await asyncio.sleep(10)
-        
-        if process_id == 1:
+        if MAX_EPISODES and process_id >= MAX_EPISODES:
             break
-        
-    await tasks[0].wait()  # Wait for the first task to complete
+
+    for _ in capture_workers:
+        await episode_queue.put(None)
+    await asyncio.gather(*capture_workers)
+    for _ in download_workers:
+        await download_queue.put(None)
+    await asyncio.gather(*download_workers)
+
+    # SIGTERM: der Merge-Worker arbeitet die eingereihten Aufträge noch ab und beendet sich dann
+    merge_worker.send_signal(signal.SIGTERM)
+    await merge_worker.wait()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,10 @@
 import os
 import sys
+import fcntl
+import base64
+import hashlib
+import struct
+import shutil
 import requests
 import time
 import subprocess
@@ -21,6 +26,11 @@ from selenium.common.exceptions import (
     StaleElementReferenceException,
 )
 import concurrent.futures
+import collections
+import threading
+import random
+import asyncio
+import numpy as np
 import httpx
 from bs4 import BeautifulSoup
 import logging
@@ -29,6 +39,7 @@ from urllib.parse import urljoin, urlparse
 # --- Konfiguration ---
 DEFAULT_TIMEOUT = 60  # Timeout für das Warten auf Elemente
 VIDEO_START_TIMEOUT = 120  # Spezifischer Timeout für den Video-Start-Versuch
+M3U8_BASE_DIR = "/app/Logs/m3u8_files"  # Playlists ohne Capture-Manifest landen in einem Unterordner pro Agent
 
 
 # --- Hilfsfunktionen ---
@@ -63,28 +74,56 @@ def get_unique_filename(base_path, extension):
         new_filepath = f"{base_path}_{counter}.{extension}"
     return new_filepath
 
-def download_file(url, filename, directory):
-    """Lädt eine Datei herunter und speichert sie im angegebenen Verzeichnis."""
-    filepath = os.path.join(directory, filename)
-    os.makedirs(directory, exist_ok=True)
-    if os.path.exists(filepath):
-        log(
-            f"Datei '{filename}' existiert bereits in '{directory}'. Überspringe Download."
-        )
-        return filepath
+class DownloadAborted(Exception):
+    """Ein Download wurde wegen Fristüberschreitung oder Abbruch (verlorenes Hedging-Rennen) beendet."""
+
 
-    log(f"Lade '{filename}' von '{url}' herunter...")
+def fetch_to_file(url, filepath, proxy=None, timeout=None, deadline=None, cancel_event=None):
+    """
+    Lädt eine URL nach 'filepath'. Geschrieben wird zuerst in eine .part-Datei, die erst nach
+    vollständigem Download umbenannt wird, damit abgebrochene Downloads nicht als fertig gelten.
+    'deadline' (time.monotonic()) und 'cancel_event' werden zwischen den Chunks geprüft.
+    Ausnahmen von requests werden weitergereicht. Gibt die Anzahl der Bytes zurück.
+    """
+    temp_path = f"{filepath}.{threading.get_ident()}.part"
+    written = 0
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        with open(filepath, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        log(f"'{filename}' erfolgreich heruntergeladen nach '{filepath}'.")
-        return filepath
-    except requests.exceptions.RequestException as e:
-        log(f"FEHLER beim Herunterladen von '{filename}': {e}", "error")
-        return None
+        with requests.get(
+            url, stream=True, proxies=ProxyPool.requests_proxies(proxy), timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            with open(temp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise DownloadAborted("abgebrochen")
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise DownloadAborted("Frist überschritten")
+                    f.write(chunk)
+                    written += len(chunk)
+        os.replace(temp_path, filepath)
+        return written
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def classify_download_error(error):
+    """
+    Ordnet einen Downloadfehler einer Fehlerklasse zu:
+    'token_expired' (401/403/410, signierte URL abgelaufen), 'not_found' (404),
+    'throttled' (429/503) oder 'network' (Timeouts, Verbindungsfehler, Sonstiges).
+    Gibt (Klasse, Retry-After in Sekunden oder None) zurück.
+    """
+    response = getattr(error, "response", None)
+    status = response.status_code if response is not None else None
+    if status in (401, 403, 410):
+        return "token_expired", None
+    if status == 404:
+        return "not_found", None
+    if status in (429, 503):
+        retry_after = response.headers.get("Retry-After", "")
+        return "throttled", float(retry_after) if retry_after.isdigit() else None
+    return "network", None
 
 
 def get_unique_directory_name(base_path):
@@ -105,6 +144,261 @@ def clean_filename(filename: str) -> str:
         filename = filename[:-4]
     return filename
 
+
+def is_video_segment_url(url: str) -> bool:
+    """Prüft, ob eine URL auf ein Videosegment oder ein DASH/FMP4-Manifest zeigt."""
+    return bool(
+        ".ts" in url
+        or ".m4s" in url
+        or ".mp4" in url
+        and "segment" in url  # Erkennung für MP4 Segmente
+        or "seg-" in url
+        or ".mpd" in url  # DASH Manifeste
+        # or ".m3u8" in url # HLS Manifeste
+        or re.search(r"\/\d+\.ts", url)
+        or re.search(r"chunk-\d+\.m4s", url)
+        or re.search(r"manifest\.fmp4", url)  # Beispiel für FMP4 Manifest
+        or re.search(r"\.mpd\b", url)  # Genauere Erkennung von .mpd als Endung
+        # or re.search(r'\.m3u8\b', url) # Genauere Erkennung von .m3u8 als Endung
+    )
+
+
+def segment_identity(url):
+    """
+    Liefert die Identität eines Segments als (Rendition, Sequenznummer).
+    Die Rendition ist der URL-Pfad ohne Host und Query, in dem die Sequenznummer durch '{n}'
+    ersetzt ist. Dasselbe Segment mit anderem Token oder von einem anderen CDN-Host hat
+    damit dieselbe Identität. Ohne erkennbare Sequenznummer ist diese None.
+    """
+    path = urlparse(url).path
+    directory, filename = os.path.split(path)
+    match = re.search(r"(?:seg|chunk|segment)-(\d+)", filename) or re.match(r"(\d+)\.", filename)
+    if match:
+        start, end = match.span(1)
+    else:
+        numbers = list(re.finditer(r"\d+", filename))
+        if not numbers:
+            return path, None
+        start, end = numbers[-1].span()
+    return f"{directory.rstrip('/')}/{filename[:start]}{{n}}{filename[end:]}", int(filename[start:end])
+
+
+def segment_index_from_url(url):
+    """
+    Ermittelt die Sequenznummer eines Segments aus dem Dateinamen
+    (z.B. 'seg-12-v1-a1.ts', 'chunk-12.m4s', '/12.ts'). Gibt None zurück, wenn keine gefunden wird.
+    """
+    return segment_identity(url)[1]
+
+
+def parse_m3u8_playlist(filepath, playlist_url):
+    """
+    Liest eine lokal gespeicherte HLS-Media-Playlist.
+    Gibt eine Liste von Dictionaries mit 'url', 'index', 'start' und 'duration' zurück,
+    wobei relative Segment-URLs gegen die Playlist-URL aufgelöst werden.
+    """
+    segments = []
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+    except OSError as e:
+        log(f"FEHLER beim Lesen der Playlist '{filepath}': {e}", "error")
+        return segments
+
+    media_sequence = 0
+    duration = 0.0
+    start = 0.0
+    for line in lines:
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            media_sequence = int(line.split(":", 1)[1] or 0)
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",")[0] or 0)
+        elif line and not line.startswith("#"):
+            segment_url = urljoin(playlist_url, line)
+            index = segment_index_from_url(segment_url)
+            segments.append(
+                {
+                    "url": segment_url,
+                    "index": index if index is not None else media_sequence + len(segments),
+                    "start": start,
+                    "duration": duration,
+                }
+            )
+            start += duration
+            duration = 0.0
+    return segments
+
+
+def parse_m3u8_init_segment(filepath, playlist_url):
+    """
+    Liefert die URL des Initialisierungssegments ('#EXT-X-MAP:URI=...') einer fMP4/CMAF-Playlist
+    oder None, wenn die Playlist keines angibt.
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#EXT-X-MAP:"):
+                    match = re.search(r'URI="([^"]+)"', line)
+                    if match:
+                        return urljoin(playlist_url, match.group(1))
+    except OSError as e:
+        log(f"FEHLER beim Lesen der Playlist '{filepath}': {e}", "error")
+    return None
+
+
+class SegmentIndex:
+    """
+    Index der erfassten Segmente nach Identität (Rendition, Sequenznummer).
+    Pro Segment wird die zuerst gesehene URL als kanonische URL behalten; weitere URLs
+    desselben Segments (andere Tokens, andere CDN-Hosts) stehen als Ausweich-URLs bereit.
+    """
+
+    def __init__(self, urls=()):
+        self.entries = {}  # (Rendition, Sequenznummer) -> [kanonische URL, Ausweich-URLs...]
+        self.update(urls)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return (urls[0] for urls in self.entries.values())
+
+    def add(self, url):
+        """Nimmt eine URL auf. Gibt True zurück, wenn sie ein bisher unbekanntes Segment ist."""
+        key = segment_identity(url)
+        urls = self.entries.get(key)
+        if urls is None:
+            self.entries[key] = [url]
+            return True
+        if url not in urls:
+            urls.append(url)
+        return False
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def alternates(self, url):
+        """Weitere bekannte URLs desselben Segments, ohne die übergebene URL."""
+        return [u for u in self.entries.get(segment_identity(url), []) if u != url]
+
+    def all_urls(self):
+        """Alle bekannten URLs, je Segment die kanonische zuerst (zum Wiederaufbau des Index)."""
+        return [url for urls in self.entries.values() for url in urls]
+
+    def duplicate_count(self):
+        return sum(len(urls) - 1 for urls in self.entries.values())
+
+    def ordered_urls(self):
+        """
+        Eine kanonische URL pro Sequenznummer, aufsteigend sortiert.
+        Hat der Player zwischen Qualitätsstufen gewechselt, wird je Sequenznummer die Rendition
+        mit den meisten Segmenten bevorzugt, damit kein Abschnitt doppelt im Video landet.
+        """
+        rendition_sizes = collections.Counter(rendition for rendition, _ in self.entries)
+        by_sequence = {}
+        unnumbered = []
+        for (rendition, sequence), urls in self.entries.items():
+            if sequence is None:
+                unnumbered.append(urls[0])
+                continue
+            current = by_sequence.get(sequence)
+            if current is None or rendition_sizes[rendition] > rendition_sizes[current[0]]:
+                by_sequence[sequence] = (rendition, urls[0])
+        return [by_sequence[sequence][1] for sequence in sorted(by_sequence)] + sorted(unnumbered)
+
+    @staticmethod
+    def filename_for(url):
+        """
+        Dateiname aus der Segment-Identität: Kurz-Hash der Rendition plus sechsstellige
+        Sequenznummer, sodass gleichnamige Segmente verschiedener Renditionen nicht kollidieren
+        und die Dateien innerhalb einer Rendition nach Sequenz sortiert sind.
+        """
+        rendition, sequence = segment_identity(url)
+        extension = os.path.splitext(rendition)[1] or ".ts"
+        tag = hashlib.sha1(rendition.encode("utf-8")).hexdigest()[:8]
+        if sequence is None:
+            return f"{tag}{extension}"
+        return f"{tag}_{sequence:06d}{extension}"
+
+
+class SegmentStore:
+    """
+    Ablage für die Segmente einer Episode.
+    Sowohl die CDP-Erfassung im Browser als auch SegmentDownloader.download schreiben in dasselbe
+    Verzeichnis; bereits vorhandene Segmente werden daher nicht erneut geladen.
+    """
+
+    # Liegt im TS-Ordner einer Episode, deren Merge wegen fehlender Segmente abgebrochen wurde
+    INCOMPLETE_MARKER = ".unvollstaendig"
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def filename_for(url):
+        """Leitet den Dateinamen eines Segments aus seiner Identität ab (siehe SegmentIndex)."""
+        return SegmentIndex.filename_for(url)
+
+    def path_for(self, url):
+        return os.path.join(self.directory, self.filename_for(url))
+
+    def has(self, url):
+        path = self.path_for(url)
+        return os.path.exists(path) and os.path.getsize(path) > 0
+
+    def write(self, url, data):
+        """Schreibt ein Segment atomar (erst .part, dann umbenennen), damit keine halben Dateien liegen bleiben."""
+        filepath = self.path_for(url)
+        temp_path = f"{filepath}.part"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, filepath)
+        return filepath
+
+    def move_to(self, new_directory):
+        """Verschiebt die Ablage (z.B. vom Staging-Ordner in den Episodenordner)."""
+        os.rename(self.directory, new_directory)
+        self.directory = new_directory
+        return new_directory
+
+    def merge_into(self, existing_directory):
+        """Übernimmt die Segmente in einen vorhandenen Episodenordner; vorhandene Dateien haben Vorrang."""
+        for filename in os.listdir(self.directory):
+            target = os.path.join(existing_directory, filename)
+            if os.path.exists(target):
+                os.remove(os.path.join(self.directory, filename))
+            else:
+                os.replace(os.path.join(self.directory, filename), target)
+        os.rmdir(self.directory)
+        self.directory = existing_directory
+        return existing_directory
+
+    @classmethod
+    def claim_incomplete(cls, base_path):
+        """
+        Sucht unter base_path, base_path_1, ... einen TS-Ordner eines abgebrochenen Laufs und übernimmt ihn,
+        indem die Markierung entfernt wird (so kann ihn kein paralleler Lauf ebenfalls übernehmen).
+        Gibt den Ordner oder None zurück.
+        """
+        counter = 0
+        directory = base_path
+        while os.path.isdir(directory):
+            try:
+                os.remove(os.path.join(directory, cls.INCOMPLETE_MARKER))
+                return directory
+            except FileNotFoundError:
+                pass
+            counter += 1
+            directory = f"{base_path}_{counter}"
+        return None
+
+    @classmethod
+    def mark_incomplete(cls, directory):
+        with open(os.path.join(directory, cls.INCOMPLETE_MARKER), "w", encoding="utf-8") as f:
+            f.write(str(time.time()))
+
 class get_m3u8_urls:
     """
     Diese Klasse enthält Methoden zum Extrahieren von M3U8-URLs aus den Performance-Logs
@@ -199,67 +493,510 @@ class get_m3u8_urls:
 
         return local_m3u8_paths, first_filepath
 
-class driverManager:
+class CdpSegmentCapture:
     """
-    Diese Klasse verwaltet den Browser und bietet Funktionen zum Laden von Proxys,
-    Herunterladen von Dateien, Finden des FFmpeg-Executables und Zusammenführen von TS-Dateien.
+    Übernimmt Segment-Antworten direkt aus dem Browser, während das Video läuft.
+    Liest die Network-Events aus dem Performance-Log von Chromedriver und holt die Bodies
+    fertig geladener Segmente per CDP 'Network.getResponseBody'. Die Bytes landen im
+    SegmentStore der Episode, sodass SegmentDownloader.download danach nur noch die Lücken lädt.
     """
 
-    def __init__(self, headless=True, proxyAddresse=None):
-        self.headless = headless
-        self.proxyAddresse = proxyAddresse
-        self.m3u8_first_filepath = None
-        self.proxies = self.load_and_filter_proxies() 
-        self.driver = self.initialize_driver()
-        self.main_window_handle = self.driver.current_window_handle
-        
-        
-    def initialize_driver(self):
-        options = Options()
-        if self.headless:
-            log("Starte Chromium im Headless-Modus (im Docker-Container)...")
-            options.add_argument("--headless=new")
-        else:
-            log("Starte Chromium im sichtbaren Modus (im Docker-Container via VNC)...")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--ignore-certificate-errors")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
+    MAX_TOTAL_BUFFER_SIZE = 512 * 1024 * 1024  # Puffer im Browser, damit Bodies nicht verworfen werden
+    MAX_RESOURCE_BUFFER_SIZE = 64 * 1024 * 1024
 
-        if self.proxyAddresse:
-            log(f"Konfiguriere Browser für Proxy: {self.proxyAddresse}")
-            options.add_argument(f"--proxy-server={self.proxyAddresse}")
+    def __init__(self, driver_manager, store):
+        self.driver_manager = driver_manager
+        self.store = store
+        self.pending_requests = {}  # requestId -> URL
+        self.captured_urls = set()
+        self.enable()
 
-        # Adblock Plus Extension laden (Pfad im Container anpassen!)
-        adblock_path = "/app/src/adblockplus.crx"
-        if os.path.exists(adblock_path):
-            options.add_extension(adblock_path)
+    def enable(self):
+        """Aktiviert die Network-Domain mit großen Puffern und verwirft alte Log-Einträge."""
         try:
-            selenium_hub_url = os.getenv(
-                "SELENIUM_HUB_URL", "http://selenium-chromium:4444/wd/hub"
+            self.driver_manager.execute_cdp(
+                "Network.enable",
+                {
+                    "maxTotalBufferSize": self.MAX_TOTAL_BUFFER_SIZE,
+                    "maxResourceBufferSize": self.MAX_RESOURCE_BUFFER_SIZE,
+                },
             )
-             
-            log(f"Chromium WebDriver erfolgreich mit {selenium_hub_url} verbunden.")
-            return webdriver.Remote(command_executor=selenium_hub_url, options=options)
+            self.driver_manager.driver.get_log("performance")
+            log(f"CDP-Segmenterfassung aktiv. Segmente werden in '{self.store.directory}' abgelegt.")
         except WebDriverException as e:
-            log(f"FEHLER beim Initialisieren des WebDriver: {e}", "error")
-            sys.exit(1)
+            log(f"WARNUNG: CDP-Segmenterfassung konnte nicht aktiviert werden: {e}", "warning")
+
+    def poll(self):
+        """
+        Verarbeitet alle neuen Network-Events und speichert fertig geladene Segmente.
+        Gibt die Menge der dabei gesehenen Segment-URLs zurück.
+        """
+        seen_urls = set()
+        try:
+            entries = self.driver_manager.driver.get_log("performance")
+        except WebDriverException as e:
+            log(f"Fehler beim Abrufen des Performance-Logs: {e}", "debug")
+            return seen_urls
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, json.JSONDecodeError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                url = response.get("url", "")
+                if response.get("status") == 200 and is_video_segment_url(url):
+                    self.pending_requests[request_id] = url
+                    seen_urls.add(url)
+            elif method == "Network.loadingFinished":
+                url = self.pending_requests.pop(request_id, None)
+                if url:
+                    self.fetch_body(request_id, url)
+            elif method == "Network.loadingFailed":
+                self.pending_requests.pop(request_id, None)
+
+        return seen_urls
+
+    def fetch_body(self, request_id, url):
+        """Holt den Body eines Segments aus dem Browser und schreibt ihn in den Store."""
+        if url in self.captured_urls or self.store.has(url):
+            return
+        try:
+            result = self.driver_manager.execute_cdp(
+                "Network.getResponseBody", {"requestId": request_id}
+            )
+        except WebDriverException as e:
+            # Body wurde bereits aus dem Puffer verdrängt; SegmentDownloader.download lädt das Segment nach.
+            log(f"Body für Segment '{url}' nicht mehr verfügbar: {e}", "debug")
+            return
+
+        body = result.get("body", "")
+        data = base64.b64decode(body) if result.get("base64Encoded") else body.encode("utf-8")
+        if not data:
+            return
+        self.store.write(url, data)
+        self.captured_urls.add(url)
+        log(f"Segment aus dem Browser übernommen: {self.store.filename_for(url)} ({len(data)} Bytes)", "debug")
+
+
+class AcceleratedPlayback:
+    """
+    Beschleunigte Erfassung für Backends, die das Video abspielen müssen, um die Segment-URLs
+    preiszugeben. Erhöht video.playbackRate auf die höchste Rate, die der Player verträgt,
+    und/oder springt in Schritten an das Ende des gepufferten Bereichs, damit der Player das
+    nächste Segment sofort anfordert. Am Ende wird geprüft, ob alle Segmente der Playlist
+    gesehen wurden; fehlende werden gezielt angesprungen.
+    """
+
+    PLAYBACK_RATES = [16, 8, 4, 2, 1]
+    STALL_TICKS_BEFORE_DOWNGRADE = 3  # Ticks ohne Fortschritt, bevor die Rate gesenkt wird
+    POLL_INTERVAL = 1  # Sekunden zwischen zwei Ticks (statt 3 Sekunden bei 1x)
+    MISSING_SEGMENT_TIMEOUT = 10  # Sekunden Wartezeit pro nachträglich angesprungenem Segment
+
+    def __init__(self, driver_manager, mode="both", max_rate=16):
+        self.driver_manager = driver_manager
+        self.use_rate = mode in ("rate", "both")
+        self.use_seek = mode in ("seek", "both")
+        self.rates = [r for r in self.PLAYBACK_RATES if r <= max_rate] or [1]
+        self.rate_position = 0
+        self.stall_ticks = 0
 
+    def run_script(self, script, *args):
+        try:
+            return self.driver_manager.driver.execute_script(script, *args)
+        except WebDriverException as e:
+            log(f"Fehler bei der beschleunigten Wiedergabe: {e}", "debug")
+            return None
+
+    def apply_rate(self):
+        """Setzt die aktuelle Zielrate und merkt sich, was der Player tatsächlich übernimmt."""
+        if not self.use_rate:
+            return
+        requested = self.rates[self.rate_position]
+        actual = self.run_script(
+            "var v = document.querySelector('video'); if (!v) return null;"
+            "try { v.playbackRate = arguments[0]; } catch (e) {} return v.playbackRate;",
+            requested,
+        )
+        if actual and actual < requested:
+            # Der Player begrenzt die Rate selbst; höhere Stufen nicht erneut versuchen
+            self.rates = [r for r in self.rates if r <= actual] or [1]
+            self.rate_position = 0
+            log(f"Player begrenzt playbackRate auf {actual}x.", "debug")
+
+    def start(self):
+        self.apply_rate()
+        if self.use_rate:
+            log(f"Beschleunigte Wiedergabe aktiv (playbackRate {self.rates[self.rate_position]}x).")
+        if self.use_seek:
+            log("Beschleunigte Erfassung per Zeitleisten-Sprüngen aktiv.")
+
+    def tick(self, current_time, last_current_time):
+        """Wird pro Überwachungsschritt aufgerufen; regelt Rate und Sprünge."""
+        if current_time <= last_current_time:
+            self.stall_ticks += 1
+            if self.use_rate and self.stall_ticks >= self.STALL_TICKS_BEFORE_DOWNGRADE and self.rate_position < len(self.rates) - 1:
+                self.rate_position += 1
+                self.stall_ticks = 0
+                log(f"Wiedergabe stockt, senke playbackRate auf {self.rates[self.rate_position]}x.")
+        else:
+            self.stall_ticks = 0
+
+        # Player setzen die Rate nach Qualitätswechseln gelegentlich zurück
+        self.apply_rate()
+        if self.use_seek:
+            self.run_script(
+                "var v = document.querySelector('video'); if (!v || !v.buffered.length) return null;"
+                "var end = v.buffered.end(v.buffered.length - 1);"
+                "if (end - v.currentTime > 0.5) { v.currentTime = end - 0.1; } return v.currentTime;"
+            )
+
+    def expected_segments(self):
+        """Liefert die Segmente aus der ersten gespeicherten Media-Playlist dieser Episode mit Einträgen."""
+        episode_dir = os.path.abspath(self.driver_manager.m3u8_output_dir)
+        for playlist_url, filepath in getattr(self.driver_manager, "m3u8_files_dict", {}).items():
+            if os.path.dirname(os.path.abspath(filepath)) != episode_dir:
+                continue  # Playlist eines anderen Agents oder einer früheren Erfassung
+            segments = parse_m3u8_playlist(filepath, playlist_url)
+            if segments:
+                return segments
+        return []
+
+    def recover_missing_segments(self, observed_urls, collect_segment_urls):
+        """
+        Vergleicht die beobachteten Segmente mit der Playlist und springt fehlende Segmente
+        gezielt an. Gibt die Liste der weiterhin fehlenden Segment-Indizes zurück.
+        """
+        expected = self.expected_segments()
+        if not expected:
+            log("Keine Media-Playlist verfügbar, Vollständigkeit der Segmente kann nicht geprüft werden.", "warning")
+            return []
+
+        observed_indices = {segment_index_from_url(url) for url in observed_urls}
+        missing = [segment for segment in expected if segment["index"] not in observed_indices]
+        if not missing:
+            log(f"Alle {len(expected)} erwarteten Segmente wurden beobachtet.")
+            return []
+
+        log(f"{len(missing)}/{len(expected)} Segmente fehlen, springe diese gezielt an...", "warning")
+        for segment in missing:
+            self.run_script(
+                "var v = document.querySelector('video'); if (v) { v.currentTime = arguments[0]; v.play(); }",
+                segment["start"] + 0.1,
+            )
+            deadline = time.time() + self.MISSING_SEGMENT_TIMEOUT
+            while time.time() < deadline:
+                new_urls = collect_segment_urls()
+                observed_urls.update(new_urls)
+                observed_indices.update(segment_index_from_url(url) for url in new_urls)
+                if segment["index"] in observed_indices:
+                    break
+                time.sleep(self.POLL_INTERVAL)
+
+        still_missing = [s["index"] for s in expected if s["index"] not in observed_indices]
+        if still_missing:
+            log(f"WARNUNG: {len(still_missing)} Segmente wurden nicht beobachtet: {still_missing[:20]}", "warning")
+        else:
+            log(f"Alle {len(expected)} erwarteten Segmente wurden nach gezielten Sprüngen beobachtet.")
+        return still_missing
+
+
+class LeanProfile:
+    """
+    Schlankes Browser-Profil für Erfassungs-Sessions.
+    Blockiert Bilder, Schriften, Analytics und die Domains aus den Pi-hole-Adlisten direkt im
+    Browser (CDP 'Network.setBlockedURLs'), schaltet den Ton stumm und verkleinert den Viewport.
+    Spart CPU und Speicher pro Session auf dem Grid-Node.
+    """
+
+    WINDOW_SIZE = "854,480"
+    BLOCKED_URL_PATTERNS = [
+        # Schriften
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        # Analytics, Tracker und Werbenetzwerke
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*googlesyndication.com*", "*adservice.google.*", "*facebook.net*",
+        "*hotjar.com*", "*scorecardresearch.com*", "*amazon-adsystem.com*",
+        "*popads.net*", "*popcash.net*", "*propellerads*", "*adsterra*",
+        "*onclickads.net*", "*exoclick.com*", "*juicyads.com*", "*histats.com*",
+        "*yandex.ru/metrika*", "*mc.yandex.ru*", "*cloudflareinsights.com*",
+    ]
+    CHROME_ARGUMENTS = [
+        "--mute-audio",
+        "--autoplay-policy=no-user-gesture-required",
+        "--blink-settings=imagesEnabled=false",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-features=Translate,MediaRouter,OptimizationHints",
+    ]
+    CHROME_PREFS = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    }
+
+    def __init__(self, adlists_path=None, cache_path=None):
+        self.adlists_path = adlists_path or os.getenv("ADLISTS_PATH", "/app/config/adlists.list")
+        self.cache_path = cache_path or os.getenv("BLOCKLIST_CACHE_PATH", "/app/Logs/blocklist_domains.txt")
+        self.cache_ttl = int(os.getenv("BLOCKLIST_CACHE_TTL", str(24 * 3600)))
+        self.max_domains = int(os.getenv("BLOCKLIST_MAX_DOMAINS", "2000"))
+
+    def apply_options(self, options):
+        """Ergänzt die Chrome-Optionen um die Argumente des schlanken Profils."""
+        options.add_argument(f"--window-size={self.WINDOW_SIZE}")
+        for argument in self.CHROME_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", self.CHROME_PREFS)
+
+    def blocked_url_patterns(self):
+        patterns = list(self.BLOCKED_URL_PATTERNS)
+        for domain in self.load_blocklist_domains():
+            patterns.append(f"*://{domain}/*")
+            patterns.append(f"*.{domain}/*")
+        return patterns
+
+    def apply_to_session(self, driver_manager):
+        """Setzt die URL-Sperren in der laufenden Browser-Session."""
+        patterns = self.blocked_url_patterns()
+        try:
+            driver_manager.execute_cdp("Network.enable")
+            driver_manager.execute_cdp("Network.setBlockedURLs", {"urls": patterns})
+            log(f"Schlankes Profil aktiv: {len(patterns)} URL-Muster im Browser blockiert.")
+        except WebDriverException as e:
+            log(f"WARNUNG: URL-Sperren konnten nicht gesetzt werden: {e}", "warning")
+
+    @staticmethod
+    def parse_blocklist_line(line):
+        """Extrahiert eine Domain aus einer Zeile im Hosts-, Adblock- oder Domain-Format."""
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("!") or line.startswith("["):
+            return None
+        if line.startswith("||"):
+            domain = line[2:].split("^", 1)[0]
+        else:
+            parts = line.split()
+            domain = parts[1] if len(parts) > 1 and parts[0] in ("0.0.0.0", "127.0.0.1", "::") else parts[0]
+        domain = domain.strip().lower()
+        if "." not in domain or "/" in domain or "*" in domain or domain in ("localhost", "0.0.0.0"):
+            return None
+        return domain
+
+    def load_blocklist_domains(self):
+        """
+        Lädt die Domains aus den Adlisten. Das Ergebnis wird mit TTL zwischengespeichert,
+        damit nicht jede Episode die Listen erneut herunterlädt.
+        """
+        if os.path.exists(self.cache_path) and time.time() - os.path.getmtime(self.cache_path) < self.cache_ttl:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return [line.strip() for line in f if line.strip()][: self.max_domains]
+
+        if not os.path.exists(self.adlists_path):
+            log(f"Adlisten-Datei '{self.adlists_path}' nicht gefunden. Nur statische URL-Sperren aktiv.", "warning")
+            return []
+
+        with open(self.adlists_path, "r", encoding="utf-8") as f:
+            list_urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+        domains = []
+        seen = set()
+        for list_url in list_urls:
+            if len(domains) >= self.max_domains:
+                break
+            try:
+                response = requests.get(list_url, timeout=10)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                log(f"Adliste '{list_url}' konnte nicht geladen werden: {e}", "warning")
+                continue
+            for line in response.text.splitlines():
+                domain = self.parse_blocklist_line(line)
+                if domain and domain not in seen:
+                    seen.add(domain)
+                    domains.append(domain)
+                    if len(domains) >= self.max_domains:
+                        break
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.part"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(domains))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            log(f"Blocklisten-Cache konnte nicht geschrieben werden: {e}", "warning")
+        log(f"{len(domains)} Domains aus den Adlisten geladen.")
+        return domains
+
+
+class ProfileStore:
+    """
+    Warmer Profilspeicher pro Hoster-Domain.
+    Cookies und localStorage werden nach einer erfolgreichen Erfassung gesichert und in neue
+    Sessions zurückgespielt, damit Cookie-Consent und Overlays nicht jedes Mal neu anfallen.
+    Der HTTP-Cache (Player-JS usw.) liegt in einem persistenten Cache-Ordner auf dem
+    Selenium-Node; pro gleichzeitiger Session wird ein eigener Slot per Dateisperre belegt.
+    """
+
+    COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("PROFILE_STORE_DIR", "/app/Logs/profiles")
+        self.browser_cache_dir = os.getenv("BROWSER_CACHE_DIR")  # Pfad auf dem Selenium-Node
+        self.cache_slots = int(os.getenv("BROWSER_CACHE_SLOTS", "4"))
+        self.cache_slot_lock = None
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def domain_key(url):
+        host = (urlparse(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def profile_path(self, domain):
+        return os.path.join(self.root, f"{clean_filename(domain)}.json")
+
+    def has_profile(self, url):
+        domain = self.domain_key(url)
+        return bool(domain) and os.path.exists(self.profile_path(domain))
+
+    def load_profiles(self):
+        profiles = []
+        for filename in os.listdir(self.root):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.root, filename), "r", encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                log(f"Profil '{filename}' konnte nicht gelesen werden: {e}", "warning")
+        return profiles
+
+    def acquire_cache_slot(self):
+        """
+        Belegt einen freien HTTP-Cache-Slot und gibt das Chrome-Argument dafür zurück.
+        Chrome-Instanzen dürfen sich keinen Cache-Ordner teilen, daher die Sperre pro Slot.
+        """
+        if not self.browser_cache_dir:
+            return None
+        slot_dir = os.path.join(self.root, "cache-slots")
+        os.makedirs(slot_dir, exist_ok=True)
+        for slot in range(self.cache_slots):
+            lock_file = open(os.path.join(slot_dir, f"slot-{slot}.lock"), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self.cache_slot_lock = lock_file  # Sperre gilt, solange der Prozess läuft
+            log(f"HTTP-Cache-Slot {slot} belegt.")
+            return f"--disk-cache-dir={self.browser_cache_dir.rstrip('/')}/slot-{slot}"
+        log("Alle HTTP-Cache-Slots belegt. Session startet ohne persistenten Cache.", "warning")
+        return None
+
+    def restore(self, driver_manager):
+        """Spielt Cookies und localStorage aller gespeicherten Hoster in die Session ein."""
+        profiles = self.load_profiles()
+        if not profiles:
+            return
+        cookies = [
+            {
+                k: v
+                for k, v in cookie.items()
+                # Session-Cookies haben expires=-1; ohne 'expires' legt CDP sie wieder als Session-Cookie an
+                if k in self.COOKIE_FIELDS and not (k == "expires" and v < 0)
+            }
+            for profile in profiles
+            for cookie in profile.get("cookies", [])
+        ]
+        local_storage = {}
+        for profile in profiles:
+            local_storage.update(profile.get("local_storage", {}))
+        try:
+            if cookies:
+                driver_manager.execute_cdp("Network.setCookies", {"cookies": cookies})
+            if local_storage:
+                # Wird vor jedem Seitenskript ausgeführt; setzt nur fehlende Schlüssel
+                driver_manager.execute_cdp(
+                    "Page.addScriptToEvaluateOnNewDocument",
+                    {
+                        "source": "(function (data) { var items = data[location.origin]; if (!items) return;"
+                        " try { for (var key in items) { if (localStorage.getItem(key) === null)"
+                        " localStorage.setItem(key, items[key]); } } catch (e) {} })("
+                        + json.dumps(local_storage)
+                        + ");"
+                    },
+                )
+            log(f"Warmes Profil geladen: {len(cookies)} Cookies, localStorage für {len(local_storage)} Origins.")
+        except WebDriverException as e:
+            log(f"WARNUNG: Profil konnte nicht wiederhergestellt werden: {e}", "warning")
+
+    def save(self, driver_manager):
+        """Sichert Cookies und localStorage der aktuellen Hoster-Domain nach einer erfolgreichen Erfassung."""
+        try:
+            current_url = driver_manager.driver.current_url
+            domain = self.domain_key(current_url)
+            if not domain:
+                return
+            cookies = driver_manager.execute_cdp("Network.getAllCookies").get("cookies", [])
+            origin = driver_manager.driver.execute_script("return window.location.origin;")
+            items = driver_manager.driver.execute_script("return Object.assign({}, window.localStorage);") or {}
+        except WebDriverException as e:
+            log(f"WARNUNG: Profil konnte nicht gesichert werden: {e}", "warning")
+            return
+
+        profile = {
+            "domain": domain,
+            "saved_at": datetime.now().isoformat(),
+            "cookies": cookies,
+            "local_storage": {origin: items} if items else {},
+        }
+        filepath = self.profile_path(domain)
+        temp_path = f"{filepath}.{os.getpid()}.part"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(profile, f)
+        os.replace(temp_path, filepath)
+        log(f"Profil für '{domain}' gesichert ({len(cookies)} Cookies).")
+
+
+class ProxyPool:
+    """
+    Proxy-Pool mit Cache, asynchronen Health-Checks und Latenz-Bewertung.
+    Die Proxy-Liste wird mit TTL auf der Platte zwischengespeichert, sodass ein Start nicht
+    jedes Mal auf die API wartet. Kandidaten werden parallel mit httpx geprüft; Browser und
+    Segment-Downloader bekommen die schnellsten gesunden Proxys, fehlerhafte werden aussortiert.
+    """
 
-    def load_and_filter_proxies(self):
-        """ 
-        Lädt Proxys aus einer JSON-Datei, filtert nach "alive": true und "http"-Protokoll.
+    API_URL = "https://api.proxyscrape.com/v4/free-proxy-list/get?request=display_proxies&proxy_format=protocolipport&format=json"
+    LATENCY_SMOOTHING = 0.3  # Gewichtung neuer Messwerte im gleitenden Mittel
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.getenv("PROXY_CACHE_PATH", "/app/Logs/proxy_pool.json")
+        self.cache_ttl = int(os.getenv("PROXY_CACHE_TTL", "1800"))
+        self.probe_url = os.getenv("PROXY_PROBE_URL", "https://www.gstatic.com/generate_204")
+        self.probe_timeout = float(os.getenv("PROXY_PROBE_TIMEOUT", "5"))
+        self.probe_concurrency = int(os.getenv("PROXY_PROBE_CONCURRENCY", "50"))
+        self.probe_limit = int(os.getenv("PROXY_PROBE_LIMIT", "200"))
+        self.max_failures = int(os.getenv("PROXY_MAX_FAILURES", "3"))
+        self.lock = threading.Lock()
+        self.proxies = {}  # Proxy-String -> {"latency": Sekunden, "failures": int}
+        self.load_lock = threading.Lock()  # nur ein Thread lädt und prüft die Liste, die anderen warten
+        self.loaded = False
+
+    @staticmethod
+    def fetch_proxy_list():
+        """
+        Lädt Proxys von der API, filtert nach "alive": true und "http"-Protokoll.
         Gibt eine Liste von Proxy-Strings zurück (z.B. "http://ip:port").
         """
         proxies_list = []
         log("Versuche, Proxys von der API abzurufen...", "info")
         try:
-            response = requests.get("https://api.proxyscrape.com/v4/free-proxy-list/get?request=display_proxies&proxy_format=protocolipport&format=json", timeout=10)
+            response = requests.get(ProxyPool.API_URL, timeout=10)
             response.raise_for_status() # Löst einen Fehler für schlechte HTTP-Antworten aus
             data = response.json()
             
@@ -292,56 +1029,627 @@ class driverManager:
 
         return proxies_list
 
-    def handle_new_tabs_and_focus(self, main_window_handle: str):
+    def load(self):
         """
-        Überprüft und schließt alle neuen Browser-Tabs (Pop-ups) und kehrt zum Haupt-Tab zurück.
+        Lädt den Pool aus dem Cache oder, wenn dieser abgelaufen ist, neu von der API mit Health-Check.
+        Erst nach erfolgreichem Laden gilt der Pool als geladen; nach einer Ausnahme versucht es der nächste Aufruf erneut.
         """
+        if self.loaded:
+            return
+        with self.load_lock:
+            if self.loaded:
+                return
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                if time.time() - cached.get("fetched_at", 0) < self.cache_ttl:
+                    with self.lock:
+                        self.proxies = cached.get("proxies", {})
+                    log(f"{len(self.proxies)} gesunde Proxys aus dem Cache geladen.")
+                    self.loaded = True
+                    return
+            except (OSError, json.JSONDecodeError):
+                pass
+
+            candidates = self.fetch_proxy_list()[: self.probe_limit]
+            if candidates:
+                log(f"Prüfe {len(candidates)} Proxys parallel auf Erreichbarkeit und Latenz...")
+                results = asyncio.run(self.probe_all(candidates))
+                with self.lock:
+                    self.proxies = {
+                        proxy: {"latency": latency, "failures": 0}
+                        for proxy, latency in results.items()
+                        if latency is not None
+                    }
+                log(f"{len(self.proxies)}/{len(candidates)} Proxys sind erreichbar.")
+                self.save(fetched_at=time.time())
+            else:
+                # Leere Liste (API nicht erreichbar) nicht cachen, damit der nächste Prozess neu abruft
+                log("Keine Proxy-Kandidaten erhalten, Pool bleibt für diesen Lauf leer.", "warning")
+            self.loaded = True
+
+    async def probe(self, proxy, semaphore):
+        """Misst die Antwortzeit eines Proxys. Gibt None zurück, wenn er nicht funktioniert."""
+        async with semaphore:
+            try:
+                async with httpx.AsyncClient(proxy=proxy, timeout=self.probe_timeout, verify=False) as client:
+                    start = time.monotonic()
+                    response = await client.get(self.probe_url)
+                    if response.status_code >= 400:
+                        return None
+                    return time.monotonic() - start
+            except Exception:
+                return None
+
+    async def probe_all(self, candidates):
+        semaphore = asyncio.Semaphore(self.probe_concurrency)
+        latencies = await asyncio.gather(*(self.probe(proxy, semaphore) for proxy in candidates))
+        return dict(zip(candidates, latencies))
+
+    def save(self, fetched_at=None):
+        with self.lock:
+            data = {"fetched_at": fetched_at, "proxies": dict(self.proxies)}
+        if fetched_at is None:
+            # Zeitpunkt des Abrufs beibehalten, damit die TTL nicht bei jedem Speichern neu beginnt
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    data["fetched_at"] = json.load(f).get("fetched_at", time.time())
+            except (OSError, json.JSONDecodeError):
+                data["fetched_at"] = time.time()
         try:
-            handles = self.driver.window_handles
-            if len(handles) > 1:
-                log(
-                    f"NEUE FENSTER/TABS ERKANNT: {len(handles) - 1} Pop-up(s). Schließe diese..."
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.part"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            log(f"Proxy-Cache konnte nicht geschrieben werden: {e}", "warning")
+
+    def get_best(self, count=1):
+        """Gibt die schnellsten gesunden Proxys zurück (nach gleitender Latenz sortiert)."""
+        self.load()
+        with self.lock:
+            ranked = sorted(self.proxies.items(), key=lambda item: item[1]["latency"])
+        return [proxy for proxy, _ in ranked[:count]]
+
+    def report_success(self, proxy, latency):
+        with self.lock:
+            stats = self.proxies.get(proxy)
+            if stats is None:
+                return
+            stats["latency"] = (1 - self.LATENCY_SMOOTHING) * stats["latency"] + self.LATENCY_SMOOTHING * latency
+            stats["failures"] = 0
+
+    def report_failure(self, proxy):
+        """Zählt einen Fehler; nach PROXY_MAX_FAILURES Fehlern in Folge fliegt der Proxy aus dem Pool."""
+        with self.lock:
+            stats = self.proxies.get(proxy)
+            if stats is None:
+                return
+            stats["failures"] += 1
+            if stats["failures"] < self.max_failures:
+                return
+            del self.proxies[proxy]
+        log(f"Proxy {proxy} nach {self.max_failures} Fehlern aus dem Pool entfernt.", "warning")
+        self.save()
+
+    @staticmethod
+    def requests_proxies(proxy):
+        """Proxy-Dictionary im Format von requests."""
+        return {"http": proxy, "https": proxy} if proxy else None
+
+
+class SegmentDownloader:
+    """
+    Verteilt die Segmente einer Episode auf mehrere Routen: die direkte Verbindung plus die
+    schnellsten gesunden Proxys aus dem ProxyPool. Jede Route wird nach gemessenem Durchsatz
+    gewichtet. Stockt eine Route (kein Byte innerhalb von SEGMENT_STALL_TIMEOUT), wird das
+    Segment einer anderen Route zugewiesen und die stockende Route eine Weile pausiert.
+    CDNs drosseln meist pro IP, daher wächst die Bandbreite mit der Zahl der Routen.
+
+    Gegen Ausreißer am Ende einer Episode bekommt jedes Segment eine Frist, die aus dem
+    bisher gemessenen Durchsatz abgeleitet wird. Läuft ein Segment länger als das p95 der
+    bisherigen Downloadzeiten, startet eine zweite Anfrage über eine andere Route (Hedging);
+    die schnellere Kopie gewinnt, die andere wird abgebrochen.
+    """
+
+    CONNECT_TIMEOUT = 10
+    STALL_COOLDOWN = 60  # Sekunden, die eine stockende Route keine neuen Segmente bekommt
+    MIN_SAMPLES = 10  # Messwerte, ab denen Fristen und Hedging greifen
+    DEADLINE_FACTOR = 4  # Frist = Faktor * erwartete Dauer bei gemessenem Durchsatz
+    MIN_DEADLINE = 10
+    MAX_DEADLINE = 300
+    MIN_HEDGE_DELAY = 1.0  # verhindert Hedging bei sehr kurzen Downloadzeiten
+
+    def __init__(self, proxy_pool=None, max_workers=8):
+        self.proxy_pool = proxy_pool
+        self.samples = collections.deque(maxlen=200)  # (Bytes, Sekunden) fertiger Segmente
+        self.max_hedges = max(1, max_workers // 4)
+        self.active_hedges = 0
+        self.hedged_segments = 0
+        self.hedge_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2 * max_workers)
+        self.failures = {}  # Dateiname -> (Fehlerklasse, Retry-After) des letzten Fehlschlags
+        self.stall_timeout = float(os.getenv("SEGMENT_STALL_TIMEOUT", "15"))
+        route_count = int(os.getenv("SEGMENT_ROUTES", "3"))
+        proxies = proxy_pool.get_best(route_count) if proxy_pool else []
+        self.lock = threading.Lock()
+        # None steht für die direkte Verbindung
+        self.routes = {
+            route: {"throughput": None, "inflight": 0, "bytes": 0, "segments": 0, "paused_until": 0.0}
+            for route in [None] + proxies
+        }
+        if proxies:
+            log(f"Segment-Downloads werden auf {len(self.routes)} Routen verteilt (direkt + {len(proxies)} Proxys).")
+
+    @staticmethod
+    def route_name(route):
+        return route or "direkt"
+
+    def choose_route(self, exclude):
+        """Wählt eine Route gewichtet nach Durchsatz und aktueller Auslastung."""
+        now = time.time()
+        with self.lock:
+            candidates = [
+                r for r, stats in self.routes.items() if r not in exclude and stats["paused_until"] <= now
+            ] or [r for r in self.routes if r not in exclude] or list(self.routes)
+            known = [self.routes[r]["throughput"] for r in candidates if self.routes[r]["throughput"]]
+            # Ungemessene Routen bekommen das beste bekannte Gewicht, damit sie ausprobiert werden
+            default_weight = max(known) if known else 1.0
+            weights = [
+                (self.routes[r]["throughput"] or default_weight) / (1 + self.routes[r]["inflight"])
+                for r in candidates
+            ]
+            route = random.choices(candidates, weights=weights)[0]
+            self.routes[route]["inflight"] += 1
+            return route
+
+    def finish(self, route, size=0, elapsed=0.0, stalled=False):
+        with self.lock:
+            stats = self.routes[route]
+            stats["inflight"] -= 1
+            if stalled:
+                stats["paused_until"] = time.time() + self.STALL_COOLDOWN
+            elif size and elapsed > 0:
+                throughput = size / elapsed
+                stats["throughput"] = (
+                    throughput if stats["throughput"] is None else 0.7 * stats["throughput"] + 0.3 * throughput
                 )
-                for handle in handles:
-                    if handle != main_window_handle:
-                        try:
-                            self.driver.switch_to.window(handle)
-                            self.driver.close()
-                            log(f"Pop-up-Tab '{handle}' geschlossen.")
-                        except Exception as e:
-                            log(
-                                f"WARNUNG: Konnte Pop-up-Tab '{handle}' nicht schließen: {e}",
-                                "warning",
-                            )
-                self.driver.switch_to.window(main_window_handle)  # Zurück zum Haupt-Tab
-                time.sleep(1)  # Kurze Pause nach dem Schließen
-        except Exception as e:
-            log(f"FEHLER: Probleme beim Verwalten von Browser-Fenstern: {e}", "error")
+                stats["bytes"] += size
+                stats["segments"] += 1
+                self.samples.append((size, elapsed))
+        if route and self.proxy_pool:
+            if stalled:
+                self.proxy_pool.report_failure(route)
+            elif size:
+                self.proxy_pool.report_success(route, elapsed)
+
+    def hedge_delay(self):
+        """p95 der bisherigen Downloadzeiten; None, solange zu wenige Messwerte vorliegen."""
+        with self.lock:
+            durations = sorted(elapsed for _, elapsed in self.samples)
+        if len(durations) < self.MIN_SAMPLES:
+            return None
+        return max(self.MIN_HEDGE_DELAY, durations[int(0.95 * (len(durations) - 1))])
+
+    def segment_deadline(self):
+        """Frist für ein Segment aus typischer Segmentgröße und gemessenem Durchsatz pro Anfrage."""
+        with self.lock:
+            samples = list(self.samples)
+        if len(samples) < self.MIN_SAMPLES:
+            return self.MAX_DEADLINE
+        sizes = sorted(size for size, _ in samples)
+        throughputs = sorted(size / elapsed for size, elapsed in samples if elapsed > 0)
+        expected = sizes[len(sizes) // 2] / throughputs[len(throughputs) // 2]
+        return min(self.MAX_DEADLINE, max(self.MIN_DEADLINE, self.DEADLINE_FACTOR * expected))
+
+    def download(self, url, filename, directory, alternates=()):
+        """
+        Lädt ein Segment über die beste verfügbare Route. Überschreitet der Download das p95,
+        wird eine zweite Anfrage über eine andere Route gestartet. Scheitern alle Routen, werden
+        die Ausweich-URLs desselben Segments versucht. Gibt den Dateipfad oder None zurück.
+        """
+        filepath = os.path.join(directory, filename)
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(filepath):
+            log(f"Datei '{filename}' existiert bereits in '{directory}'. Überspringe Download.")
+            return filepath
+
+        for candidate_url in [url, *alternates]:
+            if candidate_url != url:
+                log(f"Versuche Ausweich-URL für '{filename}': {candidate_url}", "debug")
+            result = self.download_hedged(candidate_url, filepath, filename)
+            if result:
+                return result
+        return None
 
+    def download_hedged(self, url, filepath, filename):
+        """Ein Download mit Hedging nach p95 (siehe Klassenbeschreibung)."""
+        hedge_delay = self.hedge_delay()
+        if hedge_delay is None:
+            return self.attempt(url, filepath, filename, {}, None)
 
-    def get_current_video_progress(self):
-        """Holt den aktuellen Fortschritt des Hauptvideos."""
+        cancel_event = threading.Event()
+        primary_state = {}
+        primary = self.hedge_executor.submit(self.attempt, url, filepath, filename, primary_state, cancel_event)
         try:
-            video_element_exists = self.driver.execute_script(
-                "return document.querySelector('video')!== null;"
-            )
-            if not video_element_exists:
-                return 0, 0, True
+            return primary.result(timeout=hedge_delay)
+        except concurrent.futures.TimeoutError:
+            pass
 
-            current_time = self.driver.execute_script(
-                "return document.querySelector('video').currentTime;"
-            )
-            duration = self.driver.execute_script(
-                "return document.querySelector('video').duration;"
-            )
-            paused = self.driver.execute_script("return document.querySelector('video').paused;")
+        with self.lock:
+            if self.active_hedges >= self.max_hedges:
+                hedge_allowed = False
+            else:
+                hedge_allowed = True
+                self.active_hedges += 1
+                self.hedged_segments += 1
+        if not hedge_allowed:
+            return primary.result()
+
+        log(f"Segment '{filename}' läuft länger als p95 ({hedge_delay:.1f}s). Starte zweite Anfrage.", "debug")
+        hedge_state = {"exclude": {primary_state.get("route")}}
+        hedge = self.hedge_executor.submit(self.attempt, url, filepath, filename, hedge_state, cancel_event)
+        try:
+            for future in concurrent.futures.as_completed([primary, hedge]):
+                result = future.result()
+                if result:
+                    cancel_event.set()  # Verlierer abbrechen
+                    return result
+            return None
+        finally:
+            with self.lock:
+                self.active_hedges -= 1
 
-            if current_time is None or duration is None:
-                return 0, 0, True
+    def attempt(self, url, filepath, filename, state, cancel_event):
+        """
+        Ein Downloadversuch mit Routenwechsel bei Stocken oder Fehlern.
+        'state' nimmt die aktuell genutzte Route auf und kann Routen zum Ausschließen vorgeben.
+        """
+        tried = set(state.get("exclude", set())) & set(self.routes)
+        if len(tried) >= len(self.routes):
+            tried = set()
+        last_error = ("network", None)
+        while len(tried) < len(self.routes):
+            route = self.choose_route(tried)
+            state["route"] = route
+            start = time.monotonic()
+            try:
+                size = fetch_to_file(
+                    url,
+                    filepath,
+                    proxy=route,
+                    timeout=(self.CONNECT_TIMEOUT, self.stall_timeout),
+                    deadline=start + self.segment_deadline(),
+                    cancel_event=cancel_event,
+                )
+            except DownloadAborted as e:
+                if cancel_event is not None and cancel_event.is_set():
+                    # Die andere Kopie war schneller
+                    self.finish(route)
+                    return None
+                self.finish(route, stalled=True)
+                tried.add(route)
+                last_error = ("network", None)
+                log(f"Segment '{filename}' über '{self.route_name(route)}': {e}. Weise Segment neu zu.", "warning")
+                continue
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self.finish(route, stalled=True)
+                tried.add(route)
+                last_error = ("network", None)
+                log(
+                    f"Route '{self.route_name(route)}' stockt bei '{filename}' ({e.__class__.__name__}). Weise Segment neu zu.",
+                    "warning",
+                )
+                continue
+            except requests.exceptions.RequestException as e:
+                # z.B. 403, wenn die Segment-URL an die IP des Browsers gebunden ist
+                self.finish(route)
+                tried.add(route)
+                last_error = classify_download_error(e)
+                log(f"FEHLER beim Herunterladen von '{filename}' über '{self.route_name(route)}': {e}", "warning")
+                if last_error[0] == "not_found":
+                    break  # 404 liefert jede Route gleichermaßen
+                continue
+            self.finish(route, size, time.monotonic() - start)
+            with self.lock:
+                self.failures.pop(filename, None)
+            log(f"'{filename}' über '{self.route_name(route)}' heruntergeladen ({size} Bytes).", "debug")
+            return filepath
+
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        with self.lock:
+            self.failures[filename] = last_error
+        log(f"FEHLER beim Herunterladen von '{filename}': alle Routen fehlgeschlagen ({last_error[0]}).", "error")
+        return None
 
-            return current_time, duration, paused
-        except WebDriverException:
-            return 0, 0, True
+    def close(self):
+        self.hedge_executor.shutdown(wait=False)
+
+    def log_summary(self):
+        if self.hedged_segments:
+            log(f"{self.hedged_segments} Segmente mit zweiter Anfrage (Hedging) beschleunigt.")
+        for route, stats in self.routes.items():
+            throughput = stats["throughput"] or 0
+            log(
+                f"Route '{self.route_name(route)}': {stats['segments']} Segmente, "
+                f"{stats['bytes'] / 1_000_000:.1f} MB, {throughput / 1_000_000:.2f} MB/s"
+            )
+
+
+class SegmentRetryEngine:
+    """
+    Wiederholt fehlgeschlagene Segment-Downloads in Runden mit exponentiellem Backoff und Jitter.
+    Abgelaufene signierte URLs (403/410) und 404 führen zum erneuten Laden der Media-Playlist,
+    aus der frische Segment-URLs über die Sequenznummer übernommen werden. Ein Segment gilt erst
+    als endgültig verloren, wenn es auch nach mehrfach aktualisierter Playlist 404 liefert.
+    """
+
+    MAX_ROUNDS = int(os.getenv("SEGMENT_RETRY_ROUNDS", "6"))
+    BASE_DELAY = 1.0
+    MAX_DELAY = 60.0
+    MAX_NOT_FOUND = 3  # 404-Antworten, ab denen ein Segment als verloren gilt
+
+    def __init__(self, segment_downloader, m3u8_files_dict=None, max_workers=8, segment_index=None):
+        self.segment_downloader = segment_downloader
+        self.m3u8_files_dict = m3u8_files_dict or {}  # Playlist-URL -> lokaler Pfad
+        self.max_workers = max_workers
+        self.segment_index = segment_index  # liefert die Ausweich-URLs (andere CDN-Hosts/Tokens) je Segment
+
+    def backoff(self, round_number, retry_after=None):
+        """Wartezeit vor einer Runde: exponentiell wachsend mit vollem Jitter, mindestens Retry-After."""
+        delay = random.uniform(0, min(self.MAX_DELAY, self.BASE_DELAY * 2 ** round_number))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.MAX_DELAY))
+        return delay
+
+    def refresh_segment_urls(self, directory):
+        """
+        Lädt alle Media-Playlists neu und gibt (Rendition, Sequenznummer) -> frische Segment-URL zurück.
+        Über die volle Segment-Identität wird eine URL nur durch dasselbe Segment derselben Rendition
+        ersetzt, nie durch die gleiche Nummer einer anderen Qualitätsstufe.
+        Die neuen Playlists landen im TS-Ordner der Episode; die erfassten Playlists bleiben unverändert.
+        """
+        fresh_urls = {}
+        for i, playlist_url in enumerate(self.m3u8_files_dict):
+            filepath = os.path.join(directory, f"refreshed_{i}.m3u8")
+            try:
+                fetch_to_file(playlist_url, filepath, timeout=(10, 30))
+            except requests.exceptions.RequestException as e:
+                log(f"Playlist '{playlist_url}' konnte nicht neu geladen werden: {e}", "warning")
+                continue
+            segments = parse_m3u8_playlist(filepath, playlist_url)
+            if segments:
+                log(f"Media-Playlist '{playlist_url}' neu geladen ({len(segments)} Segmente).")
+                for segment in segments:
+                    fresh_urls.setdefault(segment_identity(segment["url"]), segment["url"])
+        return fresh_urls
+
+    def run(self, failed_segments, directory):
+        """
+        Lädt die fehlgeschlagenen Segmente (Dateiname -> URL) erneut.
+        Gibt (heruntergeladene Pfade, endgültig verlorene Dateinamen, weiterhin offene Dateinamen) zurück.
+        """
+        pending = dict(failed_segments)
+        not_found_counts = collections.Counter()
+        downloaded, lost = [], []
+
+        for round_number in range(self.MAX_ROUNDS):
+            if not pending:
+                break
+            with self.segment_downloader.lock:
+                failures = {
+                    filename: self.segment_downloader.failures.get(filename, ("network", None))
+                    for filename in pending
+                }
+            kinds = collections.Counter(kind for kind, _ in failures.values())
+
+            for filename, (kind, _) in failures.items():
+                if kind == "not_found":
+                    not_found_counts[filename] += 1
+                    if not_found_counts[filename] >= self.MAX_NOT_FOUND:
+                        log(f"Segment '{filename}' liefert dauerhaft 404 und gilt als verloren.", "error")
+                        lost.append(filename)
+                        del pending[filename]
+            if not pending:
+                break
+
+            if kinds["token_expired"] or kinds["not_found"]:
+                fresh_urls = self.refresh_segment_urls(directory)
+                refreshed = 0
+                for filename, url in pending.items():
+                    fresh_url = fresh_urls.get(segment_identity(url))
+                    if fresh_url and fresh_url != url:
+                        pending[filename] = fresh_url
+                        refreshed += 1
+                if refreshed:
+                    log(f"{refreshed} Segment-URLs aus der aktualisierten Playlist übernommen.")
+
+            retry_after = max((after or 0 for _, after in failures.values()), default=0)
+            delay = self.backoff(round_number, retry_after)
+            log(
+                f"Wiederholung {round_number + 1}/{self.MAX_ROUNDS} für {len(pending)} Segmente in {delay:.1f}s "
+                f"({', '.join(f'{kind}: {count}' for kind, count in kinds.items())})."
+            )
+            time.sleep(delay)
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        self.segment_downloader.download,
+                        url,
+                        filename,
+                        directory,
+                        self.segment_index.alternates(url) if self.segment_index else (),
+                    ): filename
+                    for filename, url in pending.items()
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    result_filepath = future.result()
+                    if result_filepath:
+                        downloaded.append(result_filepath)
+                        del pending[futures[future]]
+
+        if pending:
+            log(f"{len(pending)} Segmente auch nach {self.MAX_ROUNDS} Wiederholungen nicht geladen.", "error")
+        return downloaded, lost, list(pending)
+
+
+class driverManager:
+    """
+    Diese Klasse verwaltet den Browser und bietet Funktionen zum Laden von Proxys,
+    Herunterladen von Dateien, Finden des FFmpeg-Executables und Zusammenführen von TS-Dateien.
+    """
+
+    def __init__(self, headless=True, proxyAddresse=None, cdp_capture=False, accelerated=None, lean_profile=False, warm_profile=False, proxy_pool=None, m3u8_output_dir=M3U8_BASE_DIR):
+        self.headless = headless
+        self.m3u8_output_dir = m3u8_output_dir  # eigener Ordner pro Episode, da Playlists meist gleich heißen
+        self.proxyAddresse = proxyAddresse
+        self.proxy_pool = proxy_pool
+        if not self.proxyAddresse and self.proxy_pool:
+            best_proxies = self.proxy_pool.get_best()
+            self.proxyAddresse = best_proxies[0] if best_proxies else None
+        self.cdp_capture = cdp_capture
+        self.lean_profile = LeanProfile() if lean_profile else None
+        self.profile_store = ProfileStore() if warm_profile else None
+        self.popup_wait = 0.5  # Wartezeit pro Popup-Selektor; bei warmem Profil kürzer
+        self.segment_capture = None
+        self.accelerated_playback = (
+            AcceleratedPlayback(self, accelerated, int(os.getenv("MAX_PLAYBACK_RATE", "16")))
+            if accelerated
+            else None
+        )
+        self.m3u8_files_dict = {}
+        self.m3u8_first_filepath = None
+        self.segment_index = None  # SegmentIndex der letzten Erfassung
+        self.driver = self.initialize_driver()
+        self.main_window_handle = self.driver.current_window_handle
+        self.protected_handles = set()  # Tabs der Multi-Tab-Erfassung, die nicht als Pop-up gelten
+        if self.lean_profile:
+            self.lean_profile.apply_to_session(self)
+        if self.profile_store:
+            self.profile_store.restore(self)
+        
+        
+    def initialize_driver(self):
+        options = Options()
+        if self.headless:
+            log("Starte Chromium im Headless-Modus (im Docker-Container)...")
+            options.add_argument("--headless=new")
+        else:
+            log("Starte Chromium im sichtbaren Modus (im Docker-Container via VNC)...")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        if self.lean_profile:
+            self.lean_profile.apply_options(options)
+        else:
+            options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--ignore-certificate-errors")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        # Hintergrund-Tabs nicht drosseln, damit die Multi-Tab-Erfassung in allen Tabs weiterläuft
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option("useAutomationExtension", False)
+
+        if self.cdp_capture:
+            # Network-Events werden für die CDP-Segmenterfassung über das Performance-Log gelesen
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+        if self.profile_store:
+            cache_argument = self.profile_store.acquire_cache_slot()
+            if cache_argument:
+                options.add_argument(cache_argument)
+
+        if self.proxyAddresse:
+            log(f"Konfiguriere Browser für Proxy: {self.proxyAddresse}")
+            options.add_argument(f"--proxy-server={self.proxyAddresse}")
+
+        # Adblock Plus Extension laden (Pfad im Container anpassen!)
+        adblock_path = "/app/src/adblockplus.crx"
+        if os.path.exists(adblock_path):
+            options.add_extension(adblock_path)
+        elif not self.lean_profile:
+            log(f"Adblock-Erweiterung '{adblock_path}' nicht gefunden. Werbung wird nur per DNS (Pi-hole) gefiltert.", "debug")
+        try:
+            selenium_hub_url = os.getenv(
+                "SELENIUM_HUB_URL", "http://selenium-chromium:4444/wd/hub"
+            )
+             
+            log(f"Chromium WebDriver erfolgreich mit {selenium_hub_url} verbunden.")
+            return webdriver.Remote(command_executor=selenium_hub_url, options=options)
+        except WebDriverException as e:
+            log(f"FEHLER beim Initialisieren des WebDriver: {e}", "error")
+            sys.exit(1)
+
+
+    def execute_cdp(self, cmd, params=None):
+        """Führt einen Chrome-DevTools-Befehl über die Remote-Session aus."""
+        return self.driver.execute(
+            "executeCdpCommand", {"cmd": cmd, "params": params or {}}
+        )["value"]
+
+    def start_segment_capture(self, store):
+        """Startet die CDP-Segmenterfassung in den angegebenen SegmentStore."""
+        self.segment_capture = CdpSegmentCapture(self, store)
+        return self.segment_capture
+
+    def handle_new_tabs_and_focus(self, main_window_handle: str):
+        """
+        Überprüft und schließt alle neuen Browser-Tabs (Pop-ups) und kehrt zum Haupt-Tab zurück.
+        Tabs in self.protected_handles (Multi-Tab-Erfassung) bleiben erhalten.
+        """
+        try:
+            handles = self.driver.window_handles
+            keep_handles = self.protected_handles | {main_window_handle}
+            popup_handles = [handle for handle in handles if handle not in keep_handles]
+            if popup_handles:
+                log(
+                    f"NEUE FENSTER/TABS ERKANNT: {len(popup_handles)} Pop-up(s). Schließe diese..."
+                )
+                for handle in popup_handles:
+                    if handle not in keep_handles:
+                        try:
+                            self.driver.switch_to.window(handle)
+                            self.driver.close()
+                            log(f"Pop-up-Tab '{handle}' geschlossen.")
+                        except Exception as e:
+                            log(
+                                f"WARNUNG: Konnte Pop-up-Tab '{handle}' nicht schließen: {e}",
+                                "warning",
+                            )
+                self.driver.switch_to.window(main_window_handle)  # Zurück zum Haupt-Tab
+                time.sleep(1)  # Kurze Pause nach dem Schließen
+        except Exception as e:
+            log(f"FEHLER: Probleme beim Verwalten von Browser-Fenstern: {e}", "error")
+
+
+    def get_current_video_progress(self):
+        """Holt den aktuellen Fortschritt des Hauptvideos."""
+        try:
+            video_element_exists = self.driver.execute_script(
+                "return document.querySelector('video')!== null;"
+            )
+            if not video_element_exists:
+                return 0, 0, True
+
+            current_time = self.driver.execute_script(
+                "return document.querySelector('video').currentTime;"
+            )
+            duration = self.driver.execute_script(
+                "return document.querySelector('video').duration;"
+            )
+            paused = self.driver.execute_script("return document.querySelector('video').paused;")
+
+            if current_time is None or duration is None:
+                return 0, 0, True
+
+            return current_time, duration, paused
+        except WebDriverException:
+            return 0, 0, True
 
 
     def get_episode_title(self) -> str:
@@ -392,7 +1700,7 @@ class driverManager:
             # Zuerst versuchen, klickbare Elemente zu finden und zu klicken
             for selector in popup_close_selectors:
                 try:
-                    element = WebDriverWait(self.driver, 0.5).until(
+                    element = WebDriverWait(self.driver, self.popup_wait).until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
                     )
                     log(f"Versuche, Popup mit Klick-Selektor '{selector}' zu schließen.")
@@ -621,6 +1929,9 @@ class driverManager:
         log(f"\nNavigiere zu: {url}")
         self.driver.get(url)
         main_window_handle = self.driver.current_window_handle
+        if self.profile_store and self.profile_store.has_profile(self.driver.current_url):
+            log("Warmes Profil für diesen Hoster vorhanden. Verkürze Popup-Suche.")
+            self.popup_wait = 0.1
 
         WebDriverWait(self.driver, DEFAULT_TIMEOUT).until(
             EC.presence_of_element_located((By.TAG_NAME, "body"))
@@ -863,7 +2174,7 @@ class driverManager:
                         break  # Innere Schleife beenden, wenn Video gestartet
 
                 if video_started_successfully:
-                    m3u8_manager = get_m3u8_urls(self.driver, "/app/Logs/m3u8_files")
+                    m3u8_manager = get_m3u8_urls(self.driver, self.m3u8_output_dir)
                     self.m3u8_files_dict = m3u8_manager.m3u8_files_dict
                     self.m3u8_first_filepath = m3u8_manager.m3u8_first_filepath
                     
@@ -892,7 +2203,7 @@ class driverManager:
         log(
             "Starte Überwachung der Videowiedergabe und Netzwerkanfragen bis zum Ende des Videos..."
         )
-        ts_urls = set()
+        ts_urls = SegmentIndex()
 
         last_current_time = 0.0
         stalled_check_time = time.time()
@@ -900,6 +2211,10 @@ class driverManager:
 
         max_monitoring_time_if_duration_unknown = 2 * 3600  # 2 Stunden in Sekunden
         overall_monitoring_start_time = time.time()
+        poll_interval = 3
+        if self.accelerated_playback:
+            self.accelerated_playback.start()
+            poll_interval = self.accelerated_playback.POLL_INTERVAL
 
         while True:
             current_time, duration, paused = self.get_current_video_progress()
@@ -927,6 +2242,9 @@ class driverManager:
             else:
                 stalled_check_time = time.time()
 
+            if self.accelerated_playback:
+                self.accelerated_playback.tick(current_time, last_current_time)
+
             last_current_time = current_time
 
             if (
@@ -940,11 +2258,22 @@ class driverManager:
                 )
                 break
 
-            ts_urls.update(self.extract_segment_urls_from_performance_logs())
+            ts_urls.update(self.collect_segment_urls())
+
+            time.sleep(poll_interval)  # Pause, um Browser-Aktivität zu beobachten und Logs zu sammeln
 
-            time.sleep(3)  # Pause, um Browser-Aktivität zu beobachten und Logs zu sammeln
+        ts_urls.update(self.collect_segment_urls())
+        if self.accelerated_playback:
+            self.accelerated_playback.recover_missing_segments(ts_urls, self.collect_segment_urls)
+        if self.segment_capture:
+            log(
+                f"{len(self.segment_capture.captured_urls)} Segmente direkt aus dem Browser übernommen."
+            )
 
-        log(f"Überwachung beendet. Insgesamt {len(ts_urls)} einzigartige TS-URLs gefunden.")
+        log(
+            f"Überwachung beendet. Insgesamt {len(ts_urls)} einzigartige Segmente gefunden "
+            f"({ts_urls.duplicate_count()} doppelte URLs zusammengefasst)."
+        )
 
         if not ts_urls:
             log(
@@ -957,7 +2286,11 @@ class driverManager:
                 [],
             )  # Keine Selektoren zurückgeben, da sie lokal sind
 
-        sorted_ts_urls = ts_urls #sorted(list(ts_urls))
+        self.segment_index = ts_urls
+        sorted_ts_urls = ts_urls.ordered_urls()
+
+        if self.profile_store:
+            self.profile_store.save(self)
 
         return (
             True,
@@ -966,6 +2299,13 @@ class driverManager:
         )  # Keine Selektoren zurückgeben, da sie lokal sind
 
 
+    def collect_segment_urls(self):
+        """Sammelt neue Segment-URLs aus den Resource-Timings und, falls aktiv, aus der CDP-Erfassung."""
+        urls = self.extract_segment_urls_from_performance_logs()
+        if self.segment_capture:
+            urls.update(self.segment_capture.poll())
+        return urls
+
     # --- Neue Hilfsfunktion zum Extrahieren von URLs ---
     def extract_segment_urls_from_performance_logs(self):
         """
@@ -986,20 +2326,7 @@ class driverManager:
                 log_entry
             ) in logs:  # "log" war bereits eine Funktion, umbenannt zu "log_entry"
                 url = log_entry.get("name", "")
-                if (
-                    ".ts" in url
-                    or ".m4s" in url
-                    or ".mp4" in url
-                    and "segment" in url  # Erkennung für MP4 Segmente
-                    or "seg-" in url
-                    or ".mpd" in url  # DASH Manifeste
-                    # or ".m3u8" in url # HLS Manifeste
-                    or re.search(r"\/\d+\.ts", url)
-                    or re.search(r"chunk-\d+\.m4s", url)
-                    or re.search(r"manifest\.fmp4", url)  # Beispiel für FMP4 Manifest
-                    or re.search(r"\.mpd\b", url)  # Genauere Erkennung von .mpd als Endung
-                    # or re.search(r'\.m3u8\b', url) # Genauere Erkennung von .m3u8 als Endung
-                ):
+                if is_video_segment_url(url):
                     found_urls.add(url)
         except WebDriverException as e:
             log(f"Fehler beim Abrufen oder Leeren der Performance-Logs: {e}", "error")
@@ -1009,103 +2336,497 @@ class driverManager:
 
 
 
+class MultiTabCaptureScheduler:
+    """
+    Erfasst mehrere Episoden in getrennten Tabs einer einzigen Browser-Session.
+    Die Manifest-Suche besteht größtenteils aus Warten; der Scheduler wechselt daher reihum
+    zwischen den Tabs und führt pro Tab nur einen kurzen, nicht blockierenden Schritt aus.
+    Jeder Tab merkt sich seinen eigenen Haupt-Handle, damit Pop-ups weiterhin geschlossen werden.
+    """
+
+    TICK_INTERVAL = 1  # Sekunden Pause nach jeder Runde über alle Tabs
+    PAGE_LOAD_TIMEOUT = DEFAULT_TIMEOUT
+    MANIFEST_TIMEOUT = VIDEO_START_TIMEOUT
+
+    def __init__(self, driver_manager, urls, m3u8_output_dir=M3U8_BASE_DIR):
+        self.driver_manager = driver_manager
+        self.driver = driver_manager.driver
+        self.urls = urls
+        self.m3u8_output_dir = m3u8_output_dir
+        self.tabs = []
+
+    def open_tabs(self):
+        """Öffnet pro URL einen Tab und startet die Navigation ohne auf das Laden zu warten."""
+        for i, url in enumerate(self.urls):
+            if i == 0:
+                self.driver.switch_to.window(self.driver_manager.main_window_handle)
+            else:
+                self.driver.switch_to.new_window("tab")
+            handle = self.driver.current_window_handle
+            if self.driver.current_url == url:
+                # Sonst ließe sich das Laden der Episode nicht vom bereits geladenen Dokument unterscheiden
+                self.driver.get("about:blank")
+            start_url = self.driver.current_url  # about:blank bzw. vorherige Seite des Haupt-Tabs
+            self.driver_manager.protected_handles.add(handle)
+            if self.driver_manager.lean_profile:
+                # URL-Sperren gelten pro Tab (CDP-Target) und müssen neu gesetzt werden
+                self.driver_manager.lean_profile.apply_to_session(self.driver_manager)
+            if self.driver_manager.profile_store and i > 0:
+                self.driver_manager.profile_store.restore(self.driver_manager)
+            self.driver.execute_script("window.location.href = arguments[0];", url)
+            self.tabs.append(
+                {
+                    "url": url,
+                    "start_url": start_url,
+                    "handle": handle,
+                    "phase": "loading",
+                    "phase_started": time.time(),
+                    "episode_title": None,
+                    "m3u8_dir": os.path.join(self.m3u8_output_dir, handle),
+                    "m3u8_files_dict": {},
+                    "m3u8_first_filepath": None,
+                    "ts_urls": [],
+                }
+            )
+            log(f"Tab {i + 1}/{len(self.urls)} geöffnet für: {url}")
+
+    def focus(self, tab):
+        self.driver.switch_to.window(tab["handle"])
+        self.driver_manager.main_window_handle = tab["handle"]
+
+    def set_phase(self, tab, phase):
+        tab["phase"] = phase
+        tab["phase_started"] = time.time()
+
+    def step(self, tab):
+        """Führt einen kurzen Schritt für einen Tab aus."""
+        elapsed = time.time() - tab["phase_started"]
+
+        if tab["phase"] == "loading":
+            # Bis die Navigation greift, meldet das alte Dokument (about:blank/vorherige Seite) schon 'complete'
+            navigated = self.driver.current_url != tab["start_url"]
+            ready_state = self.driver.execute_script("return document.readyState;")
+            if navigated and ready_state in ("interactive", "complete"):
+                self.driver_manager.close_overlays_and_iframes()
+                tab["episode_title"] = self.driver_manager.get_episode_title()
+                log(f"Tab geladen: {tab['episode_title']}")
+                self.set_phase(tab, "starting")
+            elif elapsed > self.PAGE_LOAD_TIMEOUT:
+                log(f"Seite in Tab konnte nicht geladen werden: {tab['url']}", "error")
+                self.set_phase(tab, "failed")
+
+        elif tab["phase"] == "starting":
+            self.driver.execute_script(
+                "var v = document.querySelector('video'); if (v) { v.muted = true; v.play(); }"
+            )
+            current_time, duration, paused = self.driver_manager.get_current_video_progress()
+            if duration > 0 and current_time > 0.1 and not paused:
+                log(f"Video in Tab '{tab['episode_title']}' gestartet.")
+                self.set_phase(tab, "waiting_manifest")
+            elif elapsed > VIDEO_START_TIMEOUT:
+                log(f"Video in Tab '{tab['episode_title']}' konnte nicht gestartet werden.", "error")
+                self.set_phase(tab, "failed")
+            elif int(elapsed) % 10 == 0:
+                self.driver_manager.close_overlays_and_iframes()
+
+        elif tab["phase"] == "waiting_manifest":
+            # Eigener Unterordner pro Tab, da die Playlists aller Tabs meist gleich heißen
+            m3u8_manager = get_m3u8_urls(self.driver, tab["m3u8_dir"])
+            tab["m3u8_files_dict"].update(m3u8_manager.m3u8_files_dict)
+            tab["m3u8_first_filepath"] = tab["m3u8_first_filepath"] or m3u8_manager.m3u8_first_filepath
+            for playlist_url, filepath in tab["m3u8_files_dict"].items():
+                segments = parse_m3u8_playlist(filepath, playlist_url)
+                if segments:
+                    tab["ts_urls"] = [segment["url"] for segment in segments]
+                    break
+            if tab["ts_urls"]:
+                log(f"Manifest für '{tab['episode_title']}' gefunden ({len(tab['ts_urls'])} Segmente).")
+                # Wiedergabe anhalten, damit der fertige Tab keine CPU mehr belegt
+                self.driver.execute_script("var v = document.querySelector('video'); if (v) v.pause();")
+                if self.driver_manager.profile_store:
+                    self.driver_manager.profile_store.save(self.driver_manager)
+                self.set_phase(tab, "done")
+            elif elapsed > self.MANIFEST_TIMEOUT:
+                log(f"Kein Manifest für '{tab['episode_title']}' gefunden.", "error")
+                self.set_phase(tab, "failed")
+
+    def close_tab(self, tab):
+        """Schließt einen abgeschlossenen Tab, sofern noch andere Tabs offen sind."""
+        if len(self.driver.window_handles) <= 1:
+            return
+        try:
+            self.driver.close()
+        except WebDriverException as e:
+            log(f"WARNUNG: Tab konnte nicht geschlossen werden: {e}", "warning")
+        self.driver_manager.protected_handles.discard(tab["handle"])
+        remaining = self.driver.window_handles
+        if remaining:
+            self.driver.switch_to.window(remaining[0])
+            self.driver_manager.main_window_handle = remaining[0]
+
+    def run(self):
+        """
+        Erfasst alle URLs reihum und gibt pro URL ein Dictionary mit 'url', 'success',
+        'episode_title', 'ts_urls', 'm3u8_dir', 'm3u8_first_filepath' und 'm3u8_files_dict' zurück.
+        """
+        self.open_tabs()
+        while any(tab["phase"] not in ("done", "failed") for tab in self.tabs):
+            for tab in self.tabs:
+                if tab["phase"] in ("done", "failed"):
+                    continue
+                try:
+                    self.focus(tab)
+                    self.step(tab)
+                except WebDriverException as e:
+                    log(f"FEHLER im Tab für {tab['url']}: {e}", "error")
+                    self.set_phase(tab, "failed")
+                if tab["phase"] in ("done", "failed"):
+                    self.close_tab(tab)
+            time.sleep(self.TICK_INTERVAL)
+
+        return [
+            {
+                "url": tab["url"],
+                "success": tab["phase"] == "done",
+                "episode_title": tab["episode_title"] or self.driver_manager.get_episode_title(),
+                "ts_urls": tab["ts_urls"],
+                "m3u8_dir": tab["m3u8_dir"],
+                "m3u8_first_filepath": tab["m3u8_first_filepath"],
+                "m3u8_files_dict": tab["m3u8_files_dict"],
+            }
+            for tab in self.tabs
+        ]
+
+
 # --- Hauptausführung ---
+class TsSegmentValidator:
+    """
+    Prüft heruntergeladene MPEG-TS-Segmente, ohne sie in Python Byte für Byte zu lesen.
+    Jedes Segment wird per NumPy-memmap eingeblendet und als (Pakete x 188)-Matrix betrachtet;
+    Sync-Bytes und Continuity-Counter werden vektorisiert über alle Pakete geprüft.
+    """
+
+    PACKET_SIZE = 188
+    SYNC_BYTE = 0x47
+    NULL_PID = 0x1FFF
+
+    def validate(self, filepath):
+        """
+        Prüft ein Segment und gibt einen Bericht zurück:
+        'path', 'size', 'packets', 'sync_errors', 'continuity_errors', 'trailing_bytes', 'valid'.
+        Gültig ist ein Segment mit mindestens einem Paket und ohne Sync-Fehler.
+        """
+        report = {
+            "path": filepath,
+            "size": 0,
+            "packets": 0,
+            "sync_errors": 0,
+            "continuity_errors": 0,
+            "trailing_bytes": 0,
+            "valid": False,
+        }
+        try:
+            report["size"] = os.path.getsize(filepath)
+            packet_count = report["size"] // self.PACKET_SIZE
+            report["trailing_bytes"] = report["size"] % self.PACKET_SIZE
+            if packet_count == 0:
+                return report
+            data = np.memmap(filepath, dtype=np.uint8, mode="r", shape=(packet_count * self.PACKET_SIZE,))
+        except (OSError, ValueError) as e:
+            log(f"Segment '{filepath}' konnte nicht gelesen werden: {e}", "warning")
+            return report
+
+        # Nur die ersten 6 Bytes jedes Pakets (Header + Adaptation-Flags) werden tatsächlich gelesen
+        headers = np.array(data.reshape(packet_count, self.PACKET_SIZE)[:, :6])
+        del data  # memmap freigeben
+        report["packets"] = packet_count
+        in_sync = headers[:, 0] == self.SYNC_BYTE
+        report["sync_errors"] = int(packet_count - np.count_nonzero(in_sync))
+        report["continuity_errors"] = self.count_continuity_errors(headers[in_sync])
+        report["valid"] = report["sync_errors"] == 0
+        return report
+
+    def count_continuity_errors(self, packets):
+        """
+        Zählt Sprünge der 4-Bit-Continuity-Counter je PID ('packets': Paket-Header, mind. 6 Bytes). Gezählt werden nur Pakete mit Payload;
+        Wiederholungen (gleicher Zähler) und gesetzte Discontinuity-Indikatoren gelten nicht als Fehler.
+        """
+        if not len(packets):
+            return 0
+        pids = ((packets[:, 1].astype(np.uint16) & 0x1F) << 8) | packets[:, 2]
+        adaptation_control = (packets[:, 3] >> 4) & 0x03
+        counters = packets[:, 3] & 0x0F
+        has_payload = (adaptation_control & 0x01).astype(bool) & (pids != self.NULL_PID)
+        discontinuity = (
+            ((adaptation_control & 0x02) != 0) & (packets[:, 4] > 0) & ((packets[:, 5] & 0x80) != 0)
+        )
+
+        pids, counters, discontinuity = pids[has_payload], counters[has_payload], discontinuity[has_payload]
+        order = np.argsort(pids, kind="stable")  # innerhalb einer PID bleibt die Paketreihenfolge erhalten
+        pids, counters, discontinuity = pids[order], counters[order], discontinuity[order]
+        same_pid = pids[1:] == pids[:-1]
+        step = (counters[1:].astype(np.int16) - counters[:-1]) % 16
+        errors = same_pid & (step != 1) & (step != 0) & ~discontinuity[1:]
+        return int(np.count_nonzero(errors))
+
+    def validate_all(self, filepaths):
+        """Prüft alle Segmente und gibt die Berichte in derselben Reihenfolge zurück."""
+        return [self.validate(filepath) for filepath in filepaths]
+
+
 class MergerManager:
-    """ Verwaltet das Zusammenführen von TS-Dateien mit FFmpeg.
-    Diese Klasse enthält Methoden zum Finden des FFmpeg-Executables, Überprüfen von TS-Dateien
-    und Zusammenführen von TS-Dateien in eine einzelne Datei.
+    """ Verwaltet das Zusammenführen von TS-Dateien.
+    Gültige Segmente werden im Kernel direkt aneinandergehängt (copy_file_range bzw. sendfile),
+    ohne die Daten durch Python zu kopieren. FFmpeg wird nur noch für das optionale Remuxen
+    mit '-c copy' gestartet und bekommt die Segmente direkt über eine Pipe.
+    fMP4/CMAF-Quellen (.m4s) werden ohne FFmpeg als Init-Segment plus Fragmente geschrieben.
     Sie ist so konzipiert, dass sie in einem Docker-Container läuft, in dem FFmpeg bereits installiert ist.
     """
- 
-    def __init__(self, ts_file_paths, temp_input_file, output_video_path=None):
+
+    OUTPUT_FORMATS = ("mp4", "fmp4", "ts")
+    FRAGMENTED_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+    COPY_CHUNK_SIZE = 64 * 1024 * 1024
+    _ffmpeg_lookup = {}  # Ergebnis der PATH-Suche, einmal pro Prozess
+
+    def __init__(self, ts_file_paths, output_video_path=None, output_format="mp4", init_segment_path=None):
         self.ffmpeg_exec_path = self.find_ffmpeg_executable()
         self.ts_file_paths = ts_file_paths
         self.output_filepath = output_video_path or os.path.join(os.path.expanduser('~'), 'Downloads')
-        self.temp_input_file = temp_input_file 
-        
-    
-    def find_ffmpeg_executable(self):
+        self.output_format = output_format
+        self.init_segment_path = init_segment_path  # Init-Segment (moov) bei fMP4-Quellen
+        self.health_report = []  # Prüfberichte des TsSegmentValidator je Segment
+
+    @classmethod
+    def find_ffmpeg_executable(cls):
         """
         Findet den FFmpeg-Executable-Pfad im System-PATH des Docker-Containers.
         Da FFmpeg im Dockerfile installiert wird, sollte 'ffmpeg' direkt im PATH sein.
+        Das Ergebnis wird für alle weiteren Instanzen zwischengespeichert.
         """
+        if "path" not in cls._ffmpeg_lookup:
+            cls._ffmpeg_lookup["path"] = shutil.which("ffmpeg")
+            if cls._ffmpeg_lookup["path"]:
+                log("FFmpeg im System-PATH gefunden.")
+            else:
+                log(
+                    "WARNUNG: FFmpeg wurde nicht gefunden. Folgen werden als .ts statt .mp4 gespeichert.",
+                    "warning",
+                )
+        return cls._ffmpeg_lookup["path"]
+
+    @staticmethod
+    def is_valid_fmp4_fragment(filepath):
+        """
+        Prüft ein fMP4-Fragment bzw. Init-Segment: Die Top-Level-Boxen müssen lückenlos
+        bis zum Dateiende reichen und bekannte Typen haben.
+        """
+        known_boxes = {b"ftyp", b"styp", b"moov", b"moof", b"mdat", b"sidx", b"prft", b"emsg", b"free", b"skip"}
         try:
-            subprocess.run(["which", "ffmpeg"], check=True, capture_output=True, text=True)
-            log("FFmpeg im System-PATH gefunden.")
-            return "ffmpeg"
-        except subprocess.CalledProcessError:
-            log(
-                "FEHLER: FFmpeg wurde nicht gefunden. Stellen Sie sicher, dass es im Docker-Container installiert ist.",
-                "error",
+            size = os.path.getsize(filepath)
+            if size < 8:
+                return False
+            with open(filepath, "rb") as f:
+                offset = 0
+                while offset < size:
+                    f.seek(offset)
+                    header = f.read(16)
+                    if len(header) < 8:
+                        return False
+                    box_size, box_type = struct.unpack(">I4s", header[:8])
+                    if box_size == 1 and len(header) == 16:
+                        box_size = struct.unpack(">Q", header[8:16])[0]
+                    elif box_size == 0:
+                        box_size = size - offset  # Box reicht bis zum Dateiende
+                    if box_type not in known_boxes or box_size < 8:
+                        return False
+                    offset += box_size
+                return offset == size
+        except OSError:
+            return False
+
+    @classmethod
+    def concat_files(cls, source_paths, target_path):
+        """
+        Hängt die Dateien im Kernel aneinander: copy_file_range, sonst sendfile,
+        als letzter Ausweg shutil.copyfileobj. Gibt die Anzahl geschriebener Bytes zurück.
+        """
+        with open(target_path, "wb") as target:
+            return cls.write_files(source_paths, target)
+
+    @classmethod
+    def write_files(cls, source_paths, target):
+        """Schreibt die Dateien nacheinander in das geöffnete Ziel (Datei oder Pipe)."""
+        written = 0
+        for source_path in source_paths:
+            with open(source_path, "rb") as source:
+                remaining = os.fstat(source.fileno()).st_size
+                while remaining > 0:
+                    count = cls.copy_chunk(source, target, min(remaining, cls.COPY_CHUNK_SIZE))
+                    if count <= 0:
+                        break
+                    remaining -= count
+                    written += count
+        return written
+
+    @staticmethod
+    def copy_chunk(source, target, count):
+        """Kopiert 'count' Bytes ab der aktuellen Position von 'source' ans Ende von 'target'."""
+        if hasattr(os, "copy_file_range"):
+            try:
+                return os.copy_file_range(source.fileno(), target.fileno(), count)
+            except OSError:
+                pass  # z.B. bei Pipes oder über Dateisystemgrenzen bei älteren Kerneln
+        if hasattr(os, "sendfile"):
+            try:
+                offset = source.tell()
+                sent = os.sendfile(target.fileno(), source.fileno(), offset, count)
+                source.seek(offset + sent)
+                return sent
+            except OSError:
+                pass
+        data = source.read(count)
+        target.write(data)
+        return len(data)
+
+    def remux(self, source_paths, output_path, fragmented=False):
+        """
+        Remuxt die Segmente ohne Neukodierung nach MP4. Die Segmente werden FFmpeg direkt über
+        stdin zugeführt, es entsteht keine zusammengefügte Zwischendatei. Mit 'fragmented' wird
+        fragmentiertes MP4 geschrieben, das schon während des Schreibens abspielbar ist und
+        keinen zweiten Durchlauf für 'faststart' braucht.
+        Die Ausgabe von FFmpeg geht in eine Logdatei statt in den Speicher des Prozesses.
+        """
+        ffmpeg_log_path = f"{output_path}.ffmpeg.log"
+        command = [
+            self.ffmpeg_exec_path,
+            "-y",  # Überschreibt die Zieldatei ohne Nachfrage
+            "-hide_banner",
+            "-nostats",
+            "-loglevel",
+            "warning",
+            "-f",
+            "mpegts",
+            "-i",
+            "pipe:0",  # Segmente kommen über stdin
+            "-c",
+            "copy",  # Kopiert alle Streams unverändert
+            "-bsf:a",
+            "aac_adtstoasc",  # Wandelt AAC-Streams korrekt um
+            "-map_metadata",
+            "-1",  # Entfernt Metadaten
+        ]
+        if fragmented:
+            command += ["-movflags", self.FRAGMENTED_MOVFLAGS]
+        command.append(output_path)  # Zieldatei
+        log(f"Führe FFmpeg-Befehl aus: {' '.join(command)}")
+        with open(ffmpeg_log_path, "w") as ffmpeg_log:
+            process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=ffmpeg_log
             )
-            return None
+            try:
+                written = self.write_files(source_paths, process.stdin)
+                log(f"{written / 1_000_000:.1f} MB an FFmpeg übergeben.", "debug")
+            except BrokenPipeError:
+                log("FFmpeg hat die Eingabe vorzeitig geschlossen.", "warning")
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+            returncode = process.wait()
+        with open(ffmpeg_log_path, "r", errors="replace") as ffmpeg_log:
+            stderr_lines = ffmpeg_log.read().splitlines()
+        os.remove(ffmpeg_log_path)
+        if returncode != 0:
+            log(f"FEHLER beim Remuxen mit FFmpeg (Exit Code {returncode}).", "error")
+            if stderr_lines:
+                log(f"FFmpeg Stderr (gekürzt): \n" + "\n".join(stderr_lines[-10:]), "error")
+            return False
+        if stderr_lines:
+            log("\n--- FFmpeg Fehler-Ausgabe (gekürzt) ---")
+            log("\n".join(stderr_lines[-10:]), "warning")
+        return True
 
+    def merge_fmp4_fragments(self):
+        """
+        Schreibt Init-Segment und Media-Fragmente einer fMP4/CMAF-Quelle hintereinander in die
+        Zieldatei. Das Ergebnis ist bereits ein fragmentiertes MP4, FFmpeg wird nicht benötigt.
+        """
+        if not self.init_segment_path or not self.is_valid_fmp4_fragment(self.init_segment_path):
+            log("FEHLER: Kein gültiges Init-Segment für die fMP4-Fragmente vorhanden.", "error")
+            return False
+        valid_files = []
+        for path in self.ts_file_paths:
+            if self.is_valid_fmp4_fragment(path):
+                valid_files.append(path)
+            else:
+                log(f"WARNUNG: Fragment fehlt, ist leer oder kein gültiges fMP4: {path}", "warning")
+        if not valid_files:
+            log("FEHLER: Keine gültigen fMP4-Fragmente zum Zusammenfügen gefunden.", "error")
+            return False
 
-    def is_valid_ts_file(self, filepath):
-        """Prüft, ob die Datei wie ein MPEG-TS beginnt (0x47 als erstes Byte)."""
+        self.output_filepath = f"{os.path.splitext(self.output_filepath)[0]}.mp4"
+        part_path = f"{self.output_filepath}.part"
         try:
-            with open(filepath, "rb") as f:
-                first_byte = f.read(1)
-                return first_byte == b"\x47"
-        except Exception:
+            started = time.monotonic()
+            written = self.concat_files([self.init_segment_path] + valid_files, part_path)
+            os.replace(part_path, self.output_filepath)
+        except OSError as e:
+            log(f"FEHLER beim Zusammenfügen der fMP4-Fragmente: {e}", "error")
+            if os.path.exists(part_path):
+                os.remove(part_path)
             return False
-
+        log(
+            f"Init-Segment und {len(valid_files)} Fragmente ohne FFmpeg zusammengefügt "
+            f"({written / 1_000_000:.1f} MB in {time.monotonic() - started:.2f}s)."
+        )
+        return True
 
     def merge_ts_files(self):
-        """Führt TS-Dateien mit FFmpeg zusammen.
+        """Führt die Segmente zu einer Datei zusammen.
 
-        Die temporäre input.txt-Datei wird im selben Verzeichnis wie die TS-Segmente gespeichert,
-        um Konflikte bei mehreren gleichzeitigen oder aufeinanderfolgenden Sessions zu vermeiden.
+        fMP4-Quellen (.m4s) werden als Init-Segment plus Fragmente geschrieben. TS-Segmente werden
+        geprüft; im Format 'ts' werden gültige direkt im Kernel aneinandergehängt, in den Formaten
+        'mp4' und 'fmp4' per Pipe an FFmpeg übergeben und ohne Neukodierung remuxt. Fehlt FFmpeg,
+        entsteht eine .ts-Datei und 'output_filepath' zeigt auf sie.
         """
-        if not self.ffmpeg_exec_path:
-            log(
-                "FEHLER: FFmpeg-Executable nicht gefunden. Kann Dateien nicht zusammenführen.",
-                "error",
-            )
-            return False
+        if self.ts_file_paths and all(path.endswith(".m4s") for path in self.ts_file_paths):
+            return self.merge_fmp4_fragments()
 
         # Bestimme das Verzeichnis der TS-Dateien.
         # Wir nehmen an, dass alle TS-Dateien im selben temporären Verzeichnis liegen.
-        # Dies ist der Ordner, in dem auch die input.txt erstellt werden soll.
+        # Dort entsteht auch die zusammengefügte Zwischendatei.
         ts_files_directory = (
             os.path.dirname(self.ts_file_paths[0])
             if self.ts_file_paths
             else os.path.dirname(self.output_filepath)
         )
 
-        # Erstelle einen einzigartigen temporären Dateinamen für input.txt
-        # Dies verhindert Überschreibungen bei mehreren gleichzeitigen oder aufeinanderfolgenden Sessions
-        #temp_input_file = get_unique_filename(
-        #    os.path.join(ts_files_directory, "ffmpeg_input"), "txt"
-        #)
-
+        concat_path = None
         try:
             valid_files = []
-            #log(f"Erstelle input.txt unter: {m3u8_filepath}")
-            #os.makedirs(
-            #    ts_files_directory, exist_ok=True
-            #)  # Sicherstellen, dass der Ordner existiert
-            #with open(temp_input_file, "w", newline="\n") as f:
-            #    for p in self.ts_file_paths:
-            #        abs_path = os.path.abspath(p)
-            #        exists = os.path.exists(abs_path)
-            #        size = os.path.getsize(abs_path) if exists else 0
-            #        valid_ts =self. is_valid_ts_file(abs_path) if exists and size > 0 else False
-            #        log(
-            #            f"Prüfe Segment: {abs_path} | Existiert: {exists} | Größe: {size} | MPEG-TS: {valid_ts}"
-            #        )
-            #        if exists and size > 0 and valid_ts:
-            #            f.write(f"file '{abs_path.replace(os.sep, '/')}'\n")
-            #            valid_files.append(abs_path)
-            #        else:
-            #            log(
-            #                f"WARNUNG: Segment fehlt, ist leer oder kein gültiges TS-Format: {abs_path}",
-            #                "warning",
-            #            )
-
-            log("Inhalt von input.txt:")
-            with open(self.temp_input_file, "r") as f:
-                log(f.read())
+            started = time.monotonic()
+            reports = TsSegmentValidator().validate_all([os.path.abspath(p) for p in self.ts_file_paths])
+            for report in reports:
+                if report["valid"]:
+                    valid_files.append(report["path"])
+                else:
+                    log(
+                        f"WARNUNG: Segment fehlt, ist leer oder kein gültiges TS-Format: {report['path']} "
+                        f"(Größe: {report['size']}, Sync-Fehler: {report['sync_errors']})",
+                        "warning",
+                    )
+                if report["continuity_errors"] or report["trailing_bytes"]:
+                    log(
+                        f"Segment '{os.path.basename(report['path'])}': {report['continuity_errors']} Continuity-Fehler, "
+                        f"{report['trailing_bytes']} überzählige Bytes.",
+                        "debug",
+                    )
+            self.health_report = reports
+            log(
+                f"{len(valid_files)}/{len(reports)} Segmente gültig "
+                f"({sum(r['size'] for r in reports) / 1_000_000:.1f} MB in {time.monotonic() - started:.3f}s geprüft)."
+            )
 
             if not valid_files:
                 log(
@@ -1113,62 +2834,389 @@ class MergerManager:
                 )
                 return False
 
-            command = [
-                self.ffmpeg_exec_path,
-                "-y",  # Überschreibt die Zieldatei ohne Nachfrage
-                "-f",
-                "concat",  # Nutzt das concat-Format für die input.txt
-                "-safe",
-                "0",  # Erlaubt absolute Pfade in input.txt
-                "-i",
-                self.temp_input_file,  # Pfad zur input.txt
-                "-c:v",
-                "copy",  # Kopiert den Videostream unverändert
-                "-c:a",
-                "copy",  # Kopiert den Audiostream unverändert
-                "-bsf:a",
-                "aac_adtstoasc",  # Wandelt AAC-Streams korrekt um
-                "-map_metadata",
-                "-1",  # Entfernt Metadaten
-                self.output_filepath,  # Zieldatei
-            ]
-            log(f"Führe FFmpeg-Befehl aus: {' '.join(command)}")
-            process = subprocess.run(command, check=True, capture_output=True, text=True)
-            log(f"Alle Segmente erfolgreich zu '{self.output_filepath}' zusammengeführt.")
-
-            stdout_lines = process.stdout.splitlines()
-            stderr_lines = process.stderr.splitlines()
-
-            if stdout_lines:
-                log("\n--- FFmpeg Standardausgabe (gekürzt) ---")
-                log("\n".join(stdout_lines[-10:]))
-
-            if stderr_lines:
-                log("\n--- FFmpeg Fehler-Ausgabe (gekürzt) ---")
-                log("\n".join(stderr_lines[-10:]), "warning")
+            if self.output_format in ("mp4", "fmp4") and self.ffmpeg_exec_path:
+                return self.remux(valid_files, self.output_filepath, fragmented=self.output_format == "fmp4")
 
-            return True
-        except subprocess.CalledProcessError as e:
+            self.output_filepath = f"{os.path.splitext(self.output_filepath)[0]}.ts"
+            # Zwischendatei neben den Segmenten (gleiches Dateisystem wie die Quellen)
+            concat_path = os.path.join(ts_files_directory, "merged.ts.part")
+            started = time.monotonic()
+            written = self.concat_files(valid_files, concat_path)
+            shutil.move(concat_path, self.output_filepath)
             log(
-                f"FEHLER beim Zusammenführen mit FFmpeg (Exit Code {e.returncode}): {e}",
-                "error",
+                f"{len(valid_files)} Segmente zu '{self.output_filepath}' zusammengefügt "
+                f"({written / 1_000_000:.1f} MB in {time.monotonic() - started:.2f}s)."
             )
-            stdout_lines = e.stdout.splitlines()
-            stderr_lines = e.stderr.splitlines()
-            if stdout_lines:
-                log(f"FFmpeg Stdout (gekürzt): \n" + "\n".join(stdout_lines[-10:]))
-            if stderr_lines:
-                log(f"FFmpeg Stderr (gekürzt): \n" + "\n".join(stderr_lines[-10:]), "error")
+            return True
+        except OSError as e:
+            log(f"FEHLER beim Zusammenfügen der Segmente: {e}", "error")
             return False
         except Exception as e:
             log(f"Ein unerwarteter Fehler ist aufgetreten: {e}", "error")
             return False
         finally:
-            # Sicherstellen, dass die temporäre input.txt Datei immer gelöscht wird
-            if os.path.exists(self.temp_input_file):
-                pass
-                #os.remove(self.temp_input_file)
-                
+            # Sicherstellen, dass die Zwischendatei immer gelöscht wird
+            if concat_path and os.path.exists(concat_path):
+                os.remove(concat_path)
+
+
+def find_init_segment_urls(m3u8_files_dict):
+    """Liefert die Init-Segment-URLs ('#EXT-X-MAP') aller gespeicherten Playlists einer Episode."""
+    init_urls = []
+    for playlist_url, filepath in (m3u8_files_dict or {}).items():
+        init_url = parse_m3u8_init_segment(filepath, playlist_url)
+        if init_url and init_url not in init_urls:
+            init_urls.append(init_url)
+    return init_urls
+
+
+def download_init_segment(m3u8_files_dict, directory, init_urls=None):
+    """
+    Lädt das Init-Segment einer fMP4/CMAF-Quelle. Bevorzugt werden die bei der Erfassung im
+    Capture-Manifest festgehaltenen URLs, sonst die Playlists der Episode.
+    Gibt den lokalen Pfad oder None zurück.
+    """
+    for init_url in init_urls or find_init_segment_urls(m3u8_files_dict):
+        init_path = os.path.join(directory, "init.mp4")
+        try:
+            fetch_to_file(init_url, init_path, timeout=(10, 30))
+            log(f"Init-Segment von '{init_url}' geladen.")
+            return init_path
+        except requests.exceptions.RequestException as e:
+            log(f"FEHLER beim Herunterladen des Init-Segments '{init_url}': {e}", "error")
+    log("Keine Playlist mit Init-Segment (#EXT-X-MAP) gefunden.", "warning")
+    return None
+
+
+def merge_episode(job):
+    """
+    Führt die Segmente eines Merge-Auftrags zusammen und räumt den TS-Ordner auf.
+    Wird inline von download_and_merge_episode oder vom mergeWorker.py aufgerufen.
+    Der Auftrag enthält 'ts_files' (in Sequenzreihenfolge), 'output_path', 'output_format',
+    'init_segment_path' und 'temp_ts_dir'.
+    Gibt True zurück, wenn die Videodatei geschrieben wurde.
+    """
+    temp_ts_dir = job["temp_ts_dir"]
+    merger = MergerManager(
+        job["ts_files"],
+        job["output_path"],
+        job.get("output_format", "mp4"),
+        init_segment_path=job.get("init_segment_path"),
+    )
+    log("Starte Zusammenführung der TS-Dateien...")
+    if not merger.merge_ts_files():
+        log("\nZusammenführung der TS-Dateien fehlgeschlagen.", "error")
+        log(f"Temporäre TS-Dateien verbleiben in: {temp_ts_dir}")
+        return False
+
+    # Ohne FFmpeg wird statt .mp4 eine .ts-Datei geschrieben
+    final_output_video_path = merger.output_filepath
+    # Prüfe, ob die Datei wirklich existiert und nicht leer ist
+    if (
+        os.path.exists(final_output_video_path)
+        and os.path.getsize(final_output_video_path) > 0
+    ):
+        log(
+            f"\nFERTIG! Die Folge wurde erfolgreich gespeichert unter:\n{final_output_video_path}"
+        )
+    else:
+        log(
+            f"FEHLER: Die Videodatei wurde nach dem Merge nicht gefunden oder ist leer: {final_output_video_path}",
+            "error",
+        )
+        return False
+
+    log("Bereinige temporäre TS-Dateien...")
+    for f in job["ts_files"]:
+        try:
+            pass
+            #os.remove(f)
+        except OSError as e:
+            log(
+                f"Fehler beim Löschen von temporärer Datei {f}: {e}",
+                "error",
+            )
+    try:
+        # Versuch, das temporäre Verzeichnis zu löschen, wenn es leer ist
+        if not os.listdir(temp_ts_dir):
+            os.rmdir(temp_ts_dir)
+            log(
+                f"Temporäres Verzeichnis '{temp_ts_dir}' erfolgreich gelöscht."
+            )
+        else:
+            log(
+                f"Temporäres Verzeichnis '{temp_ts_dir}' ist nicht leer und wurde nicht gelöscht.",
+                "warning",
+            )
+    except OSError as e:
+        log(
+            f"Fehler beim Löschen des temporären Verzeichnisses {temp_ts_dir}: {e}",
+            "error",
+        )
+    log(
+        "\nDownload- und Zusammenführungsprozess erfolgreich abgeschlossen!"
+    )
+    return True
+
+
+class MergeQueue:
+    """
+    Spool-Verzeichnis für Merge-Aufträge.
+    VOE.py legt nach den Downloads einen Auftrag als JSON-Datei ab und gibt damit Browser und
+    Netzwerk sofort frei; mergeWorker.py holt die Aufträge ab und führt sie in einem eigenen,
+    an die CPU-Kerne gebundenen Prozess-Pool zusammen. Abgeholt wird per atomarem Umbenennen
+    nach 'working/', sodass sich mehrere Worker ein Spool-Verzeichnis teilen können.
+    """
+
+    STALE_AFTER = int(os.getenv("MERGE_JOB_TIMEOUT", "7200"))  # Sekunden, danach gilt ein Auftrag als verwaist
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.working_dir = os.path.join(directory, "working")
+        self.failed_dir = os.path.join(directory, "failed")
+        for path in (self.directory, self.working_dir, self.failed_dir):
+            os.makedirs(path, exist_ok=True)
+
+    def submit(self, job):
+        """Legt einen Auftrag atomar im Spool ab. Gibt den Pfad der Auftragsdatei zurück."""
+        name = f"{time.time_ns()}_{os.getpid()}.json"
+        temp_path = os.path.join(self.directory, f".{name}.part")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        job_path = os.path.join(self.directory, name)
+        os.replace(temp_path, job_path)
+        log(f"Merge-Auftrag für '{os.path.basename(job['output_path'])}' eingereiht: {job_path}")
+        return job_path
+
+    def pending_count(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def claim(self):
+        """Holt den ältesten offenen Auftrag ab. Gibt (Pfad in 'working/', Auftrag) oder None zurück."""
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            claimed_path = os.path.join(self.working_dir, name)
+            try:
+                os.rename(os.path.join(self.directory, name), claimed_path)
+            except FileNotFoundError:
+                continue  # Ein anderer Worker war schneller
+            os.utime(claimed_path)  # Zeitpunkt der Abholung für recover_stale()
+            try:
+                with open(claimed_path, "r", encoding="utf-8") as f:
+                    return claimed_path, json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                log(f"Merge-Auftrag '{name}' ist unlesbar: {e}", "error")
+                self.fail(claimed_path)
+        return None
+
+    def complete(self, claimed_path):
+        os.remove(claimed_path)
+
+    def fail(self, claimed_path):
+        os.replace(claimed_path, os.path.join(self.failed_dir, os.path.basename(claimed_path)))
+
+    def recover_stale(self):
+        """Stellt Aufträge abgestürzter Worker wieder in die Warteschlange."""
+        now = time.time()
+        for name in os.listdir(self.working_dir):
+            path = os.path.join(self.working_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.STALE_AFTER:
+                    os.replace(path, os.path.join(self.directory, name))
+                    log(f"Verwaisten Merge-Auftrag '{name}' erneut eingereiht.", "warning")
+            except OSError:
+                continue
+
+
+def download_and_merge_episode(success, episode_title, sorted_ts_urls, base_series_output_path, segment_store=None, proxy_pool=None, m3u8_files_dict=None, segment_index=None, output_format="mp4", merge_queue=None, init_segment_urls=None):
+    """
+    Lädt die erfassten Segmente einer Episode herunter und führt sie zu einer Videodatei zusammen.
+    Wird sowohl für die klassische Erfassung als auch für jeden Tab der Multi-Tab-Erfassung genutzt.
+    Ohne übergebenen SegmentIndex werden die URLs hier nach Segment-Identität zusammengefasst.
+    Fehlgeschlagene Segmente wiederholt der SegmentRetryEngine; zusammengeführt wird nur, wenn
+    danach höchstens endgültig verlorene Segmente fehlen. Mit 'merge_queue' wird der Merge als
+    Auftrag für den mergeWorker.py eingereiht, statt ihn hier auszuführen.
+    """
+    if success and sorted_ts_urls:
+        log("\nDownload der TS-URLs erfolgreich abgeschlossen!")
+        if segment_index is None:
+            segment_index = SegmentIndex(sorted_ts_urls)
+            sorted_ts_urls = segment_index.ordered_urls()
+        cleaned_episode_title = clean_filename(episode_title)
+
+        # Verbesserte Extraktion des Seriennamens
+        series_name = ""
+        # Versuche, nach SXXEXX Muster zu suchen (z.B. "Serie Titel S01E05")
+        match_sxe = re.search(r"(.+?)\s*[Ss]\d{1,2}[Ee]\d{1,3}", cleaned_episode_title, re.IGNORECASE)
+        if match_sxe:
+            series_name = match_sxe.group(1).strip()
+        else:
+            # Fallback: Extrahiere alles vor dem ersten Zahlenblock oder dem ersten " - "
+            match_generic = re.match(r"([^\d\W_]+(?:[ _-][^\d\W_]+)*)", cleaned_episode_title)
+            if match_generic:
+                series_name = match_generic.group(1).strip(" _-.")
+            else:
+                # Letzter Fallback: der gesamte gereinigte Titel
+                series_name = cleaned_episode_title.split("_")[0].split(".")[
+                    0
+                ]  # Bisherige Logik
+
+        # Bereinige den Seriennamen zusätzlich
+        series_name = re.sub(r'[<>:"/\\|?*]', "_", series_name).strip(" _-.")
+        if not series_name:  # Falls Bereinigung zu leerem String führt
+            series_name = "Unbekannte_Serie"
+
+        series_dir = os.path.join(base_series_output_path, series_name)
+        os.makedirs(series_dir, exist_ok=True)
+        log(f"Serienordner erstellt: {series_dir}")
+
+        # Zielpfad für die fertige Folge ('fmp4' ist ebenfalls eine .mp4-Datei)
+        output_extension = "ts" if output_format == "ts" else "mp4"
+        final_output_video_path = os.path.join(
+            series_dir, f"{cleaned_episode_title}.{output_extension}"
+        )
+        final_output_video_path = get_unique_filename(
+            final_output_video_path.rsplit(".", 1)[0], output_extension
+        )
+
+        # Temporärer Ordner für TS-Segmente
+        base_temp_ts_dir = os.path.join(
+            series_dir, f"{cleaned_episode_title}_temp_ts"
+        )  # Eindeutiger Temp-Ordner pro Episode
+        # Ein abgebrochener Lauf derselben Episode hat seine Segmente behalten: dort weitermachen
+        temp_ts_dir = SegmentStore.claim_incomplete(base_temp_ts_dir)
+        if temp_ts_dir:
+            log(f"Setze abgebrochenen Download in '{temp_ts_dir}' fort; vorhandene Segmente werden übersprungen.")
+            if segment_store:
+                segment_store.merge_into(temp_ts_dir)
+        else:
+            temp_ts_dir = get_unique_directory_name(
+                base_temp_ts_dir
+            )  # Falls es mehrere Downloads des gleichen Titels gibt
+            if segment_store:
+                # Bereits im Browser erfasste Segmente in den Episodenordner übernehmen
+                segment_store.move_to(temp_ts_dir)
+            else:
+                os.makedirs(temp_ts_dir, exist_ok=True)
+        log(f"Temporärer TS-Ordner für Segmente: {temp_ts_dir}")
+
+        downloaded_ts_files = []
+        log(
+            f"Lade {len(sorted_ts_urls)} TS-Segmente in '{temp_ts_dir}' herunter..."
+        )
+
+        max_workers = int(os.getenv("TS_DOWNLOAD_THREADS", "8"))
+        segment_downloader = SegmentDownloader(proxy_pool, max_workers=max_workers)
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers
+        ) as executor:
+            futures = {}
+            for i, ts_url in enumerate(sorted_ts_urls):
+                segment_filename = SegmentStore.filename_for(ts_url) #f"segment_{i:05d}.ts"
+                future = executor.submit(
+                    segment_downloader.download,
+                    ts_url,
+                    segment_filename,
+                    temp_ts_dir,
+                    segment_index.alternates(ts_url),
+                )
+                futures[future] = (segment_filename, ts_url)
+
+            # Fortschrittsanzeige für Downloads
+            failed_segments = {}
+            for i, future in enumerate(concurrent.futures.as_completed(futures)):
+                result_filepath = future.result()
+                if result_filepath:
+                    downloaded_ts_files.append(result_filepath)
+                else:
+                    segment_filename, ts_url = futures[future]
+                    failed_segments[segment_filename] = ts_url
+                    log(
+                        f"WARNUNG: Download von Segment '{segment_filename}' fehlgeschlagen, wird wiederholt.",
+                        "warning",
+                    )
+
+                # Fortschritt in Prozent
+                current_download_count = len(downloaded_ts_files)
+                total_segments = len(sorted_ts_urls)
+
+                if total_segments > 0:
+                    progress_percent = (
+                        current_download_count / total_segments
+                    ) * 100
+
+                    # Calculate log_interval safely, ensuring it's never zero
+                    # This line was changed to fix the "integer division or modulo by zero" error.
+                    log_interval = max(1, total_segments // 20)
+
+                    # Only every 5% or at the end of the download log
+                    if (current_download_count % log_interval == 0) or (
+                        current_download_count == total_segments
+                    ):
+                        log(
+                            f"    Heruntergeladen: {current_download_count}/{total_segments} ({progress_percent:.1f}%) Segmente..."
+                        )
+
+        unresolved_segments = []
+        if failed_segments:
+            retry_engine = SegmentRetryEngine(
+                segment_downloader, m3u8_files_dict, max_workers=max_workers, segment_index=segment_index
+            )
+            retried_files, lost_segments, unresolved_segments = retry_engine.run(failed_segments, temp_ts_dir)
+            downloaded_ts_files.extend(retried_files)
+            if lost_segments:
+                log(
+                    f"WARNUNG: {len(lost_segments)} Segmente sind beim Anbieter nicht mehr verfügbar: "
+                    f"{', '.join(sorted(lost_segments))}",
+                    "warning",
+                )
+
+        segment_downloader.log_summary()
+        segment_downloader.close()
+
+        if unresolved_segments:
+            # Kein Merge mit Lücken: der TS-Ordner bleibt markiert erhalten, ein erneuter Lauf derselben Episode
+            # übernimmt ihn (SegmentStore.claim_incomplete) und lädt nur die fehlenden Segmente
+            SegmentStore.mark_incomplete(temp_ts_dir)
+            log(
+                f"FEHLER: {len(unresolved_segments)} Segmente fehlen noch. Zusammenführung abgebrochen, "
+                f"Segmente bleiben in '{temp_ts_dir}'.",
+                "error",
+            )
+        elif not downloaded_ts_files:
+            log(
+                "FEHLER: Keine TS-Segmente erfolgreich heruntergeladen. Kann nicht zusammenführen.",
+                "error",
+            )
+        else:
+            for link in downloaded_ts_files:
+                print(f"Heruntergeladenes Segment: {link}\n")
+
+            # Wichtig für die korrekte Reihenfolge: Downloads sind in Abschlussreihenfolge gesammelt
+            playlist_order = {SegmentStore.filename_for(url): i for i, url in enumerate(sorted_ts_urls)}
+            downloaded_ts_files.sort(
+                key=lambda path: playlist_order.get(os.path.basename(path), len(playlist_order))
+            )
+            init_segment_path = None
+            if any(path.endswith(".m4s") for path in downloaded_ts_files):
+                init_segment_path = download_init_segment(m3u8_files_dict, temp_ts_dir, init_segment_urls)
+            merge_job = {
+                "ts_files": downloaded_ts_files,
+                "output_path": final_output_video_path,
+                "output_format": output_format,
+                "init_segment_path": init_segment_path,
+                "temp_ts_dir": temp_ts_dir,
+            }
+            if merge_queue:
+                merge_queue.submit(merge_job)
+            else:
+                merge_episode(merge_job)
+    else:
+        log("\nDownload der TS-URLs fehlgeschlagen oder unvollständig.", "error")
+        if segment_store and os.path.isdir(segment_store.directory):
+            shutil.rmtree(segment_store.directory, ignore_errors=True)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Automatisiertes Streaming-Video-Download-Tool für Linux/WSL/Docker.")
@@ -1177,7 +3225,22 @@ def main():
     parser.add_argument("output_path", help="Der Pfad, in dem das Video gespeichert werden soll (dies wird der Serien-Basisordner).")
     parser.add_argument("--proxyAddresse", help="proxyAddresse für die verschleierung.")
     parser.add_argument("--no-headless", action="store_true", help="Deaktiviert den Headless-Modus (nur für Debugging).")
+    parser.add_argument("--accelerated", choices=["rate", "seek", "both"], help="Beschleunigte Erfassung über playbackRate und/oder Sprünge in der Zeitleiste.")
+    parser.add_argument("--extra-url", action="append", default=[], help="Weitere Episoden-URL, die im selben Browser in einem eigenen Tab erfasst wird (mehrfach angebbar).")
+    parser.add_argument("--proxy-pool", action="store_true", help="Nutzt die schnellsten gesunden Proxys aus dem Proxy-Pool für Browser und Segment-Downloads.")
+    parser.add_argument("--warm-profile", action="store_true", help="Stellt Cookies, localStorage und HTTP-Cache pro Hoster aus früheren Sessions wieder her.")
+    parser.add_argument("--lean-profile", action="store_true", help="Schlankes Browser-Profil: blockiert Bilder, Schriften, Tracker und Adlisten-Domains, Ton aus, kleiner Viewport.")
+    parser.add_argument("--cdp-capture", action="store_true", help="Übernimmt Segmente per CDP direkt aus dem Browser, statt sie ein zweites Mal herunterzuladen.")
+    parser.add_argument("--output-format", choices=MergerManager.OUTPUT_FORMATS, default=os.getenv("OUTPUT_FORMAT", "mp4"), help="Zielformat: 'mp4' (Remux per FFmpeg mit -c copy), 'fmp4' (fragmentiertes MP4, schon beim Schreiben abspielbar) oder 'ts' (nur native Verkettung, ohne FFmpeg). fMP4-Quellen werden immer ohne FFmpeg als fragmentiertes MP4 geschrieben.")
+    parser.add_argument("--stage", choices=["all", "capture", "download"], default="all", help="Nur eine Pipeline-Stufe ausführen: 'capture' schreibt das Capture-Manifest, 'download' lädt und mergt aus dem Manifest.")
+    parser.add_argument("--manifest", help="Pfad des Capture-Manifests für --stage capture/download.")
+    parser.add_argument("--merge-queue", default=os.getenv("MERGE_SPOOL_DIR"), help="Spool-Verzeichnis des mergeWorker.py. Der Merge wird dort eingereiht statt inline ausgeführt.")
     args = parser.parse_args()
+    if args.stage != "all" and not args.manifest:
+        parser.error("--stage capture/download benötigt --manifest")
+    if args.extra_url and (args.cdp_capture or args.accelerated):
+        # Die Multi-Tab-Erfassung liest nur die Playlists; CDP-Erfassung und beschleunigte Wiedergabe gibt es nur pro Episode
+        parser.error("--extra-url lässt sich nicht mit --cdp-capture oder --accelerated kombinieren")
     driver = None
 
     log_file_base_path = "/app/Logs"
@@ -1218,190 +3281,64 @@ def main():
     stream_handler.setFormatter(formatter)
     logger.addHandler(stream_handler)
 
+    proxy_pool = ProxyPool() if args.proxy_pool else None
+    merge_queue = MergeQueue(args.merge_queue) if args.merge_queue else None
+    base_series_output_path = os.path.abspath(args.output_path)
+    os.makedirs(base_series_output_path, exist_ok=True)
+    log(f"Serien-Basisordner: {base_series_output_path}")
+
+    # Playlists gehören zur Episode: neben dem Capture-Manifest oder in einem Unterordner pro Agent.
+    # Parallele Agents überschreiben sich so nicht gegenseitig die gleichnamigen Playlists.
+    m3u8_dir = (
+        f"{os.path.splitext(os.path.abspath(args.manifest))[0]}_m3u8"
+        if args.manifest
+        else os.path.join(M3U8_BASE_DIR, cleaned_agent_name)
+    )
+
     try:
-        driver = driverManager(headless=not args.no_headless, proxyAddresse=args.proxyAddresse)
-        
-        base_series_output_path = os.path.abspath(args.output_path)
-        os.makedirs(base_series_output_path, exist_ok=True)
-        log(f"Serien-Basisordner: {base_series_output_path}")
-
-        success, episode_title, sorted_ts_urls = driver.stream_episode(args.url)
-
-        if success and sorted_ts_urls:
-            log("\nDownload der TS-URLs erfolgreich abgeschlossen!")
-            cleaned_episode_title = clean_filename(episode_title)
-
-            # Verbesserte Extraktion des Seriennamens
-            series_name = ""
-            # Versuche, nach SXXEXX Muster zu suchen (z.B. "Serie Titel S01E05")
-            match_sxe = re.search(r"(.+?)\s*[Ss]\d{1,2}[Ee]\d{1,3}", cleaned_episode_title, re.IGNORECASE)
-            if match_sxe:
-                series_name = match_sxe.group(1).strip()
-            else:
-                # Fallback: Extrahiere alles vor dem ersten Zahlenblock oder dem ersten " - "
-                match_generic = re.match(r"([^\d\W_]+(?:[ _-][^\d\W_]+)*)", cleaned_episode_title)
-                if match_generic:
-                    series_name = match_generic.group(1).strip(" _-.")
-                else:
-                    # Letzter Fallback: der gesamte gereinigte Titel
-                    series_name = cleaned_episode_title.split("_")[0].split(".")[
-                        0
-                    ]  # Bisherige Logik
-
-            # Bereinige den Seriennamen zusätzlich
-            series_name = re.sub(r'[<>:"/\\|?*]', "_", series_name).strip(" _-.")
-            if not series_name:  # Falls Bereinigung zu leerem String führt
-                series_name = "Unbekannte_Serie"
-
-            series_dir = os.path.join(base_series_output_path, series_name)
-            os.makedirs(series_dir, exist_ok=True)
-            log(f"Serienordner erstellt: {series_dir}")
-
-            # Zielpfad für die fertige Folge
-            final_output_video_path = os.path.join(
-                series_dir, f"{cleaned_episode_title}.mp4"
-            )
-            final_output_video_path = get_unique_filename(
-                final_output_video_path.rsplit(".", 1)[0], "mp4"
+        if args.stage == "download":
+            # Erfassung lief bereits in einem eigenen Prozess; hier wird kein Browser benötigt
+            episodes = load_capture_manifest(args.manifest)
+        else:
+            # Reste eines früheren Laufs desselben Agents dürfen nicht in diese Erfassung geraten
+            shutil.rmtree(m3u8_dir, ignore_errors=True)
+            driver = driverManager(
+                headless=not args.no_headless,
+                proxyAddresse=args.proxyAddresse,
+                cdp_capture=args.cdp_capture,
+                accelerated=args.accelerated,
+                lean_profile=args.lean_profile,
+                warm_profile=args.warm_profile,
+                proxy_pool=proxy_pool,
+                m3u8_output_dir=m3u8_dir,
             )
-
-            # Temporärer Ordner für TS-Segmente
-            temp_ts_dir = os.path.join(
-                series_dir, f"{cleaned_episode_title}_temp_ts"
-            )  # Eindeutiger Temp-Ordner pro Episode
-            temp_ts_dir = get_unique_directory_name(
-                temp_ts_dir
-            )  # Falls es mehrere Downloads des gleichen Titels gibt
-            os.makedirs(temp_ts_dir, exist_ok=True)
-            log(f"Temporärer TS-Ordner für Segmente: {temp_ts_dir}")
-
-            downloaded_ts_files = []
-            log(
-                f"Lade {len(sorted_ts_urls)} TS-Segmente in '{temp_ts_dir}' herunter..."
+            episodes = capture_episodes(driver, args, base_series_output_path, cleaned_agent_name)
+            # Grid-Session sofort freigeben; Download und Merge brauchen keinen Browser
+            log("Erfassung abgeschlossen. Schließe den Browser...")
+            driver.driver.quit()
+            driver = None
+
+        if args.stage == "capture":
+            write_capture_manifest(args.manifest, episodes)
+            return
+
+        for episode in episodes:
+            download_and_merge_episode(
+                episode["success"],
+                episode["episode_title"],
+                episode["ts_urls"],
+                base_series_output_path,
+                segment_store=SegmentStore(episode["segment_store_dir"]) if episode["segment_store_dir"] else None,
+                proxy_pool=proxy_pool,
+                m3u8_files_dict=episode["m3u8_files_dict"],
+                segment_index=SegmentIndex(episode["segment_urls"]),
+                output_format=args.output_format,
+                merge_queue=merge_queue,
+                init_segment_urls=episode.get("init_segment_urls"),
             )
-
-            max_workers = int(os.getenv("TS_DOWNLOAD_THREADS", "8"))
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=max_workers
-            ) as executor:
-                futures = []
-                for i, ts_url in enumerate(sorted_ts_urls):
-                    segment_filename = f"{os.path.basename(urlparse(ts_url).path)}" #f"segment_{i:05d}.ts"
-                    futures.append(
-                        executor.submit(
-                            download_file, ts_url, segment_filename, temp_ts_dir
-                        )
-                    )
-
-                # Fortschrittsanzeige für Downloads
-                for i, future in enumerate(concurrent.futures.as_completed(futures)):
-                    result_filepath = future.result()
-                    if result_filepath:
-                        downloaded_ts_files.append(result_filepath)
-                    else:
-                        log(
-                            f"WARNUNG: Download von Segment {i:05d} fehlgeschlagen oder übersprungen.",
-                            "warning",
-                        )
-
-                    # Fortschritt in Prozent
-                    current_download_count = len(downloaded_ts_files)
-                    total_segments = len(sorted_ts_urls)
-
-                    if total_segments > 0:
-                        progress_percent = (
-                            current_download_count / total_segments
-                        ) * 100
-
-                        # Calculate log_interval safely, ensuring it's never zero
-                        # This line was changed to fix the "integer division or modulo by zero" error.
-                        log_interval = max(1, total_segments // 20)
-
-                        # Only every 5% or at the end of the download log
-                        if (current_download_count % log_interval == 0) or (
-                            current_download_count == total_segments
-                        ):
-                            log(
-                                f"    Heruntergeladen: {current_download_count}/{total_segments} ({progress_percent:.1f}%) Segmente..."
-                            )
-
-            if not downloaded_ts_files:
-                log(
-                    "FEHLER: Keine TS-Segmente erfolgreich heruntergeladen. Kann nicht zusammenführen.",
-                    "error",
-                )
-            else:
-                for link in downloaded_ts_files:
-                    print(f"Heruntergeladenes Segment: {link}\n")
-                
-                ffmpeg_executable = MergerManager(downloaded_ts_files, driver.m3u8_first_filepath, final_output_video_path)
-                if ffmpeg_executable:
-                    log("Starte Zusammenführung der TS-Dateien...")
-                    #downloaded_ts_files.sort()  # Wichtig für die korrekte Reihenfolge
-                    if ffmpeg_executable.merge_ts_files():
-                        # Prüfe, ob die Datei wirklich existiert und nicht leer ist
-                        if (
-                            os.path.exists(final_output_video_path)
-                            and os.path.getsize(final_output_video_path) > 0
-                        ):
-                            log(
-                                f"\nFERTIG! Die Folge wurde erfolgreich gespeichert unter:\n{final_output_video_path}"
-                            )
-                        else:
-                            log(
-                                f"FEHLER: Die .mp4-Datei wurde nach dem Merge nicht gefunden oder ist leer: {final_output_video_path}",
-                                "error",
-                            )
-
-                        log("Bereinige temporäre TS-Dateien...")
-                        for f in downloaded_ts_files:
-                            try:
-                                pass
-                                #os.remove(f)
-                            except OSError as e:
-                                log(
-                                    f"Fehler beim Löschen von temporärer Datei {f}: {e}",
-                                    "error",
-                                )
-                        try:
-                            # Versuch, das temporäre Verzeichnis zu löschen, wenn es leer ist
-                            if not os.listdir(temp_ts_dir):
-                                os.rmdir(temp_ts_dir)
-                                log(
-                                    f"Temporäres Verzeichnis '{temp_ts_dir}' erfolgreich gelöscht."
-                                )
-                            else:
-                                log(
-                                    f"Temporäres Verzeichnis '{temp_ts_dir}' ist nicht leer und wurde nicht gelöscht.",
-                                    "warning",
-                                )
-                        except OSError as e:
-                            log(
-                                f"Fehler beim Löschen des temporären Verzeichnisses {temp_ts_dir}: {e}",
-                                "error",
-                            )
-                        log(
-                            "\nDownload- und Zusammenführungsprozess erfolgreich abgeschlossen!"
-                        )
-                    else:
-                        log("\nZusammenführung der TS-Dateien fehlgeschlagen.", "error")
-                        log(f"Temporäre TS-Dateien verbleiben in: {temp_ts_dir}")
-                else:
-                    log(
-                        "\nFFmpeg ist nicht verfügbar. Die TS-Dateien wurden heruntergeladen, aber nicht zusammengeführt."
-                    )
-                    log(f"Temporäre TS-Dateien befinden sich in: {temp_ts_dir}")
-                    log(
-                        f"Du kannst diese Dateien manuell mit FFmpeg zusammenführen, z.B. so:"
-                    )
-                    log(
-                        f'ffmpeg -f concat -safe 0 -i "{temp_ts_dir}/input.txt" -c copy "{final_output_video_path}"'
-                    )
-                    log(
-                        f"Wobei {temp_ts_dir}/input.txt eine Liste der TS-Dateien im Format 'file 'segment_0000.ts'' enthält."
-                    )
-        else:
-            log("\nDownload der TS-URLs fehlgeschlagen oder unvollständig.", "error")
+            # Der Merge braucht die Playlists nicht mehr (das Init-Segment liegt im TS-Ordner)
+            if episode.get("m3u8_dir"):
+                shutil.rmtree(episode["m3u8_dir"], ignore_errors=True)
 
     except Exception as e:
         log(f"Ein kritischer Fehler ist aufgetreten: {e}", "error")
@@ -1409,6 +3346,78 @@ def main():
         if driver:
             log("Schließe den Browser...")
             driver.driver.quit()
+        if args.stage != "capture":
+            shutil.rmtree(m3u8_dir, ignore_errors=True)
+
+
+def capture_episodes(driver, args, base_series_output_path, cleaned_agent_name):
+    """
+    Erfasst die Episode(n) im Browser. Gibt pro Episode ein Dictionary mit 'success',
+    'episode_title', 'ts_urls', 'segment_urls' (inkl. Ausweich-URLs), 'm3u8_dir' (eigener Playlist-Ordner
+    der Episode), 'm3u8_first_filepath', 'm3u8_files_dict', 'init_segment_urls' (#EXT-X-MAP zum
+    Zeitpunkt der Erfassung) und 'segment_store_dir' zurück - das Format des Capture-Manifests.
+    """
+    if args.extra_url:
+        log(f"Multi-Tab-Erfassung für {1 + len(args.extra_url)} Episoden in einer Session.")
+        results = MultiTabCaptureScheduler(driver, [args.url] + args.extra_url, driver.m3u8_output_dir).run()
+        return [
+            {
+                "success": result["success"],
+                "episode_title": result["episode_title"],
+                "ts_urls": list(result["ts_urls"]),
+                "segment_urls": list(result["ts_urls"]),
+                "m3u8_dir": result["m3u8_dir"],
+                "m3u8_first_filepath": result["m3u8_first_filepath"],
+                "m3u8_files_dict": result["m3u8_files_dict"],
+                "init_segment_urls": find_init_segment_urls(result["m3u8_files_dict"]),
+                "segment_store_dir": None,
+            }
+            for result in results
+        ]
+
+    segment_store = None
+    if args.cdp_capture:
+        # Der Episodentitel ist erst nach dem Laden bekannt, daher zunächst ein Staging-Ordner
+        # auf demselben Dateisystem, der später in den TS-Ordner umbenannt wird.
+        capture_dir = get_unique_directory_name(
+            os.path.join(base_series_output_path, f".capture_{cleaned_agent_name}")
+        )
+        segment_store = SegmentStore(capture_dir)
+        driver.start_segment_capture(segment_store)
+
+    success, episode_title, sorted_ts_urls = driver.stream_episode(args.url)
+    segment_index = driver.segment_index or SegmentIndex(sorted_ts_urls)
+    return [
+        {
+            "success": success,
+            "episode_title": episode_title,
+            "ts_urls": list(sorted_ts_urls),
+            "segment_urls": segment_index.all_urls(),
+            "m3u8_dir": driver.m3u8_output_dir,
+            "m3u8_first_filepath": driver.m3u8_first_filepath,
+            "m3u8_files_dict": driver.m3u8_files_dict,
+            "init_segment_urls": find_init_segment_urls(driver.m3u8_files_dict),
+            "segment_store_dir": segment_store.directory if segment_store else None,
+        }
+    ]
+
+
+def write_capture_manifest(path, episodes):
+    """Schreibt das Ergebnis der Erfassungsstufe atomar als JSON für die Download-Stufe."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.part"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"created": time.time(), "episodes": episodes}, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+    log(f"Capture-Manifest mit {len(episodes)} Episode(n) geschrieben: {path}")
+
+
+def load_capture_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    age = time.time() - manifest.get("created", time.time())
+    log(f"Capture-Manifest geladen: {len(manifest['episodes'])} Episode(n), erfasst vor {age:.0f}s.")
+    return manifest["episodes"]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import concurrent.futures
+
+# VOE.py liegt im selben Ordner und wird auch als Skript gestartet, daher kein Paket-Import
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from VOE import MergeQueue, log, merge_episode
+
+POLL_INTERVAL = 2  # Sekunden zwischen zwei Blicken in das Spool-Verzeichnis
+
+
+def setup_logging(agent_name, log_file_base_path="/app/Logs"):
+    """Richtet den Logger 'seriendownloader' wie in VOE.main ein (Datei und Konsole)."""
+    os.makedirs(log_file_base_path, exist_ok=True)
+    log.agentName = agent_name
+
+    logger = logging.getLogger("seriendownloader")
+    logger.setLevel(logging.INFO)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+
+    formatter = logging.Formatter(
+        "%(asctime)s %(agentName)s %(levelname)s %(filename)s:%(lineno)d - %(message)s"
+    )
+    file_handler = logging.FileHandler(os.path.join(log_file_base_path, f"{agent_name}.log"), encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+    logger.addHandler(stream_handler)
+
+
+class MergeWorker:
+    """
+    Holt Merge-Aufträge aus dem Spool und führt sie in einem Prozess-Pool zusammen.
+    Die Zahl paralleler Merges ist an die CPU-Kerne gebunden und unabhängig davon, wie viele
+    Browser-Sessions oder Downloads gerade laufen.
+    Bei SIGTERM werden keine Aufträge mehr begonnen, sobald der Spool leer ist: bereits
+    eingereihte und laufende Merges werden noch abgeschlossen, dann endet der Worker.
+    """
+
+    def __init__(self, spool_dir, workers):
+        self.queue = MergeQueue(spool_dir)
+        self.workers = workers
+        self.draining = False
+        self.in_flight = {}  # Future -> (Pfad in 'working/', Auftrag)
+
+    def request_drain(self, signum=None, frame=None):
+        log("Beende nach Abarbeitung der eingereihten Merge-Aufträge...")
+        self.draining = True
+
+    def collect(self, done):
+        for future in done:
+            claimed_path, job = self.in_flight.pop(future)
+            try:
+                success = future.result()
+            except Exception as e:
+                log(f"Merge von '{job.get('output_path')}' abgebrochen: {e}", "error")
+                success = False
+            if success:
+                self.queue.complete(claimed_path)
+            else:
+                self.queue.fail(claimed_path)
+
+    def run(self, once=False):
+        """Arbeitet den Spool ab. Mit 'once' endet der Worker, sobald der Spool leer ist."""
+        self.queue.recover_stale()
+        log(f"Merge-Worker gestartet: {self.workers} parallele Merges, Spool '{self.queue.directory}'.")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                while len(self.in_flight) < self.workers:
+                    claimed = self.queue.claim()
+                    if not claimed:
+                        break
+                    claimed_path, job = claimed
+                    log(f"Starte Merge für '{job.get('output_path')}'.")
+                    self.in_flight[executor.submit(merge_episode, job)] = claimed
+
+                if not self.in_flight:
+                    if once or (self.draining and not self.queue.pending_count()):
+                        break
+                    time.sleep(POLL_INTERVAL)
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    self.in_flight, timeout=POLL_INTERVAL, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                self.collect(done)
+        log("Merge-Worker beendet.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Führt die von VOE.py eingereihten Merge-Aufträge zusammen.")
+    parser.add_argument("spool_dir", nargs="?", default=os.getenv("MERGE_SPOOL_DIR", "/app/serien/.merge-queue"), help="Spool-Verzeichnis der Merge-Aufträge.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MERGE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))), help="Anzahl paralleler Merges (Standard: CPU-Kerne minus eins).")
+    parser.add_argument("--once", action="store_true", help="Nur die aktuell eingereihten Aufträge abarbeiten und dann beenden.")
+    args = parser.parse_args()
+
+    setup_logging("MergeWorker")
+    worker = MergeWorker(args.spool_dir, args.workers)
+    signal.signal(signal.SIGTERM, worker.request_drain)
+    worker.run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()